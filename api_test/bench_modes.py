@@ -0,0 +1,66 @@
+# /search 한 번 호출(single) vs 추천 후 재요약(two_pass) 지연 시간·토큰 비교
+# 실행 (api_test 에서): python bench_modes.py --llm-delay 0.8 --requests 5
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "final", "chatBot"))
+from bench import stub_openai, stub_places
+
+
+def stub_reply(request_body):
+    if request_body.get("response_format", {}).get("type") == "json_object":
+        return json.dumps({
+            "place_ids": ["stub_place_0", "stub_place_1", "stub_place_2"],
+            "summary": "1. 스텁 장소 0 - 평점 4.5, 가까움\n2. 스텁 장소 1 - 평점 4.3, 리뷰가 많음\n3. 스텁 장소 2 - 평점 4.1, 조용함",
+        }, ensure_ascii=False)
+    if "요약해주세요" in json.dumps(request_body.get("messages", []), ensure_ascii=False):
+        return "1. 스텁 장소 0 - 평점 4.5, 가까움\n2. 스텁 장소 1 - 평점 4.3, 리뷰가 많음\n3. 스텁 장소 2 - 평점 4.1, 조용함"
+    return stub_openai.default_reply(request_body)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm-delay", type=float, default=0.8)
+    parser.add_argument("--places-delay", type=float, default=0.05)
+    parser.add_argument("--requests", type=int, default=5)
+    args = parser.parse_args()
+
+    llm_server, endpoint = stub_openai.start_stub_server(delay=args.llm_delay, reply=stub_reply)
+    places_server, places_url = stub_places.start_stub_server(delay=args.places_delay)
+    os.environ.update({
+        "AZURE_OPENAI_ENDPOINT": endpoint,
+        "AZURE_OPENAI_API_KEY": "stub-key",
+        "AZURE_OPENAI_DEPLOYMENT": "stub-deployment",
+        "OPENAI_API_VERSION": "2024-02-01",
+        "PLACES_API_BASE_URL": places_url,
+        "GOOGLE_MAPS_API_KEY": "stub-key",
+    })
+    import server
+
+    client = server.app.test_client()
+    report = {}
+    for mode in ("two_pass", "single"):
+        server.search_mode = mode
+        latencies, totals = [], {"llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        for _ in range(args.requests):
+            server.exclude_place_ids.clear()
+            start = time.perf_counter()
+            data = client.post("/search", json={"lat": 37.5665, "lng": 126.9780, "user_input": "맛집 추천"}).get_json()
+            latencies.append(time.perf_counter() - start)
+            for key in totals:
+                totals[key] += data["usage"][key]
+        report[mode] = {
+            "avg_latency_ms": round(sum(latencies) / len(latencies) * 1000, 1),
+            **{f"avg_{key}": totals[key] / args.requests for key in totals},
+        }
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    llm_server.shutdown()
+    places_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 import os
 import re
 import requests
+import httpx
 import random
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from flask import Flask, render_template, request, jsonify
 from dotenv import load_dotenv
 from langchain_openai import AzureChatOpenAI
@@ -21,11 +25,42 @@ model_name = os.getenv("AZURE_OPENAI_DEPLOYMENT")
 api_key = os.getenv("AZURE_OPENAI_API_KEY")
 endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
 api_version = os.getenv("OPENAI_API_VERSION")
-# OpenAI 설정
+places_api_base_url = os.getenv("PLACES_API_BASE_URL", "https://maps.googleapis.com/maps/api/place")
+places_timeout = float(os.getenv("PLACES_TIMEOUT", "5"))
+# 상세 정보 조회용 공용 스레드 풀 (동시 요청 수 제한)
+details_executor = ThreadPoolExecutor(max_workers=int(os.getenv("PLACES_MAX_WORKERS", "8")))
+llm_timeout = float(os.getenv("LLM_TIMEOUT", "60"))
+# OpenAI 설정 (처음 쓸 때 프로세스당 한 번 생성, keep-alive 커넥션 풀 재사용)
+# 가져올 때 만들면 Azure 자격 증명이 없을 때 서버가 아예 뜨지 않으므로 요청 시점에 생성
+_model = None
+_model_lock = threading.Lock()
+
+def get_model():
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = AzureChatOpenAI(
+                azure_deployment=model_name,
+                azure_endpoint=endpoint,
+                openai_api_key=api_key,
+                api_version=api_version,
+                temperature=0.7,
+                # 지정하지 않으면 요청마다 timeout=None 을 넘겨 http_client 의 timeout 을 덮어씀
+                timeout=llm_timeout,
+                http_client=httpx.Client(limits=httpx.Limits(max_connections=20, max_keepalive_connections=20), timeout=llm_timeout)
+            )
+        return _model
+
+def get_json_model():
+    # 구조화 출력 (JSON 모드) 모델: 한 번의 호출로 place_id 목록과 요약을 함께 받음
+    return get_model().bind(response_format={"type": "json_object"})
+
+# "single": 한 번 호출 (기본), "two_pass": 추천 후 요약을 다시 요청하는 기존 방식 (비교용)
+search_mode = os.getenv("SEARCH_MODE", "single")
 exclude_place_ids = []
 
 def search_nearby_places(lat, lng, radius=1000, place_type="point_of_interest"):
-    url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+    url = f"{places_api_base_url}/nearbysearch/json"
     params = {
         "location": f"{lat},{lng}",
         "radius": radius,  # 반경(미터 단위)
@@ -34,7 +69,7 @@ def search_nearby_places(lat, lng, radius=1000, place_type="point_of_interest"):
         "type": place_type
     }
 
-    response = requests.get(url, params=params)
+    response = requests.get(url, params=params, timeout=places_timeout)
     print(f"Request URL: {response.url}")  # 디버그: 요청 URL 출력
     if response.status_code == 200:
         results = response.json().get('results', [])
@@ -47,14 +82,14 @@ def search_nearby_places(lat, lng, radius=1000, place_type="point_of_interest"):
     return []
 
 def get_place_details(place_id):
-    url = "https://maps.googleapis.com/maps/api/place/details/json"
+    url = f"{places_api_base_url}/details/json"
     params = {
         "place_id": place_id,
         "fields": "name,rating,formatted_address,reviews,geometry",
         "key": google_maps_api_key,
         "language": "ko"
     }
-    response = requests.get(url, params=params)
+    response = requests.get(url, params=params, timeout=places_timeout)
     #print(f"Place Details URL: {response.url}")  # 디버그: 요청 URL 출력
     if response.status_code == 200:
         result = response.json().get('result', {})
@@ -64,18 +99,98 @@ def get_place_details(place_id):
         print(f"Error fetching place details: {response.status_code}, {response.text}")  # 디버그: 오류 세부 정보 출력
     return {}
 
-def summarize_places_with_gpt(place_info):
+def get_places_details(place_ids):
+    # place_id 별 상세 정보를 동시에 조회 (입력 순서 유지, 실패/타임아웃은 {})
+    def fetch(place_id):
+        try:
+            return get_place_details(place_id)
+        except requests.RequestException as e:
+            print(f"Error fetching place details: {e}")
+            return {}
+
+    futures = [details_executor.submit(fetch, place_id) for place_id in place_ids]
+    return [future.result() for future in futures]
+
+def add_usage(usage, response):
+    # 모델 응답의 토큰 사용량을 요청 단위로 누적
+    token_usage = response.response_metadata.get("token_usage") or {}
+    usage["llm_calls"] += 1
+    usage["prompt_tokens"] += token_usage.get("prompt_tokens", 0)
+    usage["completion_tokens"] += token_usage.get("completion_tokens", 0)
+
+def summarize_places_with_gpt(place_info, usage=None):
     prompt = f"다음 장소에 대한 정보를 간결하고 깔끔하게 한국어로 요약해주세요 선정이유도 포함하되, place_id는 빼주세요.:\n{place_info}"
-    model = AzureChatOpenAI(
-    azure_deployment=model_name,
-    openai_api_key=api_key,
-    api_version=api_version,
-    temperature=0.7
-    )
-    model_output = model.invoke(prompt)
+    model_output = get_model().invoke(prompt)
+    if usage is not None:
+        add_usage(usage, model_output)
 
     return model_output.content.strip()
 
+PLACE_ID_PATTERNS = [
+    r'- \*\*place_id\*\*:? *([A-Za-z0-9_-]+)',
+    r'- \*\*place_id:\*\*? *([A-Za-z0-9_-]+)',
+    r'place_id:\s*([A-Za-z0-9_-]+)',
+]
+json_decoder = json.JSONDecoder()
+
+def find_place_ids(model_output):
+    return [place_id for pattern in PLACE_ID_PATTERNS for place_id in re.findall(pattern, model_output)]
+
+def candidate_place_ids(place_ids, nearby_places):
+    # 후보 목록에 있는 id 만, 순서를 유지하며 한 번씩 (없는 id 나 중복으로 상세 조회를 낭비하지 않게)
+    candidates = {place['place_id'] for place in nearby_places}
+    seen = set()
+    result = []
+    for place_id in place_ids:
+        if isinstance(place_id, str) and place_id in candidates and place_id not in seen:
+            seen.add(place_id)
+            result.append(place_id)
+    return result
+
+def parse_single_pass_output(model_output):
+    # 코드블록/앞뒤 설명이 섞여 있어도 텍스트 안의 JSON 을 차례로 찾아 (place_ids, summary), 못 찾으면 None
+    index = 0
+    while True:
+        starts = [position for position in (model_output.find('{', index), model_output.find('[', index)) if position != -1]
+        if not starts:
+            return None
+        start = min(starts)
+        try:
+            value, index = json_decoder.raw_decode(model_output, start)
+        except ValueError:
+            index = start + 1
+            continue
+        if isinstance(value, dict) and isinstance(value.get("place_ids"), list):
+            summary = value.get("summary")
+            return value["place_ids"], summary if isinstance(summary, str) else None
+        if isinstance(value, list):
+            place_ids = [item.get("place_id") if isinstance(item, dict) else item for item in value]
+            if any(isinstance(place_id, str) for place_id in place_ids):
+                return place_ids, None
+
+def recommend_places_two_pass(prompt, usage):
+    response = get_model().invoke(prompt)
+    add_usage(usage, response)
+    model_output = response.content.strip()
+    place_ids = find_place_ids(model_output)
+    print(place_ids)
+    print(model_output)
+
+    summarized_info = summarize_places_with_gpt(model_output, usage)
+    return model_output, place_ids, summarized_info
+
+def recommend_places_single_pass(prompt, usage):
+    prompt += '\n반드시 다음 형식의 JSON 객체 하나로만 답해줘: {"place_ids": [추천한 장소의 place_id], "summary": "위 항목들을 간결하고 깔끔하게 한국어로 정리한 요약 (선정이유 포함, place_id는 빼고)"}'
+    response = get_json_model().invoke(prompt)
+    add_usage(usage, response)
+    model_output = response.content.strip()
+    parsed = parse_single_pass_output(model_output)
+    # JSON 이 아니거나 형식이 다르면 two_pass 처럼 정규식으로 id 를 찾고, 요약이 없으면 요약 호출로 대체
+    place_ids, summary = parsed if parsed is not None else (find_place_ids(model_output), None)
+    if summary is None:
+        summary = summarize_places_with_gpt(model_output, usage)
+    return model_output, place_ids, summary
+
 @app.route('/')
 def index():
     return render_template('index.html', api_key=google_maps_api_key)
@@ -105,39 +220,19 @@ def search():
         
         # GPT에게 제공할 프롬프트 작성
         prompt = f"사용자의 입력: {user_input}\n\n사용자의 좌표는 ({lat}, {lng})입니다. 주어진 장소 정보는 {nearby_places}입니다. 주어진 장소 정보들 중에서 리뷰와 평점, 거리 등에 따라 그리고 사용자의 입력에 따른 3개의 장소를 추천해줘, 그리고 다음과 같은 정보를 간결하고 보기좋게 나열해줘 각각 항목 이후에 줄바꿈도 해줘 - 이름, 평점, 리뷰요약, 거리, 이유, 주소, place_id\n"
-        model = AzureChatOpenAI(
-            azure_deployment=model_name,
-            openai_api_key=api_key,
-            api_version=api_version,
-            temperature=0.7
-        )
-        response = model.invoke(prompt)
-        model_output = response.content.strip()
-        place_ids_1 = re.findall(r'- \*\*place_id\*\*:? *([A-Za-z0-9_-]+)', model_output)
-        place_ids_2 = re.findall(r'- \*\*place_id:\*\*? *([A-Za-z0-9_-]+)', model_output)
-        place_ids_3 = re.findall(r'place_id:\s*([A-Za-z0-9_-]+)', model_output)
-
-        place_ids = place_ids_1 + place_ids_2 + place_ids_3
-        print(place_ids)# 모델 출력에서 장소 이름을 추출 (예시로 정규식을 사용)
-        #place_names = re.findall(r'name: (.*?),', model_output)
-        print(model_output)
-        # 검색된 장소와 비교하여 해당 이름의 place_id를 찾기
-        #place_ids = [place['place_id'] for place in nearby_places if place['name'] in place_names]
-
-        detailed_places = [get_place_details(place_id) for place_id in place_ids]
-        
-        # GPT를 위한 장소 정보 준비
-        place_info_list = [
-            f"Name: {place.get('name')}, Rating: {place.get('rating', 'N/A')}, Address: {place.get('formatted_address', 'N/A')}, Reviews: {', '.join([review.get('text', '') for review in place.get('reviews', [])])}"
-            for place in detailed_places
-        ]
-        place_info = "\n".join(place_info_list)
-
-        #summarized_info = summarize_places_with_gpt(place_info)
-        summarized_info = summarize_places_with_gpt(model_output)
-
-
-        return jsonify({"places": detailed_places, "place_info": summarized_info, "model_output": model_output, "place_ids": place_ids})
+        start_time = time.perf_counter()
+        usage = {"llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        if search_mode == "two_pass":
+            model_output, place_ids, summarized_info = recommend_places_two_pass(prompt, usage)
+        else:
+            model_output, place_ids, summarized_info = recommend_places_single_pass(prompt, usage)
+        place_ids = candidate_place_ids(place_ids, nearby_places)
+
+        detailed_places = get_places_details(place_ids)
+        usage["elapsed_ms"] = round((time.perf_counter() - start_time) * 1000, 1)
+        print(f"[{search_mode}] {usage}")
+
+        return jsonify({"places": detailed_places, "place_info": summarized_info, "model_output": model_output, "place_ids": place_ids, "mode": search_mode, "usage": usage})
     except Exception as e:
         print(f"Exception: {str(e)}")
         return jsonify({"error": str(e)}), 500
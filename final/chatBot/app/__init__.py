@@ -1,9 +1,27 @@
 from flask import Flask
 from config import Config
 from flask_login import LoginManager
+from .cache import places_cache
+from .places_client import places_client
+from .place_index import place_index
+from .llm import model_registry
+from .exclusions import exclusion_store
+from .route_store import route_store
+from .directions import directions_service
+from .models import user_repository
+from .semantic_cache import semantic_cache
+from .metrics import metrics
 
 login_manager = LoginManager()
 
+def cache_counters():
+    # 캐시 적중/미적중은 각 캐시가 이미 세고 있으므로 /metrics 출력 시점에 읽어옴
+    for name, cache in (('places', places_cache), ('semantic', semantic_cache), ('place_index', place_index)):
+        stats = cache.stats()
+        yield 'cache_requests_total', {'cache': name, 'result': 'hit'}, stats['hits']
+        yield 'cache_requests_total', {'cache': name, 'result': 'miss'}, stats['misses']
+    yield 'places_circuit_open', {}, int(places_client.breaker.state != 'closed')
+
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
@@ -11,6 +29,18 @@ def create_app():
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
 
+    places_cache.init_app(app)
+    places_client.init_app(app)
+    place_index.init_app(app)
+    model_registry.init_app(app)
+    exclusion_store.init_app(app)
+    route_store.init_app(app)
+    directions_service.init_app(app)
+    user_repository.init_app(app)
+    semantic_cache.init_app(app)
+    metrics.init_app(app)
+    metrics.add_collector(cache_counters)
+
     with app.app_context():
         from .auth import auth as auth_blueprint
         app.register_blueprint(auth_blueprint)
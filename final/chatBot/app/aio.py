@@ -0,0 +1,319 @@
+import asyncio
+import contextlib
+import time
+from a2wsgi import WSGIMiddleware
+from config import Config
+from itsdangerous import BadSignature
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+from .cache import places_cache
+from .llm import model_registry
+from .metrics import metrics, trace_id_var
+from .models import user_repository
+from .parsing import PlaceIdStreamParser, parse_recommendations
+from .place_index import place_index
+from .places_client import PlacesError, places_client
+from .routes import JSON_FORMAT, LIST_FORMAT, apply_exclusions, make_search_prompt, search_place_types, sse_event
+from .semantic_cache import semantic_cache
+from .services import (PAGE_TOKEN_ATTEMPTS, index_fetcher, merge_places, nearby_search_request, place_details_request,
+                       record_token_usage, remember_nearby)
+
+# 비동기(ASGI) 실행 모드: /search, /search/stream 을 이벤트 루프에서 처리해
+# Places·LLM 대기 중에도 워커 스레드를 점유하지 않음. 나머지 경로는 기존 Flask 앱이 처리.
+# Places 는 PlacesClient.get_json_async (httpx.AsyncClient, 차단기/재시도는 동기 경로와 공유),
+# 짧은 로컬 블로킹 호출(SQLite 캐시/색인/저장소, 임베딩 계산)만 run_in_threadpool 로 넘겨 이벤트 루프를 막지 않음
+
+# 응답과 무관하게 끝까지 실행할 작업 (늦게 온 다음 페이지 반영), 끝나기 전에 GC 되지 않도록 참조 유지
+background_tasks = set()
+
+def spawn(coroutine):
+    task = asyncio.ensure_future(coroutine)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+async def fetch_nearby_places_async(lat, lng, google_maps_api_key, radius=1000, place_type="point_of_interest",
+                                    timeout=Config.PLACES_TIMEOUT, on_results=None):
+    # fetch_nearby_places 의 비동기 버전 (PlacesClient.get_json_async: 재시도, 회로 차단기, 같은 요청 합치기)
+    # 다음 페이지는 백그라운드 작업으로 받고 PLACES_PAGES_WAIT 까지만 기다림, 늦게 온 페이지는 on_results 로 한 번 더 넘김
+    url, params, _ = nearby_search_request(lat, lng, google_maps_api_key, radius, place_type)
+    body = await places_client.get_json_async('places_nearby', url, params, timeout)
+    results = merge_places(body.get('results', []))
+    page_token = body.get('next_page_token')
+    if not page_token or Config.PLACES_MAX_PAGES <= 1 or len(results) >= Config.PLACES_MIN_CANDIDATES:
+        if on_results is not None:
+            await on_results(results)
+        return results
+
+    pages = [results]
+    task = spawn(fetch_next_pages_async(page_token, google_maps_api_key, timeout, Config.PLACES_MAX_PAGES - 1,
+                                        Config.PLACES_MIN_CANDIDATES - len(results), pages))
+    try:
+        await asyncio.wait_for(asyncio.shield(task), Config.PLACES_PAGES_WAIT)
+    except asyncio.TimeoutError:
+        # 기다린 시간 안에 도착한 페이지까지만 사용
+        def late_pages(done):
+            if not done.cancelled():
+                done.exception()  # 다음 페이지 실패는 받은 페이지까지만 사용
+            spawn(on_results(merge_places(*pages)))
+        if on_results is not None:
+            task.add_done_callback(late_pages)
+    except PlacesError:
+        pass  # 받은 페이지까지만 사용
+    results = merge_places(*list(pages))
+    if on_results is not None:
+        await on_results(results)
+    return results
+
+async def fetch_next_pages_async(page_token, google_maps_api_key, timeout, max_pages, needed, pages):
+    # fetch_next_pages 의 비동기 버전 (토큰 활성화 대기는 asyncio.sleep), 남은 next_page_token 반환
+    seen_ids = {place.get('place_id') for page in pages for place in page}
+    for _ in range(max_pages):
+        if not page_token or needed <= 0:
+            break
+        url = f"{Config.PLACES_API_BASE_URL}/nearbysearch/json"
+        params = {"pagetoken": page_token, "key": google_maps_api_key}
+        for attempt in range(PAGE_TOKEN_ATTEMPTS):
+            await asyncio.sleep(Config.PLACES_PAGE_TOKEN_DELAY)
+            try:
+                body = await places_client.get_json_async('places_nearby_page', url, params, timeout)
+                break
+            except PlacesError as e:
+                if e.status != 'INVALID_REQUEST' or attempt == PAGE_TOKEN_ATTEMPTS - 1:
+                    raise
+        page = body.get('results', [])
+        pages.append(page)
+        new_ids = {place.get('place_id') for place in page} - seen_ids
+        seen_ids |= new_ids
+        needed -= len(new_ids)
+        page_token = body.get('next_page_token')
+    return page_token
+
+async def search_nearby_places_async(lat, lng, google_maps_api_key, radius=1000, place_type="point_of_interest",
+                                     timeout=Config.PLACES_TIMEOUT):
+    # search_nearby_places 의 비동기 버전: places_cache -> 로컬 장소 색인(place_index) -> Google 순서
+    # Google 호출은 이벤트 루프에서 기다리고, 로컬 SQLite 조회/저장만 스레드 풀에서 실행
+    # 색인의 빈/오래된 타일 갱신은 동기 모드와 같이 색인의 백그라운드 스레드가 처리 (요청 경로 밖)
+    with metrics.stage('places_nearby'):
+        url, params, cache_key = nearby_search_request(lat, lng, google_maps_api_key, radius, place_type)
+        cached = await run_in_threadpool(places_cache.get, cache_key)
+        if cached is not None:
+            return cached
+
+        results = None
+        if place_index.enabled:
+            fetch = index_fetcher(google_maps_api_key, place_type, timeout)
+            results = await run_in_threadpool(place_index.search, lat, lng, radius, place_type, fetch)
+        if results is not None:
+            await run_in_threadpool(places_cache.set, cache_key, results)
+            return results
+
+        async def remember(results):
+            await run_in_threadpool(remember_nearby, cache_key, results)
+        return await fetch_nearby_places_async(lat, lng, google_maps_api_key, radius, place_type, timeout, on_results=remember)
+
+async def search_nearby_places_by_types_async(lat, lng, google_maps_api_key, place_types, radius=1000,
+                                              timeout=Config.PLACES_TIMEOUT):
+    # 타입마다 동시에 검색해 {타입: 결과}, 일부 타입만 실패하면 그 타입은 빈 결과, 모두 실패하면 PlacesError
+    outcomes = await asyncio.gather(*(search_nearby_places_async(lat, lng, google_maps_api_key, radius, place_type, timeout)
+                                      for place_type in place_types), return_exceptions=True)
+    results, errors = {}, []
+    for place_type, outcome in zip(place_types, outcomes):
+        if isinstance(outcome, PlacesError):
+            results[place_type] = []
+            errors.append(outcome)
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        else:
+            results[place_type] = outcome
+    if len(errors) == len(place_types):
+        raise errors[0]
+    return results
+
+async def get_place_details_async(place_id, google_maps_api_key, timeout=Config.PLACES_TIMEOUT):
+    # get_place_details 의 비동기 버전, 실패(재시도 후에도 오류 상태, 잘못된 본문, 차단기 open)는 {} 이고 캐시하지 않음
+    url, params, cache_key = place_details_request(place_id, google_maps_api_key)
+    cached = await run_in_threadpool(places_cache.get, cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        with metrics.stage('place_details'):
+            body = await places_client.get_json_async('places_details', url, params, timeout)
+    except PlacesError:
+        return {}
+    result = body.get('result', {})
+    if body.get('status', 'OK') == 'OK':
+        await run_in_threadpool(places_cache.set, cache_key, result)
+    return result
+
+async def summarize_places_with_gpt_async(prompt, config, valid_ids=None):
+    model = model_registry.get(config['AZURE_OPENAI_DEPLOYMENT']).bind(response_format={"type": "json_object"})
+    with metrics.stage('llm'):
+        response = await model.ainvoke(prompt)
+    record_token_usage(response)
+    model_output = response.content.strip()
+    summary, place_ids = parse_recommendations(model_output, valid_ids)
+    return summary or model_output, place_ids
+
+def create_asgi_app(flask_app):
+    config = flask_app.config
+    google_maps_api_key = config['GOOGLE_MAPS_API_KEY']
+    session_serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+
+    def session_user_id(request):
+        # Flask-Login 이 Flask 세션 쿠키에 넣은 _user_id 를 그대로 사용
+        cookie = request.cookies.get(config['SESSION_COOKIE_NAME'])
+        if not cookie or session_serializer is None:
+            return None
+        try:
+            session = session_serializer.loads(cookie, max_age=int(flask_app.permanent_session_lifetime.total_seconds()))
+        except BadSignature:
+            return None
+        user_id = session.get('_user_id')
+        return user_id if user_id and user_repository.get(user_id) else None
+
+    def instrumented(endpoint, handler):
+        # Flask 의 metrics.before_request/after_request 와 같은 추적 ID, X-Trace-Id 헤더, http_requests_total
+        # (endpoint 라벨을 Flask 의 request.endpoint 와 같게 해 실행 모드와 무관하게 한 시계열로 집계)
+        async def wrapper(request):
+            if not (metrics.enabled or metrics.trace_log):
+                return await handler(request)
+            metrics.start_trace(request.headers.get('X-Request-ID'))
+            response = await handler(request)
+            response.headers['X-Trace-Id'] = trace_id_var.get()
+            metrics.inc('http_requests_total', endpoint=endpoint, status=str(response.status_code))
+            return response
+        return wrapper
+
+    async def login_required(request):
+        user_id = await run_in_threadpool(session_user_id, request)
+        if user_id is None:
+            return None, JSONResponse({"error": "Login required."}, status_code=401)
+        return user_id, None
+
+    async def prepare(request, user_id):
+        # (data, prompt, candidate_ids, 오류 응답)
+        data = await request.json()
+        exclude_place_ids = await run_in_threadpool(apply_exclusions, user_id, data)
+
+        lat, lng = data.get("lat"), data.get("lng")
+        place_types = search_place_types(data, config)
+        if len(place_types) > 1:
+            nearby_places = await search_nearby_places_by_types_async(lat, lng, google_maps_api_key, place_types)
+            found = any(nearby_places.values())
+        else:
+            nearby_places = await search_nearby_places_async(lat, lng, google_maps_api_key, place_type=place_types[0])
+            found = bool(nearby_places)
+        if not found:
+            return None, None, None, JSONResponse({"error": "No nearby places found."}, status_code=404)
+
+        prompt, candidate_ids = make_search_prompt(data, nearby_places, exclude_place_ids, config)
+        if prompt is None:
+            return None, None, None, JSONResponse({"error": "No nearby places found."}, status_code=404)
+        return data, prompt, candidate_ids, None
+
+    async def search(request):
+        user_id, error = await login_required(request)
+        if error is not None:
+            return error
+        # Flask 처럼 로그인 확인 뒤 응답까지의 시간을 search 단계로 기록
+        with metrics.stage('search'):
+            return await search_places(request, user_id)
+
+    async def search_places(request, user_id):
+        try:
+            data, prompt, candidate_ids, error = await prepare(request, user_id)
+            if error is not None:
+                return error
+
+            cache_args = (data.get("lat"), data.get("lng"), data.get("user_input", ""), candidate_ids)
+            cached, embedding = await run_in_threadpool(semantic_cache.lookup, *cache_args)
+            if cached is not None:
+                summarized_info, place_ids = cached
+            else:
+                start_time = time.perf_counter()
+                summarized_info, place_ids = await summarize_places_with_gpt_async(prompt + JSON_FORMAT, config, candidate_ids)
+                await run_in_threadpool(semantic_cache.store, *cache_args, (summarized_info, place_ids), time.perf_counter() - start_time, embedding=embedding)
+
+            detailed_places = await asyncio.gather(
+                *(get_place_details_async(place_id, google_maps_api_key) for place_id in place_ids))
+
+            return JSONResponse({"places": list(detailed_places), "place_info": summarized_info,
+                                 "model_output": summarized_info, "place_ids": place_ids})
+        except PlacesError as e:
+            return JSONResponse({"error": f"Places API unavailable: {e}"}, status_code=503)
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, status_code=500)
+
+    async def search_stream(request):
+        user_id, error = await login_required(request)
+        if error is not None:
+            return error
+        try:
+            data, prompt, candidate_ids, error = await prepare(request, user_id)
+            if error is not None:
+                return error
+            cache_args = (data.get("lat"), data.get("lng"), data.get("user_input", ""), candidate_ids)
+            cached, embedding = await run_in_threadpool(semantic_cache.lookup, *cache_args)
+        except PlacesError as e:
+            return JSONResponse({"error": f"Places API unavailable: {e}"}, status_code=503)
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, status_code=500)
+
+        model = model_registry.get(config['AZURE_OPENAI_DEPLOYMENT'])
+
+        async def fetch(place_id):
+            return place_id, await get_place_details_async(place_id, google_maps_api_key)
+
+        async def generate():
+            # 스트림 전체 시간을 잼 (Flask 와 같은 search_stream 단계)
+            with metrics.stage('search_stream'):
+                try:
+                    tasks = []
+                    if cached is not None:
+                        place_info, place_ids = cached
+                        yield sse_event("token", {"text": place_info})
+                        tasks = [asyncio.ensure_future(fetch(place_id)) for place_id in place_ids]
+                    else:
+                        start_time = time.perf_counter()
+                        parser = PlaceIdStreamParser(candidate_ids)
+                        chunks = []
+                        place_ids = []
+                        async for chunk in model.astream(prompt + LIST_FORMAT):
+                            record_token_usage(chunk)
+                            if chunk.content:
+                                chunks.append(chunk.content)
+                                yield sse_event("token", {"text": chunk.content})
+                                for place_id in parser.feed(chunk.content):
+                                    place_ids.append(place_id)
+                                    tasks.append(asyncio.ensure_future(fetch(place_id)))
+                        for place_id in parser.close():
+                            place_ids.append(place_id)
+                            tasks.append(asyncio.ensure_future(fetch(place_id)))
+                        place_info = "".join(chunks).strip()
+                        await run_in_threadpool(semantic_cache.store, *cache_args, (place_info, place_ids), time.perf_counter() - start_time, embedding=embedding)
+
+                    for next_done in asyncio.as_completed(tasks):
+                        place_id, place = await next_done
+                        yield sse_event("place", {"place_id": place_id, "place": place})
+
+                    yield sse_event("done", {"place_info": place_info, "place_ids": place_ids})
+                except Exception as e:
+                    yield sse_event("error", {"error": str(e)})
+
+        return StreamingResponse(generate(), media_type='text/event-stream',
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        yield
+        await places_client.aclose()
+
+    return Starlette(routes=[
+        Route('/search', instrumented('main.search', search), methods=['POST']),
+        Route('/search/stream', instrumented('main.search_stream', search_stream), methods=['POST']),
+        Mount('/', app=WSGIMiddleware(flask_app)),
+    ], lifespan=lifespan)
@@ -1,22 +1,22 @@
 from flask import Blueprint, render_template, redirect, url_for, request, flash
 from flask_login import login_user, logout_user, login_required
-from .models import users
+from .models import user_repository
 from . import login_manager
 
 auth = Blueprint('auth', __name__)
 
 @login_manager.user_loader
 def load_user(user_id):
-    return next((user for user in users.values() if user.id == user_id), None)
+    return user_repository.get(user_id)
 
 @auth.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
         username = request.form['username']
         password = request.form['password']
-        user = users.get(username)
+        user = user_repository.get_by_username(username)
 
-        if user and user.password == password:
+        if user and user.check_password(password):
             login_user(user)
             return redirect(url_for('main.index'))
         else:
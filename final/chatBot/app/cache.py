@@ -0,0 +1,120 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryBackend:
+    # 프로세스 내 LRU 저장소
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key, expires_at, value):
+        self.entries[key] = (expires_at, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def delete(self, key):
+        self.entries.pop(key, None)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class SQLiteBackend:
+    # 디스크 저장소 (재시작 후에도 유지), accessed_at 기준으로 LRU 정리
+    def __init__(self, path, max_entries=10000):
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS places_cache
+                             (key TEXT PRIMARY KEY, value TEXT NOT NULL,
+                              expires_at REAL NOT NULL, accessed_at REAL NOT NULL)''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_places_cache_accessed ON places_cache (accessed_at)')
+        self.conn.commit()
+
+    def get(self, key):
+        row = self.conn.execute('SELECT expires_at, value FROM places_cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        self.conn.execute('UPDATE places_cache SET accessed_at = ? WHERE key = ?', (time.time(), key))
+        self.conn.commit()
+        return row[0], json.loads(row[1])
+
+    def set(self, key, expires_at, value):
+        self.conn.execute('INSERT OR REPLACE INTO places_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+                          (key, json.dumps(value, ensure_ascii=False), expires_at, time.time()))
+        self.conn.execute('''DELETE FROM places_cache WHERE key IN
+                             (SELECT key FROM places_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)''',
+                          (self.max_entries,))
+        self.conn.commit()
+
+    def delete(self, key):
+        self.conn.execute('DELETE FROM places_cache WHERE key = ?', (key,))
+        self.conn.commit()
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM places_cache').fetchone()[0]
+
+
+class PlacesCache:
+    # Google Places 응답 캐시 (TTL 만료 + 크기 제한 LRU)
+    def __init__(self, backend=None, ttl=600, grid_precision=3):
+        self.backend = backend if backend is not None else MemoryBackend()  # 빈 저장소도 len() 이 0 이라 거짓
+        self.ttl = ttl
+        self.grid_precision = grid_precision  # 소수점 3자리 ≈ 110m 격자
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def init_app(self, app):
+        config = app.config
+        if config.get('PLACES_CACHE_BACKEND') == 'sqlite':
+            self.backend = SQLiteBackend(config['PLACES_CACHE_PATH'], config['PLACES_CACHE_MAX_ENTRIES'])
+        else:
+            self.backend = MemoryBackend(config['PLACES_CACHE_MAX_ENTRIES'])
+        self.ttl = config['PLACES_CACHE_TTL']
+        self.grid_precision = config['PLACES_CACHE_GRID_PRECISION']
+
+    def nearby_key(self, lat, lng, radius, place_type):
+        cell = f"{round(float(lat), self.grid_precision)},{round(float(lng), self.grid_precision)}"
+        return f"nearby:{cell}:{radius}:{place_type}"
+
+    def details_key(self, place_id):
+        return f"details:{place_id}"
+
+    def get(self, key):
+        with self.lock:
+            entry = self.backend.get(key)
+            if entry is not None and entry[0] > time.time():
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self.backend.delete(key)
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self.lock:
+            self.backend.set(key, time.time() + self.ttl, value)
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self.backend),
+            }
+
+
+places_cache = PlacesCache()
@@ -0,0 +1,142 @@
+import json
+import math
+import numpy as np
+
+EARTH_RADIUS_M = 6371000
+# 순위 판단에 쓰이지 않는 일반 타입은 프롬프트에서 제외
+GENERIC_TYPES = {"point_of_interest", "establishment"}
+
+# 사전 점수 가중치: 베이지안 평균 평점, 리뷰 수, 거리
+RATING_WEIGHT = 0.5
+POPULARITY_WEIGHT = 0.2
+DISTANCE_WEIGHT = 0.3
+PRIOR_RATING = 3.5        # 리뷰가 적은 장소의 평점을 끌어당기는 기준값
+PRIOR_COUNT = 20
+POPULARITY_SATURATION = 10000
+DISTANCE_SCALE_M = 1000
+
+_encoding = None
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    return _encoding
+
+def count_tokens(text):
+    encoding = _get_encoding()
+    if not encoding:
+        return len(text) // 2 + 1  # tiktoken 을 쓸 수 없을 때의 대략적인 추정
+    return len(encoding.encode(text))
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+def haversine_m_array(lat, lng, lats, lngs):
+    lat, lng = np.radians(lat), np.radians(lng)
+    lats, lngs = np.radians(lats), np.radians(lngs)
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lngs - lng) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+def score_candidates(places, lat, lng, exclude_place_ids=frozenset()):
+    # 평점, 리뷰 수, 거리를 합친 휴리스틱 점수 (제외된 장소는 -inf)
+    count = len(places)
+    locations = [place.get('geometry', {}).get('location', {}) for place in places]
+    lats = np.fromiter((location.get('lat', lat) for location in locations), float, count)
+    lngs = np.fromiter((location.get('lng', lng) for location in locations), float, count)
+    ratings = np.fromiter((place.get('rating') or 0 for place in places), float, count)
+    reviews = np.fromiter((place.get('user_ratings_total') or 0 for place in places), float, count)
+    excluded = np.fromiter((place['place_id'] in exclude_place_ids for place in places), bool, count)
+
+    distances = haversine_m_array(lat, lng, lats, lngs)
+    bayesian_rating = (reviews * ratings + PRIOR_COUNT * PRIOR_RATING) / (reviews + PRIOR_COUNT)
+    popularity = np.minimum(np.log1p(reviews) / np.log1p(POPULARITY_SATURATION), 1.0)
+    proximity = np.exp(-distances / DISTANCE_SCALE_M)
+
+    scores = RATING_WEIGHT * bayesian_rating / 5 + POPULARITY_WEIGHT * popularity + DISTANCE_WEIGHT * proximity
+    scores[excluded] = -np.inf
+    return scores
+
+def rank_candidates(places, lat, lng, exclude_place_ids=(), top_k=8):
+    # 점수 순으로 정렬해 상위 top_k 개만 남김 (LLM 은 짧은 목록만 재정렬)
+    if not places:
+        return []
+    if not isinstance(exclude_place_ids, (set, frozenset)):
+        exclude_place_ids = set(exclude_place_ids)
+    scores = score_candidates(places, float(lat), float(lng), exclude_place_ids)
+    if top_k <= 0:
+        return []
+    if top_k < len(places):
+        # k 번째 점수 이상을 입력 순서대로 모음 (argpartition 은 동점 중 아무거나 고르므로 경계의 동점도 모두 포함)
+        kth = -np.partition(-scores, top_k - 1)[top_k - 1]
+        top = np.flatnonzero(scores >= kth)
+    else:
+        top = np.arange(len(places))
+    # 동점은 입력(Places 응답) 순서 유지
+    order = top[np.argsort(-scores[top], kind='stable')][:top_k]
+    return [places[i] for i in order if np.isfinite(scores[i])]
+
+def rank_candidates_by_type(places_by_type, lat, lng, exclude_place_ids=(), top_k=8):
+    # 타입별 결과를 따로 정렬한 뒤 타입마다 top_k 를 고르게 나눈 몫만큼 번갈아 뽑고,
+    # 후보가 모자란 타입의 남는 자리는 다른 타입으로 채움 (place_id 중복 제거)
+    if not isinstance(exclude_place_ids, (set, frozenset)):
+        exclude_place_ids = set(exclude_place_ids)
+    ranked = [rank_candidates(places, lat, lng, exclude_place_ids, len(places)) for places in places_by_type.values()]
+    ranked = [places for places in ranked if places]
+    if not ranked:
+        return []
+    quota = math.ceil(top_k / len(ranked))
+    positions = [0] * len(ranked)
+    taken = [0] * len(ranked)
+    selected, seen = [], set()
+    for cap in (quota, top_k):
+        progress = True
+        while progress and len(selected) < top_k:
+            progress = False
+            for i, places in enumerate(ranked):
+                if taken[i] >= cap or len(selected) >= top_k:
+                    continue
+                while positions[i] < len(places) and places[positions[i]]['place_id'] in seen:
+                    positions[i] += 1
+                if positions[i] < len(places):
+                    place = places[positions[i]]
+                    positions[i] += 1
+                    taken[i] += 1
+                    seen.add(place['place_id'])
+                    selected.append(place)
+                    progress = True
+    return selected
+
+def project_candidate(place, lat, lng):
+    # Places 검색 결과에서 추천에 필요한 필드만 남김 (photos, icon, plus_code, viewport 등 제외)
+    location = place.get('geometry', {}).get('location', {})
+    candidate = {
+        "place_id": place['place_id'],
+        "name": place.get('name'),
+        "rating": place.get('rating'),
+        "user_ratings_total": place.get('user_ratings_total', 0),
+        "vicinity": place.get('vicinity'),
+        "types": [t for t in place.get('types', []) if t not in GENERIC_TYPES],
+    }
+    if 'lat' in location and 'lng' in location:
+        candidate["distance_m"] = round(haversine_m(float(lat), float(lng), location['lat'], location['lng']))
+    return candidate
+
+def serialize_candidates(places, lat, lng, token_budget):
+    # 후보를 JSON Lines 로 직렬화, 예산을 넘으면 뒤쪽(순위가 낮은) 후보부터 잘라냄
+    lines = []
+    used_tokens = 0
+    for place in places:
+        line = json.dumps(project_candidate(place, lat, lng), ensure_ascii=False, separators=(',', ':'))
+        line_tokens = count_tokens(line) + 1
+        if used_tokens + line_tokens > token_budget:
+            break
+        lines.append(line)
+        used_tokens += line_tokens
+    return "\n".join(lines)
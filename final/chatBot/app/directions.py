@@ -0,0 +1,140 @@
+import contextvars
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from .candidates import haversine_m
+from .metrics import metrics
+from .places_client import PlacesClient, PlacesError
+from .polyline import encode_polyline
+
+# 프런트의 google.maps.TravelMode 값 -> Directions API mode
+TRAVEL_MODES = {"DRIVING": "driving", "WALKING": "walking", "BICYCLING": "bicycling", "TRANSIT": "transit"}
+# 다시 요청해도 결과가 같은 Directions 상태: 실패 표시를 저장/캐시해 반복 조회 때 다시 부르지 않음
+# (예: TRANSIT 은 경유지를 지원하지 않아 INVALID_REQUEST, 바다 건너 도보는 ZERO_RESULTS)
+PERMANENT_STATUSES = {'ZERO_RESULTS', 'NOT_FOUND', 'INVALID_REQUEST', 'MAX_WAYPOINTS_EXCEEDED', 'MAX_ROUTE_LENGTH_EXCEEDED'}
+# straight_line 제공자의 이동 속도 (m/s)
+STRAIGHT_LINE_SPEEDS = {"driving": 8.3, "walking": 1.4, "bicycling": 4.2, "transit": 6.0}
+
+
+class GoogleDirectionsProvider:
+    # Directions API 한 번으로 경유지를 포함한 전체 경로 (overview polyline, 총 시간/거리)
+    def __init__(self, client, base_url, api_key):
+        self.client = client
+        self.base_url = base_url
+        self.api_key = api_key
+
+    def route(self, points, mode):
+        params = {
+            "origin": f"{points[0]['lat']},{points[0]['lng']}",
+            "destination": f"{points[-1]['lat']},{points[-1]['lng']}",
+            "mode": mode,
+            "key": self.api_key,
+        }
+        if len(points) > 2:
+            params["waypoints"] = "|".join(f"{point['lat']},{point['lng']}" for point in points[1:-1])
+        body = self.client.get_json('directions', f"{self.base_url}/directions/json", params)
+        if not body.get('routes'):
+            raise PlacesError("directions: no route found", status='ZERO_RESULTS')
+        route = body['routes'][0]
+        legs = route.get('legs', [])
+        return {
+            "path": route['overview_polyline']['points'],
+            "duration_s": sum(leg['duration']['value'] for leg in legs),
+            "distance_m": sum(leg['distance']['value'] for leg in legs),
+        }
+
+
+class StraightLineProvider:
+    # 네트워크 없이 지점 사이를 직선으로 잇는 제공자 (로컬 개발/테스트용)
+    def route(self, points, mode):
+        distance = sum(haversine_m(a['lat'], a['lng'], b['lat'], b['lng']) for a, b in zip(points, points[1:]))
+        return {
+            "path": encode_polyline(points),
+            "duration_s": round(distance / STRAIGHT_LINE_SPEEDS.get(mode, STRAIGHT_LINE_SPEEDS['driving'])),
+            "distance_m": round(distance),
+        }
+
+
+class DirectionsService:
+    # 저장 경로의 실제 이동 경로를 서버에서 한 번만 계산 (같은 요청은 LRU 캐시, 여러 경로는 중복 제거 후 동시 계산)
+    def __init__(self, max_entries=1024, max_workers=4):
+        self.provider = StraightLineProvider()
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.upstream_calls = 0
+        self.lock = threading.Lock()
+
+    def init_app(self, app):
+        config = app.config
+        self.max_entries = config['DIRECTIONS_CACHE_SIZE']
+        self.entries = OrderedDict()
+        if config['DIRECTIONS_PROVIDER'] == 'google':
+            # Places 와 회로 차단기가 섞이지 않도록 클라이언트는 따로 둠
+            client = PlacesClient()
+            client.init_app(app)
+            self.provider = GoogleDirectionsProvider(client, config['DIRECTIONS_API_BASE_URL'], config['GOOGLE_MAPS_API_KEY'])
+        else:
+            self.provider = StraightLineProvider()
+
+    @staticmethod
+    def mode_of(travel_mode):
+        return TRAVEL_MODES.get(str(travel_mode or "DRIVING").upper(), "driving")
+
+    @staticmethod
+    def key(points, mode):
+        # 좌표는 소수 5자리(약 1m)까지만 구분
+        return hashlib.sha1(f"{mode}:{encode_polyline(points)}".encode('utf-8')).hexdigest()
+
+    def route(self, points, travel_mode="DRIVING"):
+        mode = self.mode_of(travel_mode)
+        key = self.key(points, mode)
+        with self.lock:
+            cached = self.entries.get(key)
+            if cached is not None:
+                self.entries.move_to_end(key)
+                return cached
+
+        with metrics.stage('directions'):
+            try:
+                result = dict(self.provider.route(points, mode), travel_mode=mode.upper(), directions_status='OK')
+            except PlacesError as e:
+                if e.status not in PERMANENT_STATUSES:
+                    raise
+                # 계산할 수 없는 경로: 도형 없이 실패 상태를 결과로 돌려줌 (저장되어 이후 조회는 upstream 호출 없음)
+                result = {"path": None, "duration_s": None, "distance_m": None,
+                          "travel_mode": mode.upper(), "directions_status": e.status}
+        with self.lock:
+            self.upstream_calls += 1
+            self.entries[key] = result
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return result
+
+    def route_many(self, routes, travel_mode="DRIVING"):
+        # 경로 목록을 중복 제거 후 동시에 계산, 입력 순서대로 결과
+        # (일시적 실패나 응답 형식 오류는 None 으로 나중에 다시 시도, 계산할 수 없는 경로는 directions_status 로 표시)
+        mode = self.mode_of(travel_mode)
+        futures = {}
+        keys = []
+        for points in routes:
+            key = self.key(points, mode)
+            keys.append(key)
+            if key not in futures:
+                futures[key] = self.executor.submit(contextvars.copy_context().run, self._route_safe, points, travel_mode)
+        return [futures[key].result() for key in keys]
+
+    def _route_safe(self, points, travel_mode):
+        try:
+            return self.route(points, travel_mode)
+        except (PlacesError, KeyError, TypeError):
+            # KeyError/TypeError: overview_polyline 이나 legs 가 빠진 응답
+            return None
+
+    def stats(self):
+        with self.lock:
+            return {"size": len(self.entries), "upstream_calls": self.upstream_calls}
+
+
+directions_service = DirectionsService()
@@ -0,0 +1,86 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryExclusionBackend:
+    # 사용자별 OrderedDict(place_id -> 만료 시각), 오래된 것부터 정리
+    def __init__(self, max_per_user=500):
+        self.max_per_user = max_per_user
+        self.users = {}
+
+    def add(self, user_id, place_ids, expires_at):
+        entries = self.users.setdefault(user_id, OrderedDict())
+        for place_id in place_ids:
+            entries[place_id] = expires_at
+            entries.move_to_end(place_id)
+        while len(entries) > self.max_per_user:
+            entries.popitem(last=False)
+
+    def get(self, user_id, now):
+        entries = self.users.get(user_id)
+        if not entries:
+            return set()
+        # TTL 이 같으므로 만료된 항목은 항상 앞쪽에 모여 있음
+        while entries and next(iter(entries.values())) <= now:
+            entries.popitem(last=False)
+        return set(entries)
+
+
+class SQLiteExclusionBackend:
+    # 여러 워커가 공유하는 디스크 저장소
+    def __init__(self, path, max_per_user=500):
+        self.max_per_user = max_per_user
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS excluded_places
+                             (user_id TEXT NOT NULL, place_id TEXT NOT NULL,
+                              expires_at REAL NOT NULL, added_at REAL NOT NULL,
+                              PRIMARY KEY (user_id, place_id))''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_excluded_places_added ON excluded_places (user_id, added_at)')
+        self.conn.commit()
+
+    def add(self, user_id, place_ids, expires_at):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO excluded_places (user_id, place_id, expires_at, added_at) VALUES (?, ?, ?, ?)',
+                                  [(user_id, place_id, expires_at, now) for place_id in place_ids])
+            self.conn.execute('DELETE FROM excluded_places WHERE user_id = ? AND expires_at <= ?', (user_id, now))
+            self.conn.execute('''DELETE FROM excluded_places WHERE user_id = ? AND place_id IN
+                                 (SELECT place_id FROM excluded_places WHERE user_id = ?
+                                  ORDER BY added_at DESC LIMIT -1 OFFSET ?)''',
+                              (user_id, user_id, self.max_per_user))
+
+    def get(self, user_id, now):
+        rows = self.conn.execute('SELECT place_id FROM excluded_places WHERE user_id = ? AND expires_at > ?', (user_id, now))
+        return {row[0] for row in rows}
+
+
+class ExclusionStore:
+    # 사용자별로 이미 추천한 장소를 제외 (set, 크기 제한, TTL)
+    def __init__(self, backend=None, ttl=86400):
+        self.backend = backend or MemoryExclusionBackend()
+        self.ttl = ttl
+        self.lock = threading.Lock()
+
+    def init_app(self, app):
+        config = app.config
+        if config.get('EXCLUSION_BACKEND') == 'sqlite':
+            self.backend = SQLiteExclusionBackend(config['EXCLUSION_DB_PATH'], config['EXCLUSION_MAX_PER_USER'])
+        else:
+            self.backend = MemoryExclusionBackend(config['EXCLUSION_MAX_PER_USER'])
+        self.ttl = config['EXCLUSION_TTL']
+
+    def add(self, user_id, place_ids):
+        if not place_ids:
+            return
+        with self.lock:
+            self.backend.add(user_id, place_ids, time.time() + self.ttl)
+
+    def get(self, user_id):
+        with self.lock:
+            return self.backend.get(user_id, time.time())
+
+
+exclusion_store = ExclusionStore()
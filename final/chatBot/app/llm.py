@@ -0,0 +1,75 @@
+import threading
+import httpx
+from langchain_openai import AzureChatOpenAI
+from .metrics import metrics
+
+
+def record_request(request):
+    # openai SDK 는 재시도마다 x-stainless-retry-count 헤더를 올려 보냄
+    if request.headers.get('x-stainless-retry-count', '0') != '0':
+        metrics.inc('upstream_retries_total', service='llm')
+
+def record_response(response):
+    metrics.inc('upstream_responses_total', service='llm', status=str(response.status_code))
+
+async def record_request_async(request):
+    record_request(request)
+
+async def record_response_async(response):
+    record_response(response)
+
+
+class ModelRegistry:
+    # 프로세스당 한 번 만든 AzureChatOpenAI 를 (deployment, temperature) 별로 재사용
+    def __init__(self):
+        self.config = {}
+        self.models = {}
+        self.http_client = None
+        self.http_async_client = None
+        self.lock = threading.Lock()
+
+    def init_app(self, app):
+        self.config = app.config
+        self.models = {}
+        # keep-alive 커넥션 풀을 모든 모델 인스턴스가 공유 (ainvoke/astream 은 비동기 풀 사용)
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=app.config['LLM_MAX_CONNECTIONS'],
+                max_keepalive_connections=app.config['LLM_MAX_CONNECTIONS'],
+            ),
+            timeout=app.config['LLM_TIMEOUT'],
+            event_hooks={'request': [record_request], 'response': [record_response]},
+        )
+        self.http_async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=app.config['LLM_MAX_ASYNC_CONNECTIONS'],
+                max_keepalive_connections=app.config['LLM_MAX_ASYNC_CONNECTIONS'],
+            ),
+            timeout=app.config['LLM_TIMEOUT'],
+            event_hooks={'request': [record_request_async], 'response': [record_response_async]},
+        )
+
+    def get(self, deployment=None, temperature=None):
+        deployment = deployment or self.config['AZURE_OPENAI_DEPLOYMENT']
+        if temperature is None:
+            temperature = self.config['LLM_TEMPERATURE']
+        key = (deployment, temperature)
+        with self.lock:
+            model = self.models.get(key)
+            if model is None:
+                model = AzureChatOpenAI(
+                    azure_deployment=deployment,
+                    azure_endpoint=self.config['AZURE_OPENAI_ENDPOINT'],
+                    openai_api_key=self.config['AZURE_OPENAI_API_KEY'],
+                    api_version=self.config['OPENAI_API_VERSION'],
+                    temperature=temperature,
+                    # 지정하지 않으면 요청마다 timeout=None 을 넘겨 http_client 의 timeout 을 덮어씀
+                    timeout=self.config['LLM_TIMEOUT'],
+                    http_client=self.http_client,
+                    http_async_client=self.http_async_client,
+                )
+                self.models[key] = model
+            return model
+
+
+model_registry = ModelRegistry()
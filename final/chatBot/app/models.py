@@ -1,13 +1,79 @@
+import sqlite3
+import threading
+from collections import OrderedDict
 from flask_login import UserMixin
+from werkzeug.security import generate_password_hash, check_password_hash
 
 class User(UserMixin):
-    def __init__(self, id, username, password):
+    def __init__(self, id, username, password_hash):
         self.id = id
         self.username = username
-        self.password = password
+        self.password_hash = password_hash
 
-# 임시 사용자 데이터베이스
-users = {
-    "user1": User(id="1", username="user1", password="password1"),
-    "user2": User(id="2", username="user2", password="password2"),
-}
+    def check_password(self, password):
+        return check_password_hash(self.password_hash, password)
+
+# DB 가 비어 있을 때 넣는 임시 사용자
+DEFAULT_USERS = [("user1", "password1"), ("user2", "password2")]
+
+class UserRepository:
+    # SQLite 사용자 저장소 (id: PRIMARY KEY, username: UNIQUE 인덱스) + 로드한 User 객체 LRU 캐시
+    def __init__(self, cache_size=1024):
+        self.conn = None
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def init_app(self, app):
+        self.cache_size = app.config['USER_CACHE_SIZE']
+        self.connect(app.config['USER_DB_PATH'])
+
+    def connect(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS users
+                             (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                              username TEXT NOT NULL UNIQUE,
+                              password_hash TEXT NOT NULL)''')
+        self.conn.commit()
+        self.cache.clear()
+        if self.conn.execute('SELECT 1 FROM users LIMIT 1').fetchone() is None:
+            for username, password in DEFAULT_USERS:
+                self.create(username, password)
+
+    def create(self, username, password):
+        password_hash = generate_password_hash(password)
+        with self.lock, self.conn:
+            cursor = self.conn.execute('INSERT INTO users (username, password_hash) VALUES (?, ?)',
+                                       (username, password_hash))
+        return User(id=str(cursor.lastrowid), username=username, password_hash=password_hash)
+
+    def get(self, user_id):
+        # Flask-Login user_loader 용: 캐시 확인 후 id 인덱스로 조회
+        with self.lock:
+            user = self.cache.get(user_id)
+            if user is not None:
+                self.cache.move_to_end(user_id)
+                return user
+            try:
+                row = self.conn.execute('SELECT id, username, password_hash FROM users WHERE id = ?',
+                                        (int(user_id),)).fetchone()
+            except (TypeError, ValueError):
+                return None
+            if row is None:
+                return None
+            user = User(id=str(row[0]), username=row[1], password_hash=row[2])
+            self.cache[user_id] = user
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            return user
+
+    def get_by_username(self, username):
+        with self.lock:
+            row = self.conn.execute('SELECT id, username, password_hash FROM users WHERE username = ?',
+                                    (username,)).fetchone()
+        if row is None:
+            return None
+        return User(id=str(row[0]), username=row[1], password_hash=row[2])
+
+user_repository = UserRepository()
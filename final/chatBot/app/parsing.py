@@ -0,0 +1,94 @@
+import json
+import re
+
+# "- **place_id**: X", "- **place_id:** X", "place_id: X", "\"place_id\": \"X\"" 를 한 번에 처리
+PLACE_ID_PATTERN = re.compile(r'place_id(?![A-Za-z0-9_])[*"\']*\s*[:=]?\s*[*"\'`]*\s*([A-Za-z0-9_-]+)')
+PLACE_ID_CHARS = re.compile(r'[A-Za-z0-9_-]+')
+
+_decoder = json.JSONDecoder()
+
+def _dedupe(place_ids, valid_ids=None):
+    # 순서를 유지하며 중복, 형식 오류, 후보에 없는 id 제거
+    seen = set()
+    result = []
+    for place_id in place_ids:
+        if not isinstance(place_id, str) or place_id in seen or not PLACE_ID_CHARS.fullmatch(place_id):
+            continue
+        if valid_ids is not None and place_id not in valid_ids:
+            continue
+        seen.add(place_id)
+        result.append(place_id)
+    return result
+
+def _iter_json_values(text):
+    # 코드블록이나 앞뒤 설명이 섞여 있어도 텍스트 안의 JSON 객체/배열을 차례로 찾음
+    index = 0
+    while True:
+        starts = [position for position in (text.find('{', index), text.find('[', index)) if position != -1]
+        if not starts:
+            return
+        start = min(starts)
+        try:
+            value, end = _decoder.raw_decode(text, start)
+        except ValueError:
+            index = start + 1
+            continue
+        yield value
+        index = end
+
+def _validate(value):
+    # 허용 스키마:
+    #   {"summary": str, "places": [{"place_id": str, ...}]}
+    #   {"summary": str, "place_ids": [str]}
+    #   [{"place_id": str, ...}]
+    summary = None
+    if isinstance(value, dict):
+        summary = value.get('summary') if isinstance(value.get('summary'), str) else None
+        if isinstance(value.get('place_ids'), list):
+            return summary, value['place_ids']
+        items = value.get('places')
+    else:
+        items = value
+    if not isinstance(items, list):
+        return None
+    place_ids = [item.get('place_id') for item in items if isinstance(item, dict)]
+    if not any(isinstance(place_id, str) for place_id in place_ids):
+        return None
+    return summary, place_ids
+
+def parse_recommendations(text, valid_ids=None):
+    # 모델 출력에서 (요약, place_id 목록) 추출, 형식이 어긋나도 예외 없이 정규식으로 대체
+    for value in _iter_json_values(text):
+        validated = _validate(value)
+        if validated is not None:
+            summary, place_ids = validated
+            return summary, _dedupe(place_ids, valid_ids)
+    return None, _dedupe((match.group(1) for match in PLACE_ID_PATTERN.finditer(text)), valid_ids)
+
+class PlaceIdStreamParser:
+    # 스트리밍 출력용: 토큰이 들어오는 대로 완성된 place_id 를 한 번씩만 돌려줌
+    def __init__(self, valid_ids=None):
+        self.valid_ids = valid_ids
+        self.buffer = ""
+        self.position = 0
+        self.seen = set()
+
+    def _accept(self, place_ids):
+        new_ids = [place_id for place_id in _dedupe(place_ids, self.valid_ids) if place_id not in self.seen]
+        self.seen.update(new_ids)
+        return new_ids
+
+    def feed(self, text):
+        self.buffer += text
+        found = []
+        for match in PLACE_ID_PATTERN.finditer(self.buffer, self.position):
+            if match.end() == len(self.buffer):
+                break  # id 가 다음 토큰에서 이어질 수 있음
+            found.append(match.group(1))
+            self.position = match.end()
+        return self._accept(found)
+
+    def close(self):
+        found = [match.group(1) for match in PLACE_ID_PATTERN.finditer(self.buffer, self.position)]
+        self.position = len(self.buffer)
+        return self._accept(found)
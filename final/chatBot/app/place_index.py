@@ -0,0 +1,193 @@
+import json
+import logging
+import math
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .candidates import EARTH_RADIUS_M, haversine_m, haversine_m_array
+
+logger = logging.getLogger(__name__)
+
+TILE_ROW_STRIDE = 10 ** 7  # tile id = 위도 칸 * stride + 경도 칸
+
+
+class PlaceIndex:
+    # 격자 타일(기본 0.01° ≈ 1.1km) 단위로 Places 결과를 SQLite 에 저장하고 반경 검색을 로컬에서 처리
+    # 타일마다 (타일 중심, 타일을 덮는 반경) 으로 Google 을 한 번 조회해 채우며,
+    # 반경을 덮는 타일이 모두 채워져 있으면 로컬 결과 반환, 오래된 타일은 백그라운드에서 갱신
+    # Google 이 결과를 잘라서 준(60개 상한 등) 타일은 미완성으로 기록해 로컬 응답에 쓰지 않음
+    def __init__(self, tile_degrees=0.01, ttl=86400, max_results=60, max_refreshes=4, refresh_workers=2):
+        self.enabled = False
+        self.conn = None
+        self.tile_degrees = tile_degrees
+        self.ttl = ttl
+        self.max_results = max_results
+        self.max_refreshes = max_refreshes  # 검색 한 번이 새로 예약하는 타일 갱신 수 상한 (Google 호출 폭주 방지)
+        self.refresh_executor = ThreadPoolExecutor(max_workers=refresh_workers)
+        self.refreshing = set()  # (tile, place_type)
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.lock = threading.Lock()
+
+    def init_app(self, app):
+        config = app.config
+        self.enabled = config['PLACE_INDEX_ENABLED']
+        self.tile_degrees = config['PLACE_INDEX_TILE_DEGREES']
+        self.ttl = config['PLACE_INDEX_TTL']
+        self.max_results = config['PLACE_INDEX_MAX_RESULTS']
+        self.max_refreshes = config['PLACE_INDEX_MAX_REFRESHES']
+        if self.enabled:
+            self.connect(config['PLACE_INDEX_PATH'])
+
+    def connect(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS places
+                             (place_id TEXT PRIMARY KEY, tile INTEGER NOT NULL,
+                              lat REAL NOT NULL, lng REAL NOT NULL, types TEXT NOT NULL,
+                              data TEXT NOT NULL, updated_at REAL NOT NULL)''')
+        # 반경 후보 선별은 이 커버링 인덱스만 읽고, 본문(data)은 반환할 행만 읽음
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_places_tile ON places (tile, lat, lng, types)')
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS tiles
+                             (tile INTEGER NOT NULL, place_type TEXT NOT NULL, fetched_at REAL NOT NULL,
+                              complete INTEGER NOT NULL DEFAULT 1, PRIMARY KEY (tile, place_type))''')
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(tiles)')]
+        if 'complete' not in columns:
+            # 이전 버전 타일은 잘렸는지 알 수 없으므로 미완성 + 오래된 것으로 보고 다음 검색 때 다시 채움
+            self.conn.execute('ALTER TABLE tiles ADD COLUMN complete INTEGER NOT NULL DEFAULT 0')
+            self.conn.execute('UPDATE tiles SET fetched_at = 0')
+        self.conn.commit()
+
+    def tile_of(self, lat, lng):
+        row = math.floor((lat + 90) / self.tile_degrees)
+        col = math.floor((lng + 180) / self.tile_degrees)
+        return row * TILE_ROW_STRIDE + col
+
+    def tile_center(self, tile):
+        row, col = divmod(tile, TILE_ROW_STRIDE)
+        return (row + 0.5) * self.tile_degrees - 90, (col + 0.5) * self.tile_degrees - 180
+
+    def tile_radius_m(self, tile):
+        # 타일 중심에서 꼭짓점까지 거리 = 타일 전체를 덮는 검색 반경
+        lat, lng = self.tile_center(tile)
+        half = self.tile_degrees / 2
+        return math.ceil(haversine_m(lat, lng, lat + half, lng + half))
+
+    def bounding_box(self, lat, lng, radius):
+        dlat = math.degrees(radius / EARTH_RADIUS_M)
+        dlng = math.degrees(radius / (EARTH_RADIUS_M * max(math.cos(math.radians(lat)), 1e-6)))
+        return lat - dlat, lat + dlat, lng - dlng, lng + dlng
+
+    def covering_tiles(self, lat, lng, radius):
+        min_lat, max_lat, min_lng, max_lng = self.bounding_box(lat, lng, radius)
+        low, high = self.tile_of(min_lat, min_lng), self.tile_of(max_lat, max_lng)
+        low_row, low_col = divmod(low, TILE_ROW_STRIDE)
+        high_row, high_col = divmod(high, TILE_ROW_STRIDE)
+        return [row * TILE_ROW_STRIDE + col
+                for row in range(low_row, high_row + 1) for col in range(low_col, high_col + 1)]
+
+    def search(self, lat, lng, radius, place_type, fetch):
+        # 덮는 타일이 모두 완전히 채워져 있으면 거리순 결과(최대 max_results), 아니면 None (호출 측이 Google 직접 조회)
+        # fetch(lat, lng, radius) -> (Places 결과 목록, 잘리지 않았는지), 빈/오래된 타일 갱신에 사용
+        lat, lng = float(lat), float(lng)
+        tiles = self.covering_tiles(lat, lng, radius)
+        placeholders = ','.join('?' * len(tiles))
+        with self.lock:
+            fetched = {tile: (fetched_at, complete) for tile, fetched_at, complete in self.conn.execute(
+                f'SELECT tile, fetched_at, complete FROM tiles WHERE place_type = ? AND tile IN ({placeholders})',
+                [place_type, *tiles]).fetchall()}
+
+        now = time.time()
+        missing = [tile for tile in tiles if tile not in fetched]
+        stale = [tile for tile, (fetched_at, _) in fetched.items() if now - fetched_at > self.ttl]
+        # 미완성 타일은 다시 받아도 같은 결과이므로 TTL 이 지날 때까지 갱신하지 않고 Google 직접 조회로 넘김
+        incomplete = [tile for tile, (_, complete) in fetched.items() if not complete]
+        self.schedule_refresh(self.nearest_first(lat, lng, missing) + self.nearest_first(lat, lng, stale), place_type, fetch)
+        if missing or incomplete:
+            with self.lock:
+                self.misses += 1
+            return None
+
+        min_lat, max_lat, min_lng, max_lng = self.bounding_box(lat, lng, radius)
+        with self.lock:
+            self.hits += 1
+            rows = self.conn.execute(
+                f'''SELECT rowid, lat, lng, types FROM places
+                    WHERE tile IN ({placeholders}) AND lat BETWEEN ? AND ? AND lng BETWEEN ? AND ?''',
+                [*tiles, min_lat, max_lat, min_lng, max_lng]).fetchall()
+
+        type_token = f'"{place_type}"'
+        rows = [row for row in rows if type_token in row[3]]
+        if not rows:
+            return []
+        distances = haversine_m_array(lat, lng, np.array([row[1] for row in rows]), np.array([row[2] for row in rows]))
+        order = [i for i in np.argsort(distances, kind='stable') if distances[i] <= radius][:self.max_results]
+        rowids = [rows[i][0] for i in order]
+        with self.lock:
+            data = dict(self.conn.execute(
+                f'SELECT rowid, data FROM places WHERE rowid IN ({",".join("?" * len(rowids))})', rowids).fetchall())
+        return [json.loads(data[rowid]) for rowid in rowids if rowid in data]
+
+    def add_places(self, places):
+        # Places 결과를 각자의 위치 타일에 저장 (같은 place_id 는 최신 값으로 교체)
+        now = time.time()
+        records = []
+        for place in places:
+            location = (place.get('geometry') or {}).get('location') or {}
+            if 'place_id' not in place or 'lat' not in location or 'lng' not in location:
+                continue
+            records.append((place['place_id'], self.tile_of(location['lat'], location['lng']),
+                            location['lat'], location['lng'], json.dumps(place.get('types', [])),
+                            json.dumps(place, ensure_ascii=False), now))
+        with self.lock, self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?, ?, ?, ?)', records)
+        return len(records)
+
+    def mark_fetched(self, tiles, place_type, fetched_at=None, complete=True):
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self.lock, self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)',
+                                  [(tile, place_type, fetched_at, int(complete)) for tile in tiles])
+
+    def refresh_tile(self, tile, place_type, fetch):
+        try:
+            lat, lng = self.tile_center(tile)
+            results, complete = fetch(lat, lng, self.tile_radius_m(tile))
+            self.add_places(results)
+            self.mark_fetched([tile], place_type, complete=complete)
+            with self.lock:
+                self.refreshes += 1
+        except Exception:
+            logger.exception('place index refresh failed: tile=%s type=%s', tile, place_type)
+        finally:
+            with self.lock:
+                self.refreshing.discard((tile, place_type))
+
+    def nearest_first(self, lat, lng, tiles):
+        return sorted(tiles, key=lambda tile: haversine_m(lat, lng, *self.tile_center(tile)))
+
+    def schedule_refresh(self, tiles, place_type, fetch):
+        # 이미 갱신 중인 타일은 건너뛰고 앞에서부터 max_refreshes 개만 예약 (나머지는 다음 검색 때)
+        with self.lock:
+            keys = [(tile, place_type) for tile in tiles if (tile, place_type) not in self.refreshing][:self.max_refreshes]
+            self.refreshing.update(keys)
+        for tile, _ in keys:
+            self.refresh_executor.submit(self.refresh_tile, tile, place_type, fetch)
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "tile_refreshes": self.refreshes,
+                "refreshing": len(self.refreshing),
+            }
+
+
+place_index = PlaceIndex()
@@ -0,0 +1,40 @@
+import re
+
+DEFAULT_PLACE_TYPE = "point_of_interest"
+
+# 사용자 입력 키워드 -> Google Places 타입 (한 글자 키워드는 오탐이 많아 넣지 않음)
+KEYWORD_TYPES = [
+    (("카페", "커피", "디저트", "cafe", "coffee"), "cafe"),
+    (("맛집", "식당", "음식", "점심", "저녁", "밥집", "레스토랑", "restaurant", "food"), "restaurant"),
+    (("술집", "호프", "이자카야", "와인바", "칵테일", "pub"), "bar"),
+    (("빵집", "베이커리", "bakery"), "bakery"),
+    (("공원", "산책", "park"), "park"),
+    (("관광", "명소", "구경", "볼거리", "랜드마크"), "tourist_attraction"),
+    (("박물관", "museum"), "museum"),
+    (("미술관", "갤러리", "gallery"), "art_gallery"),
+    (("쇼핑", "백화점", "쇼핑몰", "mall"), "shopping_mall"),
+    (("숙소", "호텔", "모텔", "게스트하우스", "hotel"), "lodging"),
+    (("편의점",), "convenience_store"),
+    (("영화", "cinema"), "movie_theater"),
+    (("도서관", "library"), "library"),
+    (("헬스", "헬스장", "gym"), "gym"),
+    (("약국", "pharmacy"), "pharmacy"),
+    (("병원", "hospital"), "hospital"),
+]
+
+KEYWORD_PATTERN = re.compile("|".join(
+    sorted((re.escape(keyword) for keywords, _ in KEYWORD_TYPES for keyword in keywords), key=len, reverse=True)),
+    re.IGNORECASE)
+TYPE_BY_KEYWORD = {keyword.lower(): place_type for keywords, place_type in KEYWORD_TYPES for keyword in keywords}
+
+
+def classify_place_types(user_input, max_types=3):
+    # 입력에 나온 순서대로 중복 없는 타입 목록, 해당 키워드가 없으면 [DEFAULT_PLACE_TYPE]
+    place_types = []
+    for match in KEYWORD_PATTERN.finditer(user_input or ""):
+        place_type = TYPE_BY_KEYWORD[match.group(0).lower()]
+        if place_type not in place_types:
+            place_types.append(place_type)
+            if len(place_types) == max_types:
+                break
+    return place_types or [DEFAULT_PLACE_TYPE]
@@ -0,0 +1,269 @@
+import asyncio
+import contextlib
+import random
+import threading
+import time
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from .metrics import metrics
+
+# HTTP 429/5xx 와 Places 응답 본문의 일시적 오류 상태는 재시도 대상
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRY_PLACES_STATUSES = {'OVER_QUERY_LIMIT', 'UNKNOWN_ERROR'}
+OK_PLACES_STATUSES = {'OK', 'ZERO_RESULTS'}
+
+
+class PlacesError(Exception):
+    # 재시도 후에도 실패했거나 회로 차단기가 열려 있어 Places 응답을 못 받은 경우
+    # status: 마지막 실패 사유 ("HTTP 503", "INVALID_REQUEST" 등)
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(PlacesError):
+    pass
+
+
+class CircuitBreaker:
+    # 연속 실패가 threshold 번이면 open, reset_timeout 뒤 요청 하나만 통과시켜(half-open) 성공하면 close
+    def __init__(self, threshold=5, reset_timeout=30.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if self.probing or time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.probing = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+    @property
+    def state(self):
+        with self.lock:
+            if self.opened_at is None:
+                return 'closed'
+            return 'half_open' if self.probing else 'open'
+
+
+class InFlightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class PlacesClient:
+    # Places 공용 HTTP 클라이언트: 커넥션 풀 Session, (connect, read) 타임아웃,
+    # 429/5xx 지수 백오프(full jitter) 재시도, 회로 차단기, 같은 요청 동시 호출 합치기(선택)
+    # get_json_async 는 ASGI 모드용 (httpx.AsyncClient, 차단기/재시도/상태 검사는 동기 경로와 공유)
+    def __init__(self):
+        self.session = requests.Session()
+        self.async_client = None
+        self.max_async_connections = 200
+        self.connect_timeout = 3.0
+        self.read_timeout = 5.0
+        self.max_retries = 2
+        self.backoff_base = 0.2
+        self.backoff_max = 2.0
+        self.coalesce = True
+        self.breaker = CircuitBreaker()
+        self.in_flight = {}
+        self.in_flight_async = {}  # 이벤트 루프 하나에서만 쓰므로 잠금 없음
+        self.lock = threading.Lock()
+
+    def init_app(self, app):
+        config = app.config
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=config['PLACES_MAX_CONNECTIONS'])
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.connect_timeout = config['PLACES_CONNECT_TIMEOUT']
+        self.read_timeout = config['PLACES_TIMEOUT']
+        self.max_retries = config['PLACES_MAX_RETRIES']
+        self.backoff_base = config['PLACES_BACKOFF_BASE']
+        self.backoff_max = config['PLACES_BACKOFF_MAX']
+        self.coalesce = config['PLACES_COALESCE']
+        self.breaker = CircuitBreaker(config['PLACES_BREAKER_THRESHOLD'], config['PLACES_BREAKER_RESET'])
+        self.max_async_connections = config['PLACES_MAX_ASYNC_CONNECTIONS']
+        self.async_client = None
+
+    def get_async_client(self):
+        # 처음 쓸 때 만듦 (ASGI 앱을 띄우지 않는 동기 모드에서는 만들지 않음)
+        if self.async_client is None:
+            self.async_client = httpx.AsyncClient(limits=httpx.Limits(max_connections=self.max_async_connections,
+                                                                      max_keepalive_connections=self.max_async_connections))
+        return self.async_client
+
+    async def aclose(self):
+        if self.async_client is not None:
+            await self.async_client.aclose()
+            self.async_client = None
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def get_json(self, service, url, params, timeout=None):
+        # 성공(OK/ZERO_RESULTS) 응답 본문 dict 반환, 실패는 PlacesError
+        if not self.coalesce:
+            return self._get_with_retries(service, url, params, timeout)
+
+        key = (url, tuple(sorted(params.items())))
+        with self.lock:
+            call = self.in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self.in_flight[key] = InFlightCall()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._get_with_retries(service, url, params, timeout)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            call.done.set()
+
+    async def get_json_async(self, service, url, params, timeout=None):
+        # get_json 의 비동기 버전 (같은 요청 합치기는 이벤트 루프 안에서만)
+        if not self.coalesce:
+            return await self._get_with_retries_async(service, url, params, timeout)
+
+        key = (url, tuple(sorted(params.items())))
+        call = self.in_flight_async.get(key)
+        if call is not None:
+            return await asyncio.shield(call)
+
+        call = self.in_flight_async[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await self._get_with_retries_async(service, url, params, timeout)
+            call.set_result(result)
+            return result
+        except BaseException as e:
+            call.set_exception(e)
+            call.exception()  # 기다리는 쪽이 없어도 "never retrieved" 경고가 나지 않도록
+            raise
+        finally:
+            del self.in_flight_async[key]
+
+    def _get_with_retries(self, service, url, params, timeout):
+        read_timeout = timeout if timeout is not None else self.read_timeout
+        for attempt in range(self.max_retries + 1):
+            self._before_attempt(service, attempt)
+            with self._attempt() as outcome:
+                try:
+                    response = self.session.get(url, params=params, timeout=(self.connect_timeout, read_timeout))
+                except requests.Timeout as e:
+                    outcome.update(self._transport_error(service, 'timeout', e))
+                except requests.RequestException as e:
+                    outcome.update(self._transport_error(service, 'error', e))
+                else:
+                    outcome.update(self._response(service, response))
+            if outcome['error'] is None:
+                return outcome['body']
+            if not outcome['retryable']:
+                break
+            if attempt < self.max_retries:
+                time.sleep(self.backoff(attempt))
+        raise PlacesError(f"{service}: {outcome['detail']}", status=outcome['error'])
+
+    async def _get_with_retries_async(self, service, url, params, timeout):
+        read_timeout = timeout if timeout is not None else self.read_timeout
+        client = self.get_async_client()
+        for attempt in range(self.max_retries + 1):
+            self._before_attempt(service, attempt)
+            with self._attempt() as outcome:
+                try:
+                    response = await client.get(url, params=params, timeout=httpx.Timeout(read_timeout, connect=self.connect_timeout))
+                except httpx.TimeoutException as e:
+                    outcome.update(self._transport_error(service, 'timeout', e))
+                except httpx.HTTPError as e:
+                    outcome.update(self._transport_error(service, 'error', e))
+                else:
+                    outcome.update(self._response(service, response))
+            if outcome['error'] is None:
+                return outcome['body']
+            if not outcome['retryable']:
+                break
+            if attempt < self.max_retries:
+                await asyncio.sleep(self.backoff(attempt))
+        raise PlacesError(f"{service}: {outcome['detail']}", status=outcome['error'])
+
+    def _before_attempt(self, service, attempt):
+        if not self.breaker.allow():
+            metrics.inc('upstream_responses_total', service=service, status='circuit_open')
+            raise CircuitOpenError(f"{service}: circuit open", status='circuit_open')
+        if attempt:
+            metrics.inc('upstream_retries_total', service=service)
+
+    @contextlib.contextmanager
+    def _attempt(self):
+        # 요청 한 번의 결과를 차단기에 반영, 예상하지 못한 예외(응답 처리 중 오류 등)도 실패로 기록해
+        # half-open 시험 요청이 probing 상태로 남아 차단기가 다시 닫히지 않는 일이 없도록 함
+        outcome = {'error': 'error', 'retryable': True, 'detail': None, 'body': None}
+        try:
+            yield outcome
+        finally:
+            if outcome['error'] is None:
+                self.breaker.record_success()
+            elif outcome['retryable']:
+                self.breaker.record_failure()
+            else:
+                # 요청 자체가 잘못된 경우(4xx, REQUEST_DENIED 등)는 upstream 장애가 아니므로 차단기에 반영하지 않음
+                self.breaker.record_success()
+
+    @staticmethod
+    def _transport_error(service, error, detail):
+        metrics.inc('upstream_responses_total', service=service, status=error)
+        return {'error': error, 'retryable': True, 'detail': detail}
+
+    def _response(self, service, response):
+        metrics.inc('upstream_responses_total', service=service, status=str(response.status_code))
+        body, error, retryable = self._check(response)
+        return {'body': body, 'error': error, 'retryable': retryable, 'detail': error}
+
+    @staticmethod
+    def _check(response):
+        # (본문, 실패 사유, 재시도 가능 여부), 성공이면 실패 사유는 None
+        if response.status_code != 200:
+            return None, f"HTTP {response.status_code}", response.status_code in RETRY_STATUS_CODES
+        try:
+            body = response.json()
+        except ValueError:
+            return None, "invalid JSON response", True
+        if not isinstance(body, dict):
+            return None, "invalid JSON response", True
+        status = body.get('status', 'OK')
+        if status in OK_PLACES_STATUSES:
+            return body, None, False
+        return None, status, status in RETRY_PLACES_STATUSES
+
+
+places_client = PlacesClient()
@@ -0,0 +1,45 @@
+# Google encoded polyline 알고리즘 (경로 좌표를 짧은 문자열로 저장)
+# https://developers.google.com/maps/documentation/utilities/polylinealgorithm
+
+def _encode_value(value):
+    value = ~(value << 1) if value < 0 else value << 1
+    chunks = []
+    while value >= 0x20:
+        chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+        value >>= 5
+    chunks.append(chr(value + 63))
+    return "".join(chunks)
+
+def encode_polyline(points, precision=5):
+    # points: [{"lat": .., "lng": ..}, ...]
+    factor = 10 ** precision
+    result = []
+    prev_lat = prev_lng = 0
+    for point in points:
+        lat = round(point['lat'] * factor)
+        lng = round(point['lng'] * factor)
+        result.append(_encode_value(lat - prev_lat))
+        result.append(_encode_value(lng - prev_lng))
+        prev_lat, prev_lng = lat, lng
+    return "".join(result)
+
+def decode_polyline(encoded, precision=5):
+    factor = 10 ** precision
+    points = []
+    index = lat = lng = 0
+    while index < len(encoded):
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lng += deltas[1]
+        points.append({"lat": lat / factor, "lng": lng / factor})
+    return points
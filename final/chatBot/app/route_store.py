@@ -0,0 +1,90 @@
+import sqlite3
+import threading
+import time
+from .polyline import encode_polyline, decode_polyline
+
+
+# 서버에서 계산한 경로 도형 (Directions 결과), 기존 DB 에는 connect 시 열을 추가
+# directions_status: OK 또는 계산할 수 없는 경로의 상태 (ZERO_RESULTS 등, path 는 NULL), NULL 이면 아직 계산 전
+GEOMETRY_COLUMNS = (('travel_mode', 'TEXT'), ('path', 'TEXT'), ('duration_s', 'INTEGER'), ('distance_m', 'INTEGER'),
+                    ('directions_status', 'TEXT'))
+
+
+class RouteStore:
+    # 사용자별 저장 경로 (SQLite WAL, 좌표는 encoded polyline 으로 저장)
+    # path 는 실제 이동 경로의 encoded polyline 으로, 조회 시 클라이언트가 바로 그림
+    def __init__(self):
+        self.conn = None
+        self.lock = threading.Lock()
+
+    def init_app(self, app):
+        self.connect(app.config['ROUTE_DB_PATH'])
+
+    def connect(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS saved_routes
+                             (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                              user_id TEXT NOT NULL,
+                              polyline TEXT NOT NULL,
+                              created_at REAL NOT NULL)''')
+        existing = {row[1] for row in self.conn.execute('PRAGMA table_info(saved_routes)')}
+        for name, column_type in GEOMETRY_COLUMNS:
+            if name not in existing:
+                self.conn.execute(f'ALTER TABLE saved_routes ADD COLUMN {name} {column_type}')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_saved_routes_user ON saved_routes (user_id, id)')
+        self.conn.commit()
+
+    def add(self, user_id, points, geometry=None, travel_mode=None):
+        return self.add_many(user_id, [points], [geometry], travel_mode)[0]
+
+    def add_many(self, user_id, routes, geometries=None, travel_mode=None):
+        # 여러 경로를 한 트랜잭션으로 저장하고 id 목록 반환
+        # geometries[i] 는 directions 결과 ({path, duration_s, distance_m}) 또는 None (조회 시 계산)
+        now = time.time()
+        geometries = geometries or [None] * len(routes)
+        with self.lock, self.conn:
+            cursor = self.conn.cursor()
+            ids = []
+            for points, geometry in zip(routes, geometries):
+                geometry = geometry or {}
+                cursor.execute('''INSERT INTO saved_routes
+                                  (user_id, polyline, created_at, travel_mode, path, duration_s, distance_m, directions_status)
+                                  VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                               (user_id, encode_polyline(points), now, geometry.get('travel_mode', travel_mode),
+                                geometry.get('path'), geometry.get('duration_s'), geometry.get('distance_m'),
+                                geometry.get('directions_status')))
+                ids.append(cursor.lastrowid)
+            return ids
+
+    def set_geometry(self, geometries):
+        # {route_id: directions 결과} 를 한 트랜잭션으로 반영 (도형 없이 저장된 경로 보충)
+        with self.lock, self.conn:
+            self.conn.executemany(
+                'UPDATE saved_routes SET travel_mode = ?, path = ?, duration_s = ?, distance_m = ?, directions_status = ? WHERE id = ?',
+                [(geometry.get('travel_mode'), geometry['path'], geometry.get('duration_s'),
+                  geometry.get('distance_m'), geometry.get('directions_status'), route_id) for route_id, geometry in geometries.items()])
+
+    def list(self, user_id, cursor=None, limit=20):
+        # 최신순 커서 페이지네이션: cursor 는 이전 페이지 마지막 id
+        query = ('SELECT id, polyline, created_at, travel_mode, path, duration_s, distance_m, directions_status '
+                 'FROM saved_routes WHERE user_id = ?')
+        params = [user_id]
+        if cursor is not None:
+            query += ' AND id < ?'
+            params.append(cursor)
+        query += ' ORDER BY id DESC LIMIT ?'
+        params.append(limit + 1)
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+        routes = [{"id": row[0], "route": decode_polyline(row[1]), "polyline": row[1], "created_at": row[2],
+                   "travel_mode": row[3], "path": row[4], "duration_s": row[5], "distance_m": row[6],
+                   "directions_status": row[7]}
+                  for row in rows[:limit]]
+        return routes, next_cursor
+
+
+route_store = RouteStore()
@@ -1,104 +1,216 @@
-from flask import Blueprint, render_template, request, jsonify, current_app
-from flask_login import login_required
-import requests
-import re
-from langchain_openai import AzureChatOpenAI
+from flask import Blueprint, render_template, request, jsonify, current_app, Response, stream_with_context
+from flask_login import login_required, current_user
+import json
+import time
+from concurrent.futures import as_completed
+from .places_client import PlacesError
+from .services import search_nearby_places_by_types, search_nearby_places, get_places_details, submit_place_details, summarize_places_with_gpt, record_token_usage
+from .parsing import PlaceIdStreamParser
+from .candidates import rank_candidates, rank_candidates_by_type, serialize_candidates
+from .place_types import DEFAULT_PLACE_TYPE, classify_place_types
+from .cache import places_cache
+from .place_index import place_index
+from .llm import model_registry
+from .exclusions import exclusion_store
+from .route_store import route_store
+from .directions import directions_service
+from .semantic_cache import semantic_cache
+from .metrics import metrics
 
 main = Blueprint('main', __name__)
 
-exclude_place_ids = []
-saved_routes = []  # 메모리에 저장된 경로
-
 @main.route('/')
 @login_required
 def index():
     return render_template('index.html', api_key=current_app.config['GOOGLE_MAPS_API_KEY'])
 
-def search_nearby_places(lat, lng, api_key):
-    url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-    params = {
-        "location": f"{lat},{lng}",
-        "radius": 1000,
-        "key": api_key,
-        "language": "ko",
-        "type": "point_of_interest"
-    }
-    response = requests.get(url, params=params)
-    if response.status_code == 200:
-        return response.json().get('results', [])
-    return []
-
-def get_place_details(place_id, api_key):
-    url = "https://maps.googleapis.com/maps/api/place/details/json"
-    params = {
-        "place_id": place_id,
-        "fields": "name,rating,formatted_address,reviews,geometry",
-        "key": api_key,
-        "language": "ko"
-    }
-    response = requests.get(url, params=params)
-    if response.status_code == 200:
-        return response.json().get('result', {})
-    return {}
-
-def summarize_places_with_gpt(prompt, config):
-    model_name = config['AZURE_OPENAI_DEPLOYMENT']
-    api_key = config['AZURE_OPENAI_API_KEY']
-    api_version = config['OPENAI_API_VERSION']
-    model = AzureChatOpenAI(
-        azure_deployment=model_name,
-        openai_api_key=api_key,
-        api_version=api_version,
-        temperature=0.7
-    )
-    model_output = model.invoke(prompt)
-    content = model_output.content.strip()
-    
-    place_ids_1 = re.findall(r'- \*\*place_id\*\*:? *([A-Za-z0-9_-]+)', content)
-    place_ids_2 = re.findall(r'- \*\*place_id:\*\*? *([A-Za-z0-9_-]+)', content)
-    place_ids_3 = re.findall(r'place_id:\s*([A-Za-z0-9_-]+)', content)
-    place_ids = place_ids_1 + place_ids_2 + place_ids_3
-    
-    return content, place_ids
+# 추천 결과 출력 형식: /search 는 JSON 모드, /search/stream 은 사람이 읽는 목록을 그대로 스트리밍
+LIST_FORMAT = "그리고 다음과 같은 정보를 간결하고 보기좋게 나열해줘 각각 항목 이후에 줄바꿈도 해줘 - 이름, 평점, 리뷰요약, 거리, 이유, 주소, place_id\n"
+JSON_FORMAT = '반드시 다음 형식의 JSON 객체 하나로만 답해줘: {"places": [{"place_id": "추천한 장소의 place_id", "name": "이름"}], "summary": "추천한 장소들의 이름, 평점, 리뷰요약, 거리, 이유, 주소를 간결하고 보기좋게 각각 항목 이후에 줄바꿈해서 정리한 글"}\n'
 
-@main.route('/search', methods=['POST'])
-@login_required
-def search():
-    global exclude_place_ids
-    data = request.json
+def apply_exclusions(user_id, data):
+    # 요청에 담긴 제외 장소를 사용자 저장소에 반영하고 전체 제외 집합 반환
+    exclusion_store.add(user_id, data.get("exclude_place_ids", []))
+    return exclusion_store.get(user_id)
+
+def make_search_prompt(data, nearby_places, exclude_place_ids, config):
+    # 사전 정렬 후 (추천 프롬프트, 후보 place_id 집합) 생성, 후보가 없으면 (None, None) — 동기/비동기 공용
     lat = data.get("lat")
     lng = data.get("lng")
-    received_exclude_place_ids = data.get("exclude_place_ids", [])
     user_input = data.get("user_input", "")
 
-    exclude_place_ids.extend(received_exclude_place_ids)
+    if isinstance(nearby_places, dict):
+        # {타입: 결과} 는 타입별 몫을 나눠 사전 정렬
+        nearby_places = rank_candidates_by_type(nearby_places, lat, lng, exclude_place_ids, config['PRERANK_TOP_K'])
+    else:
+        nearby_places = rank_candidates(nearby_places, lat, lng, exclude_place_ids, config['PRERANK_TOP_K'])
+    if not nearby_places:
+        return None, None
 
-    try:
-        nearby_places = search_nearby_places(lat, lng, current_app.config['GOOGLE_MAPS_API_KEY'])
+    candidates = serialize_candidates(nearby_places, lat, lng, config['PROMPT_CANDIDATE_TOKEN_BUDGET'])
+    candidate_ids = {place['place_id'] for place in nearby_places}
+
+    prompt = f"사용자의 입력: {user_input}\n\n사용자의 좌표는 ({lat}, {lng})입니다. 주어진 장소 정보는 한 줄에 하나씩인 JSON 이며 distance_m 은 사용자로부터의 거리(m)입니다:\n{candidates}\n\n주어진 장소 정보들 중에서 리뷰와 평점, 거리 등에 따라 그리고 사용자의 입력에 따른 3개의 장소를 추천해줘, "
+    return prompt, candidate_ids
+
+def search_place_types(data, config):
+    # PLACE_TYPE_MODE=keywords 이면 입력 키워드로 검색할 타입 결정 (여러 개면 동시 검색)
+    if config['PLACE_TYPE_MODE'] != 'keywords':
+        return [DEFAULT_PLACE_TYPE]
+    return classify_place_types(data.get("user_input", ""), config['PLACE_TYPE_MAX'])
+
+def build_search_prompt(data):
+    # 주변 장소 검색 + 사전 정렬 후 (추천 프롬프트, 후보 place_id 집합) 생성, 후보가 없으면 (None, None)
+    exclude_place_ids = apply_exclusions(current_user.get_id(), data)
+
+    lat, lng = data.get("lat"), data.get("lng")
+    google_maps_api_key = current_app.config['GOOGLE_MAPS_API_KEY']
+    place_types = search_place_types(data, current_app.config)
+    if len(place_types) > 1:
+        nearby_places = search_nearby_places_by_types(lat, lng, google_maps_api_key, place_types)
+        if not any(nearby_places.values()):
+            return None, None
+    else:
+        nearby_places = search_nearby_places(lat, lng, google_maps_api_key, place_type=place_types[0])
         if not nearby_places:
-            return jsonify({"error": "No nearby places found."}), 404
+            return None, None
 
-        nearby_places = [place for place in nearby_places if place['place_id'] not in exclude_place_ids]
+    return make_search_prompt(data, nearby_places, exclude_place_ids, current_app.config)
+
+@main.route('/search', methods=['POST'])
+@login_required
+@metrics.stage('search')
+def search():
+    try:
+        data = request.json
+        prompt, candidate_ids = build_search_prompt(data)
+        if prompt is None:
+            return jsonify({"error": "No nearby places found."}), 404
 
-        prompt = f"사용자의 입력: {user_input}\n\n사용자의 좌표는 ({lat}, {lng})입니다. 주어진 장소 정보는 {nearby_places}입니다. 주어진 장소 정보들 중에서 리뷰와 평점, 거리 등에 따라 그리고 사용자의 입력에 따른 3개의 장소를 추천해줘, 그리고 다음과 같은 정보를 간결하고 보기좋게 나열해줘 각각 항목 이후에 줄바꿈도 해줘 - 이름, 평점, 리뷰요약, 거리, 이유, 주소, place_id\n"
-        
-        summarized_info, place_ids,json_data = summarize_places_with_gpt(prompt, current_app.config)
+        cache_args = (data.get("lat"), data.get("lng"), data.get("user_input", ""), candidate_ids)
+        cached, embedding = semantic_cache.lookup(*cache_args)
+        if cached is not None:
+            summarized_info, place_ids = cached
+        else:
+            start_time = time.perf_counter()
+            summarized_info, place_ids = summarize_places_with_gpt(prompt + JSON_FORMAT, current_app.config, candidate_ids)
+            semantic_cache.store(*cache_args, (summarized_info, place_ids), time.perf_counter() - start_time, embedding=embedding)
 
-        detailed_places = [get_place_details(place_id, current_app.config['GOOGLE_MAPS_API_KEY']) for place_id in place_ids]
+        detailed_places = get_places_details(place_ids, current_app.config['GOOGLE_MAPS_API_KEY'])
 
         return jsonify({"places": detailed_places, "place_info": summarized_info, "model_output": summarized_info, "place_ids": place_ids})
+    except PlacesError as e:
+        return jsonify({"error": f"Places API unavailable: {e}"}), 503
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@main.route('/search/stream', methods=['POST'])
+@login_required
+def search_stream():
+    # /search 의 SSE 버전: LLM 토큰을 생성되는 대로 보내고, place_id 가 나오는 즉시 상세 정보 조회를 시작해 끝나는 대로 전송
+    try:
+        data = request.json
+        prompt, candidate_ids = build_search_prompt(data)
+        if prompt is None:
+            return jsonify({"error": "No nearby places found."}), 404
+        cache_args = (data.get("lat"), data.get("lng"), data.get("user_input", ""), candidate_ids)
+        cached, embedding = semantic_cache.lookup(*cache_args)
+    except PlacesError as e:
+        return jsonify({"error": f"Places API unavailable: {e}"}), 503
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    model = model_registry.get(current_app.config['AZURE_OPENAI_DEPLOYMENT'])
+    google_maps_api_key = current_app.config['GOOGLE_MAPS_API_KEY']
+
+    def generate():
+        # 제너레이터라 데코레이터 대신 with 로 스트림 전체 시간을 잰다
+        with metrics.stage('search_stream'):
+            try:
+                futures = {}
+                if cached is not None:
+                    place_info, place_ids = cached
+                    yield sse_event("token", {"text": place_info})
+                    for place_id in place_ids:
+                        futures[submit_place_details(place_id, google_maps_api_key)] = place_id
+                else:
+                    start_time = time.perf_counter()
+                    parser = PlaceIdStreamParser(candidate_ids)
+                    chunks = []
+                    for chunk in model.stream(prompt + LIST_FORMAT):
+                        record_token_usage(chunk)
+                        if chunk.content:
+                            chunks.append(chunk.content)
+                            yield sse_event("token", {"text": chunk.content})
+                            for place_id in parser.feed(chunk.content):
+                                futures[submit_place_details(place_id, google_maps_api_key)] = place_id
+                    for place_id in parser.close():
+                        futures[submit_place_details(place_id, google_maps_api_key)] = place_id
+                    place_info = "".join(chunks).strip()
+                    place_ids = list(futures.values())
+                    semantic_cache.store(*cache_args, (place_info, place_ids), time.perf_counter() - start_time, embedding=embedding)
+
+                for future in as_completed(futures):
+                    yield sse_event("place", {"place_id": futures[future], "place": future.result()})
+
+                yield sse_event("done", {"place_info": place_info, "place_ids": place_ids})
+            except Exception as e:
+                yield sse_event("error", {"error": str(e)})
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @main.route('/save_route', methods=['POST'])
 @login_required
 def save_route():
-    global saved_routes
+    # {"route": [...]} 하나 또는 {"routes": [[...], ...]} 여러 개, 이동 경로는 저장 시 서버에서 한 번만 계산
     route_data = request.json
-    saved_routes.append(route_data)
-    return jsonify({"message": "Route saved successfully!"}), 200
+    routes = route_data.get("routes") or [route_data.get("route") or []]
+    if any(len(points) < 2 for points in routes):
+        return jsonify({"error": "A route needs at least two points."}), 400
+    travel_mode = route_data.get("travel_mode", "DRIVING")
+    # 일시적으로 실패한 경로는 도형 없이 저장하고 /get_routes 에서 다시 시도 (계산할 수 없는 경로는 실패 상태로 저장)
+    geometries = directions_service.route_many(routes, travel_mode)
+    route_ids = route_store.add_many(current_user.get_id(), routes, geometries, travel_mode)
+    if "routes" in route_data:
+        return jsonify({"message": "Routes saved successfully!", "ids": route_ids}), 200
+    return jsonify({"message": "Route saved successfully!", "id": route_ids[0]}), 200
 
 @main.route('/get_routes', methods=['GET'])
 @login_required
 def get_routes():
-    return jsonify(saved_routes), 200
+    limit = min(request.args.get('limit', current_app.config['ROUTES_PAGE_SIZE'], type=int),
+                current_app.config['ROUTES_MAX_PAGE_SIZE'])
+    cursor = request.args.get('cursor', type=int)
+    routes, next_cursor = route_store.list(current_user.get_id(), cursor=cursor, limit=max(limit, 1))
+
+    # 아직 계산 전인 경로(이전에 저장됐거나 일시적 실패)만 모아서 계산 후 저장, 이후 조회는 upstream 호출 없음
+    # ZERO_RESULTS 처럼 계산할 수 없는 경로도 실패 상태를 저장하므로 다시 부르지 않음
+    pending = [route for route in routes if route["path"] is None and route["directions_status"] is None]
+    if pending:
+        by_mode = {}
+        for route in pending:
+            by_mode.setdefault(route["travel_mode"] or "DRIVING", []).append(route)
+        computed = {}
+        for travel_mode, group in by_mode.items():
+            for route, geometry in zip(group, directions_service.route_many([route["route"] for route in group], travel_mode)):
+                if geometry is not None:
+                    route.update(geometry)
+                    computed[route["id"]] = geometry
+        if computed:
+            route_store.set_geometry(computed)
+    return jsonify({"routes": routes, "next_cursor": next_cursor}), 200
+
+@main.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    # Prometheus 스크레이프용 (로그인 불필요)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@main.route('/cache_stats', methods=['GET'])
+@login_required
+def cache_stats():
+    return jsonify({"places": places_cache.stats(), "semantic": semantic_cache.stats(), "place_index": place_index.stats(),
+                    "directions": directions_service.stats()}), 200
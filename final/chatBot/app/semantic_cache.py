@@ -0,0 +1,129 @@
+import hashlib
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+import numpy as np
+
+
+def hashing_embedding(text, dims=256):
+    # 오프라인에서도 쓸 수 있는 결정적 임베딩: 문자 2/3-gram 해시 벡터 (L2 정규화)
+    normalized = " " + re.sub(r'\s+', ' ', text.strip().lower()) + " "
+    vector = np.zeros(dims)
+    for n in (2, 3):
+        for i in range(len(normalized) - n + 1):
+            vector[zlib.crc32(normalized[i:i + n].encode('utf-8')) % dims] += 1
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def azure_embedding(config):
+    from langchain_openai import AzureOpenAIEmbeddings
+    embeddings = AzureOpenAIEmbeddings(
+        azure_deployment=config['AZURE_OPENAI_EMBEDDING_DEPLOYMENT'],
+        azure_endpoint=config['AZURE_OPENAI_ENDPOINT'],
+        openai_api_key=config['AZURE_OPENAI_API_KEY'],
+        api_version=config['OPENAI_API_VERSION'],
+    )
+
+    def embed(text):
+        vector = np.array(embeddings.embed_query(text))
+        return vector / np.linalg.norm(vector)
+    return embed
+
+
+class SemanticCache:
+    # /search 추천 결과 캐시: 같은 격자 셀 + 입력 임베딩 코사인 유사도 >= threshold 이면 재사용
+    # 후보 장소 집합이 바뀌면 해당 항목은 무효화
+    def __init__(self, embed=hashing_embedding, threshold=0.9, ttl=600, max_entries=1000, grid_precision=3):
+        self.embed = embed
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.grid_precision = grid_precision
+        self.entries = OrderedDict()  # entry id -> entry
+        self.cells = {}               # cell -> {entry id}
+        self.next_id = 0
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self.lock = threading.Lock()
+
+    def init_app(self, app):
+        config = app.config
+        self.embed = azure_embedding(config) if config['SEMANTIC_CACHE_EMBEDDING'] == 'azure' else hashing_embedding
+        self.threshold = config['SEMANTIC_CACHE_THRESHOLD']
+        self.ttl = config['SEMANTIC_CACHE_TTL']
+        self.max_entries = config['SEMANTIC_CACHE_MAX_ENTRIES']
+        self.grid_precision = config['PLACES_CACHE_GRID_PRECISION']
+
+    def cell(self, lat, lng):
+        return (round(float(lat), self.grid_precision), round(float(lng), self.grid_precision))
+
+    @staticmethod
+    def fingerprint(candidate_ids):
+        return hashlib.sha1("\n".join(sorted(candidate_ids)).encode('utf-8')).hexdigest()
+
+    def _remove(self, entry_id):
+        entry = self.entries.pop(entry_id)
+        ids = self.cells.get(entry['cell'])
+        ids.discard(entry_id)
+        if not ids:
+            del self.cells[entry['cell']]
+
+    def lookup(self, lat, lng, user_input, candidate_ids):
+        # (캐시된 값 또는 None, 입력 임베딩): 놓치면 같은 임베딩을 store 에 넘겨 다시 계산하지 않음
+        cell = self.cell(lat, lng)
+        embedding = self.embed(user_input)
+        fingerprint = self.fingerprint(candidate_ids)
+        now = time.time()
+        with self.lock:
+            best_id, best_score = None, self.threshold
+            for entry_id in list(self.cells.get(cell, ())):
+                entry = self.entries[entry_id]
+                score = float(np.dot(entry['embedding'], embedding))
+                if entry['expires_at'] <= now or (score >= self.threshold and entry['fingerprint'] != fingerprint):
+                    self._remove(entry_id)  # 만료 또는 후보 집합 변경
+                elif score >= best_score:
+                    best_id, best_score = entry_id, score
+            if best_id is None:
+                self.misses += 1
+                return None, embedding
+            entry = self.entries[best_id]
+            self.entries.move_to_end(best_id)
+            self.hits += 1
+            self.saved_seconds += entry['latency']
+            return entry['value'], embedding
+
+    def store(self, lat, lng, user_input, candidate_ids, value, latency, embedding=None):
+        cell = self.cell(lat, lng)
+        entry = {
+            'cell': cell,
+            'embedding': self.embed(user_input) if embedding is None else embedding,
+            'fingerprint': self.fingerprint(candidate_ids),
+            'value': value,
+            'latency': latency,
+            'expires_at': time.time() + self.ttl,
+        }
+        with self.lock:
+            entry_id = self.next_id
+            self.next_id += 1
+            self.entries[entry_id] = entry
+            self.cells.setdefault(cell, set()).add(entry_id)
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "saved_llm_seconds": round(self.saved_seconds, 3),
+                "size": len(self.entries),
+            }
+
+
+semantic_cache = SemanticCache()
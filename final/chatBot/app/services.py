@@ -1,10 +1,29 @@
-import requests
-import re
-import json
-from langchain_openai import AzureChatOpenAI
+import contextvars
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from config import Config
+from .cache import places_cache
+from .llm import model_registry
+from .metrics import metrics
+from .places_client import places_client, PlacesError
+from .place_index import place_index
+from .parsing import parse_recommendations
 
-def search_nearby_places(lat, lng, google_maps_api_key, radius=1000, place_type="point_of_interest"):
-    url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+# 상세 정보 조회용 공용 스레드 풀 (동시 요청 수 제한)
+details_executor = ThreadPoolExecutor(max_workers=Config.PLACES_MAX_WORKERS)
+# 주변 검색 다음 페이지 조회용 (토큰 대기 sleep 이 상세 조회 풀을 막지 않도록 분리)
+page_executor = ThreadPoolExecutor(max_workers=Config.PLACES_MAX_WORKERS)
+PAGE_TOKEN_ATTEMPTS = 3
+# Google 주변 검색은 next_page_token 을 따라가도 3페이지, 최대 60개까지만 돌려줌
+NEARBY_MAX_PAGES = 3
+NEARBY_RESULT_LIMIT = 60
+# 여러 타입 주변 검색 동시 실행용
+nearby_executor = ThreadPoolExecutor(max_workers=Config.PLACES_MAX_WORKERS)
+
+def nearby_search_request(lat, lng, google_maps_api_key, radius=1000, place_type="point_of_interest"):
+    # (url, params, 캐시 키) — 동기/비동기 클라이언트 공용
+    url = f"{Config.PLACES_API_BASE_URL}/nearbysearch/json"
     params = {
         "location": f"{lat},{lng}",
         "radius": radius,
@@ -12,40 +31,175 @@ def search_nearby_places(lat, lng, google_maps_api_key, radius=1000, place_type=
         "language": "ko",
         "type": place_type
     }
+    return url, params, places_cache.nearby_key(lat, lng, radius, place_type)
 
-    response = requests.get(url, params=params)
-    if response.status_code == 200:
-        return response.json().get('results', [])
-    return []
-
-def get_place_details(place_id, google_maps_api_key):
-    url = "https://maps.googleapis.com/maps/api/place/details/json"
+def place_details_request(place_id, google_maps_api_key):
+    url = f"{Config.PLACES_API_BASE_URL}/details/json"
     params = {
         "place_id": place_id,
         "fields": "name,rating,formatted_address,reviews,geometry",
         "key": google_maps_api_key,
         "language": "ko"
     }
-    response = requests.get(url, params=params)
-    if response.status_code == 200:
-        return response.json().get('result', {})
-    return {}
-
-def summarize_places_with_gpt(prompt, config):
-    model = AzureChatOpenAI(
-        azure_deployment=config['AZURE_OPENAI_DEPLOYMENT'],
-        openai_api_key=config['AZURE_OPENAI_API_KEY'],
-        api_version=config['OPENAI_API_VERSION'],
-        temperature=0.7
-    )
+    return url, params, places_cache.details_key(place_id)
+
+def index_fetcher(google_maps_api_key, place_type, timeout=Config.PLACES_TIMEOUT):
+    # 로컬 장소 색인이 빈/오래된 타일을 채울 때 쓰는 조회 함수 (색인의 백그라운드 스레드에서 실행) — 동기/비동기 공용
+    # 응답을 기다리는 요청이 없으므로 다음 페이지를 끝까지 따라가고 (결과, 잘리지 않고 다 받았는지) 반환
+    def fetch(lat, lng, radius):
+        url, params, _ = nearby_search_request(lat, lng, google_maps_api_key, radius, place_type)
+        body = places_client.get_json('places_nearby', url, params, timeout)
+        pages = [body.get('results', [])]
+        page_token = fetch_next_pages(body.get('next_page_token'), google_maps_api_key, timeout,
+                                      NEARBY_MAX_PAGES - 1, math.inf, pages)
+        complete = not page_token and sum(map(len, pages)) < NEARBY_RESULT_LIMIT
+        return merge_places(*pages), complete
+    return fetch
+
+def remember_nearby(cache_key, results):
+    # Google 에서 받은 주변 검색 결과를 응답 캐시와 로컬 장소 색인에 반영 — 동기/비동기 공용
+    places_cache.set(cache_key, results)
+    if place_index.enabled:
+        place_index.add_places(results)
+
+@metrics.stage('places_nearby')
+def search_nearby_places(lat, lng, google_maps_api_key, radius=1000, place_type="point_of_interest", timeout=Config.PLACES_TIMEOUT):
+    url, params, cache_key = nearby_search_request(lat, lng, google_maps_api_key, radius, place_type)
+    cached = places_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # 로컬 장소 색인이 반경을 덮고 있으면 Google 호출 없이 응답
+    fetch = index_fetcher(google_maps_api_key, place_type, timeout)
+    results = place_index.search(lat, lng, radius, place_type, fetch) if place_index.enabled else None
+    if results is None:
+        results = fetch_nearby_places(lat, lng, google_maps_api_key, radius, place_type, timeout,
+                                      on_results=lambda results: remember_nearby(cache_key, results))
+    else:
+        places_cache.set(cache_key, results)
+    return results
+
+def search_nearby_places_by_types(lat, lng, google_maps_api_key, place_types, radius=1000, timeout=Config.PLACES_TIMEOUT):
+    # 타입마다 주변 검색을 동시에 실행해 {타입: 결과} 반환 (입력 순서 유지), 일부 타입만 실패하면 그 타입은 빈 결과
+    futures = {place_type: nearby_executor.submit(contextvars.copy_context().run, search_nearby_places, lat, lng,
+                                                  google_maps_api_key, radius, place_type, timeout)
+               for place_type in place_types}
+    results, errors = {}, []
+    for place_type, future in futures.items():
+        try:
+            results[place_type] = future.result()
+        except PlacesError as e:
+            results[place_type] = []
+            errors.append(e)
+    if len(errors) == len(futures):
+        raise errors[0]
+    return results
+
+def merge_places(*pages):
+    # place_id 기준 중복 제거 (먼저 나온 항목 유지)
+    merged = {}
+    for page in pages:
+        for place in page:
+            merged.setdefault(place.get('place_id'), place)
+    return list(merged.values())
+
+def fetch_nearby_places(lat, lng, google_maps_api_key, radius=1000, place_type="point_of_interest", timeout=Config.PLACES_TIMEOUT, on_results=None):
+    # 캐시/색인을 거치지 않는 Google 주변 검색, 재시도 후에도 실패하면 PlacesError (빈 결과로 숨기지 않음)
+    # PLACES_MAX_PAGES > 1 이면 next_page_token 을 따라 다음 페이지를 백그라운드에서 받기 시작하고 PLACES_PAGES_WAIT 까지만 기다림,
+    # 그 뒤에 도착한 페이지는 합쳐서 on_results 로 한 번 더 넘김 (캐시/색인 갱신용)
+    url, params, _ = nearby_search_request(lat, lng, google_maps_api_key, radius, place_type)
+    body = places_client.get_json('places_nearby', url, params, timeout)
+    results = merge_places(body.get('results', []))
+    page_token = body.get('next_page_token')
+    if not page_token or Config.PLACES_MAX_PAGES <= 1 or len(results) >= Config.PLACES_MIN_CANDIDATES:
+        if on_results is not None:
+            on_results(results)
+        return results
+
+    pages = [results]  # 백그라운드 작업이 받은 페이지를 이어 붙임
+    future = page_executor.submit(contextvars.copy_context().run, fetch_next_pages, page_token, google_maps_api_key, timeout,
+                                  Config.PLACES_MAX_PAGES - 1, Config.PLACES_MIN_CANDIDATES - len(results), pages)
+    try:
+        future.result(timeout=Config.PLACES_PAGES_WAIT)
+    except FuturesTimeoutError:
+        # 기다린 시간 안에 도착한 페이지까지만 사용
+        if on_results is not None:
+            future.add_done_callback(lambda done: on_results(merge_places(*pages)))
+    except PlacesError:
+        pass  # 받은 페이지까지만 사용
+    results = merge_places(*list(pages))
+    if on_results is not None:
+        on_results(results)
+    return results
+
+def fetch_next_pages(page_token, google_maps_api_key, timeout, max_pages, needed, pages):
+    # next_page_token 을 따라 최대 max_pages 페이지를 받아 pages 에 이어 붙임, 새 place_id 가 needed 개 이상 모이면 중단
+    # 따라가지 않고 남은 next_page_token 을 반환 (없으면 None)
+    # 토큰은 발급 직후 잠시 INVALID_REQUEST 이므로 PLACES_PAGE_TOKEN_DELAY 간격으로 몇 번 다시 시도
+    seen_ids = {place.get('place_id') for page in pages for place in page}
+    for _ in range(max_pages):
+        if not page_token or needed <= 0:
+            break
+        url = f"{Config.PLACES_API_BASE_URL}/nearbysearch/json"
+        params = {"pagetoken": page_token, "key": google_maps_api_key}
+        for attempt in range(PAGE_TOKEN_ATTEMPTS):
+            time.sleep(Config.PLACES_PAGE_TOKEN_DELAY)
+            try:
+                body = places_client.get_json('places_nearby_page', url, params, timeout)
+                break
+            except PlacesError as e:
+                if e.status != 'INVALID_REQUEST' or attempt == PAGE_TOKEN_ATTEMPTS - 1:
+                    raise
+        page = body.get('results', [])
+        pages.append(page)
+        new_ids = {place.get('place_id') for place in page} - seen_ids
+        seen_ids |= new_ids
+        needed -= len(new_ids)
+        page_token = body.get('next_page_token')
+    return page_token
+
+@metrics.stage('place_details')
+def get_place_details(place_id, google_maps_api_key, timeout=Config.PLACES_TIMEOUT):
+    url, params, cache_key = place_details_request(place_id, google_maps_api_key)
+    cached = places_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    body = places_client.get_json('places_details', url, params, timeout)
+    result = body.get('result', {})
+    # ZERO_RESULTS 등 결과 없는 응답은 캐시하지 않음 (다음 요청에서 다시 조회)
+    if body.get('status', 'OK') == 'OK':
+        places_cache.set(cache_key, result)
+    return result
+
+def _get_place_details_safe(place_id, google_maps_api_key, timeout):
+    try:
+        return get_place_details(place_id, google_maps_api_key, timeout=timeout)
+    except PlacesError:
+        return {}
+
+def submit_place_details(place_id, google_maps_api_key, timeout=Config.PLACES_TIMEOUT):
+    # 공용 스레드 풀에 상세 정보 조회를 맡기고 Future 반환 (실패/타임아웃은 {}), 추적 ID 가 이어지도록 컨텍스트 복사
+    return details_executor.submit(contextvars.copy_context().run, _get_place_details_safe, place_id, google_maps_api_key, timeout)
+
+def get_places_details(place_ids, google_maps_api_key, timeout=Config.PLACES_TIMEOUT):
+    # place_id 별 상세 정보를 동시에 조회 (입력 순서 유지)
+    futures = [submit_place_details(place_id, google_maps_api_key, timeout) for place_id in place_ids]
+    return [future.result() for future in futures]
+
+def record_token_usage(message):
+    # AIMessage(Chunk) 의 usage_metadata 를 토큰 카운터에 반영 (없으면 무시)
+    usage = getattr(message, 'usage_metadata', None)
+    if usage:
+        metrics.inc('llm_tokens_total', usage.get('input_tokens', 0), kind='prompt')
+        metrics.inc('llm_tokens_total', usage.get('output_tokens', 0), kind='completion')
+
+@metrics.stage('llm')
+def summarize_places_with_gpt(prompt, config, valid_ids=None):
+    # JSON 모드로 한 번 호출하고 관대한 파서로 (요약, 중복 없는 place_id 목록) 추출, 재요청하지 않음
+    model = model_registry.get(config['AZURE_OPENAI_DEPLOYMENT']).bind(response_format={"type": "json_object"})
     response = model.invoke(prompt)
-    model_output = response.content
-    json_string = model_output.strip()[7:-4]
-    data = json.loads(json_string)
-    place_ids = [place['place_id'] for place in data]
-    #place_ids_1 = re.findall(r'- \*\*place_id\*\*:? *([A-Za-z0-9_-]+)', model_output)
-    #place_ids_2 = re.findall(r'- \*\*place_id:\*\*? *([A-Za-z0-9_-]+)', model_output)
-    #place_ids_3 = re.findall(r'place_id:\s*([A-Za-z0-9_-]+)', model_output)
-    print(place_ids)
-    #place_ids = place_ids_1 + place_ids_2 + place_ids_3
-    return model_output, place_ids
+    record_token_usage(response)
+    model_output = response.content.strip()
+    summary, place_ids = parse_recommendations(model_output, valid_ids)
+    return summary or model_output, place_ids
@@ -0,0 +1,7 @@
+# 비동기(ASGI) 실행: uvicorn asgi:app --port 5000
+# /search, /search/stream 은 async 핸들러로, 나머지 화면/API 는 기존 Flask 앱으로 처리
+# 대기(Places/LLM)에는 스레드를 쓰지 않지만 이벤트 루프 하나는 CPU 코어 하나까지만 쓰므로 코어 수만큼 --workers 지정
+from app import create_app
+from app.aio import create_asgi_app
+
+app = create_asgi_app(create_app())
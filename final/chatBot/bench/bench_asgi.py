@@ -0,0 +1,176 @@
+# 동기(Flask, 워커 스레드 N개) vs 비동기(ASGI) /search 부하 테스트: 처리량과 p50/p99 지연
+# 비동기 모드는 Places/LLM 대기에 스레드를 쓰지 않으므로 처리량 상한은 동시 요청 수 / 지연이 아니라 이벤트 루프의 CPU 시간
+# (요청당 OpenAI SDK 요청 구성 + httpx/httpcore 커넥션 풀 관리, 풀 관리는 커넥션 수에 따라 늘어남)
+# 부하 생성기와 스텁 서버도 같은 프로세스에서 CPU 를 나눠 쓰므로 코어 하나에서는 이상치에 못 미침,
+# 운영에서는 uvicorn --workers 로 코어마다 이벤트 루프를 하나씩 둠
+# 실행 (final/chatBot 에서): python -m bench.bench_asgi --concurrency 200 --requests 600 --sync-threads 16
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import logging
+
+import httpx
+
+from bench import stub_openai, stub_places
+
+
+def start_sync_server(flask_app, threads):
+    # gunicorn gthread 처럼 고정된 수의 워커 스레드로 요청을 처리하는 WSGI 서버
+    from werkzeug.serving import BaseWSGIServer
+
+    pool = ThreadPoolExecutor(max_workers=threads)
+
+    class PooledWSGIServer(BaseWSGIServer):
+        request_queue_size = 1024
+
+        def process_request(self, request, client_address):
+            pool.submit(self.process_request_thread, request, client_address)
+
+        def process_request_thread(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    server = PooledWSGIServer("127.0.0.1", 0, flask_app)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def start_asgi_server(asgi_app):
+    import socket
+    import uvicorn
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    server = uvicorn.Server(uvicorn.Config(asgi_app, host="127.0.0.1", port=port, log_level="warning",
+                                           backlog=2048, timeout_keep_alive=30))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def run_load(base_url, total, concurrency):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        await client.post("/login", data={"username": "user1", "password": "password1"})
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        errors = 0
+
+        async def one(i):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/search", json={"lat": 37.5665, "lng": 126.9780, "user_input": f"맛집 추천 {i}"})
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 1),
+        "errors": errors,
+    }
+
+
+async def search_status(base_url, lat, lng):
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        await client.post("/login", data={"username": "user1", "password": "password1"})
+        response = await client.post("/search", json={"lat": lat, "lng": lng, "user_input": "맛집 추천"})
+        return response.status_code
+
+
+def check_parity(sync_url, asgi_url, places_server):
+    # 두 실행 모드가 같은 상황에서 같게 동작하는지 (캐시에 없는 좌표 사용)
+    # 로컬 장소 색인: 첫 검색이 타일을 채우면, 같은 타일들 안의 다음 검색(places_cache 키는 다름)은 색인에서 응답
+    from app.place_index import place_index
+    for offset, (name, url) in enumerate([("sync", sync_url), ("async", asgi_url)]):
+        lat, lng = place_index.tile_center(place_index.tile_of(36.0 + offset * 0.1, 127.0))
+        asyncio.run(search_status(url, lat, lng))
+        while place_index.stats()["refreshing"]:
+            time.sleep(0.05)
+        hits = place_index.stats()["hits"]
+        assert asyncio.run(search_status(url, lat + 0.003, lng)) == 200
+        print(f"place index ({name}): second search in the same tiles -> {place_index.stats()['hits'] - hits} index hit")
+        assert place_index.stats()["hits"] == hits + 1, name
+
+    # Places 장애: 두 모드 모두 503
+    handler = places_server.RequestHandlerClass
+    handler.fail_rate = 1.0
+    statuses = {name: asyncio.run(search_status(url, 35.1 + offset, 129.0))
+                for offset, (name, url) in enumerate([("sync", sync_url), ("async", asgi_url)])}
+    handler.fail_rate = 0.0
+    print(f"places outage: {statuses}")
+    assert statuses == {"sync": 503, "async": 503}, statuses
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=600)
+    parser.add_argument("--sync-threads", type=int, default=16)
+    parser.add_argument("--llm-delay", type=float, default=2.0)
+    parser.add_argument("--places-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    # 장애 확인 중 실패하는 백그라운드 색인 갱신 로그
+    logging.getLogger("app.place_index").setLevel(logging.CRITICAL)
+    llm_server, endpoint = stub_openai.start_stub_server(delay=args.llm_delay)
+    places_server, places_url = stub_places.start_stub_server(delay=args.places_delay)
+    data_dir = tempfile.mkdtemp()
+    os.environ.update({
+        "AZURE_OPENAI_ENDPOINT": endpoint,
+        "AZURE_OPENAI_API_KEY": "stub-key",
+        "AZURE_OPENAI_DEPLOYMENT": "stub-deployment",
+        "OPENAI_API_VERSION": "2024-02-01",
+        "PLACES_API_BASE_URL": places_url,
+        "GOOGLE_MAPS_API_KEY": "stub-key",
+        "USER_DB_PATH": os.path.join(data_dir, "users.db"),
+        "ROUTE_DB_PATH": os.path.join(data_dir, "routes.db"),
+        "SEMANTIC_CACHE_THRESHOLD": "2",
+        "LLM_MAX_CONNECTIONS": str(args.sync_threads),
+        "PLACE_INDEX_ENABLED": "true",
+        "PLACE_INDEX_PATH": os.path.join(data_dir, "place_index.db"),
+        # 타일 중심의 반경 1km 검색이 타일 하나에 들어가도록 (스텁은 어느 타일에서나 같은 place_id 를 돌려주므로
+        # 여러 타일을 채우면 장소 위치가 마지막에 채운 타일로 옮겨 다님)
+        "PLACE_INDEX_TILE_DEGREES": "0.05",
+    })
+    from app import create_app
+    from app.aio import create_asgi_app
+
+    flask_app = create_app()
+    sync_server, sync_url = start_sync_server(flask_app, args.sync_threads)
+    asgi_server, asgi_url = start_asgi_server(create_asgi_app(flask_app))
+
+    print(f"requests={args.requests} concurrency={args.concurrency} llm_delay={args.llm_delay * 1000:.0f}ms "
+          f"cpus={os.cpu_count()} (wait-bound ideal {args.concurrency / max(args.llm_delay, 1e-3):.0f} rps)")
+    print(f"sync  ({args.sync_threads} worker threads): {asyncio.run(run_load(sync_url, args.requests, args.concurrency))}")
+    print(f"async (1 process, 1 event loop): {asyncio.run(run_load(asgi_url, args.requests, args.concurrency))}")
+    check_parity(sync_url, asgi_url, places_server)
+
+    asgi_server.should_exit = True
+    sync_server.shutdown()
+    llm_server.shutdown()
+    places_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
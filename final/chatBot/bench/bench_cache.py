@@ -0,0 +1,47 @@
+# Places 응답 캐시 동작 확인: 스텁 서버 호출 수와 캐시 적중률 출력
+# 실행 (final/chatBot 에서): python -m bench.bench_cache --backend sqlite
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from bench.stub_places import start_stub_server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(delay=args.delay)
+    os.environ["PLACES_API_BASE_URL"] = base_url
+    from app.cache import places_cache, MemoryBackend, SQLiteBackend
+    from app.services import search_nearby_places, get_place_details
+
+    if args.backend == "sqlite":
+        places_cache.backend = SQLiteBackend(os.path.join(tempfile.mkdtemp(), "places_cache.db"))
+    else:
+        places_cache.backend = MemoryBackend()
+
+    # 같은 동네(수십 m 이내)에서 반복되는 검색을 흉내냄
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        lat = 37.5665 + random.uniform(-0.0004, 0.0004)
+        lng = 126.9780 + random.uniform(-0.0004, 0.0004)
+        places = search_nearby_places(lat, lng, "stub-key")
+        for place in places[:3]:
+            get_place_details(place["place_id"], "stub-key")
+    elapsed = time.perf_counter() - start
+
+    print(f"backend={args.backend} requests={args.requests}")
+    print(f"upstream calls: {server.request_count}")
+    print(f"cache stats: {places_cache.stats()}")
+    print(f"total: {elapsed * 1000:.1f}ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# 장소 상세 정보 조회: 순차 vs 동시 조회 지연 시간 비교
+# 실행 (final/chatBot 에서): python -m bench.bench_details --delay 0.2 --count 3
+import argparse
+import os
+import time
+
+from bench.stub_places import start_stub_server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay", type=float, default=0.2)
+    parser.add_argument("--count", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(delay=args.delay)
+    os.environ["PLACES_API_BASE_URL"] = base_url
+    from app.services import get_place_details, get_places_details
+
+    # 캐시 적중을 피하기 위해 라운드마다 다른 place_id 사용
+    def place_ids(prefix, round_index):
+        return [f"{prefix}_{round_index}_{i}" for i in range(args.count)]
+
+    start = time.perf_counter()
+    for round_index in range(args.rounds):
+        [get_place_details(place_id, "stub-key") for place_id in place_ids("seq", round_index)]
+    sequential = (time.perf_counter() - start) / args.rounds
+
+    start = time.perf_counter()
+    for round_index in range(args.rounds):
+        get_places_details(place_ids("con", round_index), "stub-key")
+    concurrent = (time.perf_counter() - start) / args.rounds
+
+    print(f"places={args.count} upstream_delay={args.delay * 1000:.0f}ms")
+    print(f"sequential: {sequential * 1000:.1f}ms")
+    print(f"concurrent: {concurrent * 1000:.1f}ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
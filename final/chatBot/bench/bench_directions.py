@@ -0,0 +1,101 @@
+# 저장 경로의 서버 측 Directions 계산: 저장/반복 조회 시 upstream 호출 수, 여러 경로의 동시 계산 vs 순차 계산
+# 실행 (final/chatBot 에서): python -m bench.bench_directions --routes 20 --delay 0.1
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from bench import stub_places
+
+
+def random_route(stops):
+    return [{"lat": 37.5 + random.random() * 0.1, "lng": 127.0 + random.random() * 0.1} for _ in range(stops)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--routes", type=int, default=20)
+    parser.add_argument("--views", type=int, default=5, help="/get_routes 반복 조회 횟수")
+    parser.add_argument("--delay", type=float, default=0.1, help="스텁 Directions 응답 지연(초)")
+    args = parser.parse_args()
+
+    server, base_url = stub_places.start_stub_server(delay=args.delay)
+    os.environ.update({
+        "DIRECTIONS_PROVIDER": "google",
+        "DIRECTIONS_API_BASE_URL": base_url,
+        "PLACES_API_BASE_URL": base_url,
+        "GOOGLE_MAPS_API_KEY": "stub-key",
+        "USER_DB_PATH": os.path.join(tempfile.mkdtemp(), "users.db"),
+        "ROUTE_DB_PATH": os.path.join(tempfile.mkdtemp(), "routes.db"),
+    })
+    from app import create_app
+    from app.directions import directions_service
+    from app.route_store import route_store
+
+    app = create_app()
+    client = app.test_client()
+    client.post('/login', data={"username": "user1", "password": "password1"})
+
+    # 1) 일괄 저장 후 반복 조회
+    before = server.request_count
+    response = client.post('/save_route', json={"routes": [random_route(3) for _ in range(args.routes)], "travel_mode": "WALKING"})
+    assert response.status_code == 200, response.get_json()
+    saved_calls = server.request_count - before
+    before = server.request_count
+    for _ in range(args.views):
+        routes = client.get(f'/get_routes?limit={args.routes}').get_json()["routes"]
+        assert all(route["path"] and route["travel_mode"] == "WALKING" for route in routes)
+    print(f"save {args.routes} routes: {saved_calls} upstream calls, {args.views} views: {server.request_count - before} upstream calls")
+
+    # 2) 도형 없이 저장된 기존 경로: 첫 조회에서만 계산 후 저장
+    user_id = "1"
+    route_store.add_many(user_id, [random_route(3) for _ in range(args.routes)])
+    view_calls = []
+    for _ in range(args.views):
+        before = server.request_count
+        routes = client.get(f'/get_routes?limit={args.routes}').get_json()["routes"]
+        assert all(route["path"] for route in routes)
+        view_calls.append(server.request_count - before)
+    print(f"legacy routes without geometry, upstream calls per view: {view_calls}")
+
+    # 3) 계산할 수 없는 경로 (TRANSIT + 경유지 -> INVALID_REQUEST): 실패 상태로 저장되어 반복 조회 때 다시 부르지 않음
+    before = server.request_count
+    response = client.post('/save_route', json={"routes": [random_route(3) for _ in range(args.routes)], "travel_mode": "TRANSIT"})
+    assert response.status_code == 200, response.get_json()
+    saved_calls = server.request_count - before
+    before = server.request_count
+    for _ in range(args.views):
+        routes = client.get(f'/get_routes?limit={args.routes}').get_json()["routes"]
+        assert all(route["path"] is None and route["directions_status"] == "INVALID_REQUEST" for route in routes)
+    view_calls = server.request_count - before
+    assert view_calls == 0, view_calls
+    print(f"unroutable routes: save {saved_calls} upstream calls, {args.views} views: {view_calls} upstream calls")
+
+    # 4) 형식이 잘못된 응답 (overview_polyline 없음): 500 없이 도형 없이 저장, 정상 응답이 오면 조회 때 계산
+    server.RequestHandlerClass.directions_malformed = True
+    response = client.post('/save_route', json={"routes": [random_route(3)], "travel_mode": "BICYCLING"})
+    assert response.status_code == 200, response.get_json()
+    server.RequestHandlerClass.directions_malformed = False
+    routes = client.get('/get_routes?limit=1').get_json()["routes"]
+    assert routes[0]["path"] and routes[0]["directions_status"] == "OK", routes[0]
+    print("malformed directions body: saved without geometry, computed on next view")
+
+    # 5) 동시 계산 vs 순차 계산 (캐시를 피하려고 매번 새 경로)
+    batch = [random_route(4) for _ in range(args.routes)]
+    start = time.perf_counter()
+    for points in batch:
+        directions_service.route(points, "DRIVING")
+    serial = time.perf_counter() - start
+    batch = [random_route(4) for _ in range(args.routes)]
+    start = time.perf_counter()
+    results = directions_service.route_many(batch + batch[:5], "DRIVING")  # 중복 5개 포함
+    batched = time.perf_counter() - start
+    assert all(results)
+    print(f"{args.routes} routes serial: {serial * 1000:.0f}ms, batched (+5 duplicates): {batched * 1000:.0f}ms")
+    print(f"directions stats: {directions_service.stats()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
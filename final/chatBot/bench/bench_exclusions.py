@@ -0,0 +1,56 @@
+# 제외 목록이 쌓일 때 요청당 필터링 비용: 전역 list vs 사용자별 ExclusionStore
+# 실행 (final/chatBot 에서): python -m bench.bench_exclusions --requests 6000 --backend sqlite
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from app.exclusions import ExclusionStore, MemoryExclusionBackend, SQLiteExclusionBackend
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "nearby_search_seoul.json")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=6000)
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--report-every", type=int, default=1500)
+    args = parser.parse_args()
+
+    with open(FIXTURE, encoding="utf-8") as f:
+        places = json.load(f)["results"]
+
+    if args.backend == "sqlite":
+        backend = SQLiteExclusionBackend(os.path.join(tempfile.mkdtemp(), "exclusions.db"))
+    else:
+        backend = MemoryExclusionBackend()
+    store = ExclusionStore(backend)
+
+    legacy_list = []
+    legacy_total = store_total = 0.0
+    print(f"backend={args.backend}")
+    for i in range(1, args.requests + 1):
+        # 요청마다 새로 추천된 3개를 제외 목록에 추가
+        received = [f"seen_{i}_{j}" for j in range(3)]
+
+        start = time.perf_counter()
+        legacy_list.extend(received)
+        [place for place in places if place['place_id'] not in legacy_list]
+        legacy_total += time.perf_counter() - start
+
+        start = time.perf_counter()
+        store.add("user1", received)
+        excluded = store.get("user1")
+        [place for place in places if place['place_id'] not in excluded]
+        store_total += time.perf_counter() - start
+
+        if i % args.report_every == 0:
+            print(f"after {i:>6} requests: legacy {legacy_total / args.report_every * 1e6:8.1f}us/req "
+                  f"(list size {len(legacy_list)}), store {store_total / args.report_every * 1e6:6.1f}us/req "
+                  f"(set size {len(excluded)})")
+            legacy_total = store_total = 0.0
+
+
+if __name__ == "__main__":
+    main()
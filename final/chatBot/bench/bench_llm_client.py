@@ -0,0 +1,56 @@
+# 요청마다 AzureChatOpenAI 생성 vs ModelRegistry 재사용 오버헤드 비교
+# 실행 (final/chatBot 에서): python -m bench.bench_llm_client --calls 50
+import argparse
+import os
+import time
+
+from bench.stub_openai import start_stub_server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+
+    server, endpoint = start_stub_server()
+    os.environ.update({
+        "AZURE_OPENAI_ENDPOINT": endpoint,
+        "AZURE_OPENAI_API_KEY": "stub-key",
+        "AZURE_OPENAI_DEPLOYMENT": "stub-deployment",
+        "OPENAI_API_VERSION": "2024-02-01",
+    })
+    from langchain_openai import AzureChatOpenAI
+    from app import create_app
+    from app.llm import model_registry
+
+    app = create_app()
+    config = app.config
+
+    def per_request_model():
+        return AzureChatOpenAI(
+            azure_deployment=config['AZURE_OPENAI_DEPLOYMENT'],
+            openai_api_key=config['AZURE_OPENAI_API_KEY'],
+            api_version=config['OPENAI_API_VERSION'],
+            temperature=0.7
+        )
+
+    per_request_model().invoke("warmup")
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        per_request_model().invoke("안녕")
+    before = (time.perf_counter() - start) / args.calls
+
+    model_registry.get().invoke("warmup")
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        model_registry.get().invoke("안녕")
+    after = (time.perf_counter() - start) / args.calls
+
+    print(f"calls={args.calls} (stub model, no injected latency)")
+    print(f"new client per request: {before * 1000:.2f}ms/call")
+    print(f"shared registry client: {after * 1000:.2f}ms/call")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# 주변 검색 페이지네이션: 페이지 수/조기 중단/대기 한도별 후보 수와 지연, 늦게 온 페이지의 캐시 반영 확인
+# 실행 (final/chatBot 에서): python -m bench.bench_pagination --token-delay 0.3
+import argparse
+import os
+import tempfile
+import time
+
+from bench import stub_places
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--token-delay", type=float, default=0.3, help="스텁의 next_page_token 활성화 지연(초)")
+    parser.add_argument("--places-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    server, base_url = stub_places.start_stub_server(delay=args.places_delay, pages=3, page_token_delay=args.token_delay)
+    os.environ.update({
+        "PLACES_API_BASE_URL": base_url,
+        "PLACES_PAGE_TOKEN_DELAY": str(args.token_delay + 0.05),
+        "USER_DB_PATH": os.path.join(tempfile.mkdtemp(), "users.db"),
+        "ROUTE_DB_PATH": os.path.join(tempfile.mkdtemp(), "routes.db"),
+    })
+    from app import create_app
+    from app.cache import places_cache
+    from app.services import search_nearby_places
+    from config import Config
+
+    create_app()
+    scenarios = [
+        ("1 page (default)", 1, 40, 10.0),
+        ("up to 3 pages", 3, 100, 10.0),
+        ("up to 3 pages, stop at 30", 3, 30, 10.0),
+        ("up to 3 pages, wait 0.5s", 3, 100, 0.5),
+    ]
+    for i, (label, max_pages, min_candidates, wait) in enumerate(scenarios):
+        Config.PLACES_MAX_PAGES, Config.PLACES_MIN_CANDIDATES, Config.PLACES_PAGES_WAIT = max_pages, min_candidates, wait
+        lat, lng = 37.50 + i * 0.01, 127.0
+        before = server.request_count
+        start = time.perf_counter()
+        places = search_nearby_places(lat, lng, "stub-key")
+        elapsed = time.perf_counter() - start
+        ids = [place["place_id"] for place in places]
+        assert len(ids) == len(set(ids))
+        line = (f"{label:<28} {len(places):>3} candidates in {elapsed * 1000:6.0f}ms "
+                f"({server.request_count - before} upstream calls)")
+        if wait < 10:
+            time.sleep(2 * (args.token_delay + 0.05) + 0.5)
+            cached = places_cache.get(places_cache.nearby_key(lat, lng, 1000, "point_of_interest"))
+            line += f", cache after late pages: {len(cached)} candidates"
+        print(line)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# 추천 결과 파서: 깨진 출력 말뭉치 검증 + 무작위 변형 퍼징 + 처리량 측정
+# 실행 (final/chatBot 에서): python -m bench.bench_parser --fuzz 20000
+import argparse
+import json
+import os
+import random
+import time
+
+from app.parsing import PlaceIdStreamParser, parse_recommendations
+
+CORPUS = os.path.join(os.path.dirname(__file__), "fixtures", "malformed_outputs.json")
+
+
+def mutate(text):
+    # 잘라내기, 임의 문자 삽입, 일부 삭제
+    if not text:
+        return text
+    position = random.randrange(len(text))
+    choice = random.random()
+    if choice < 0.4:
+        return text[:position]
+    if choice < 0.7:
+        return text[:position] + random.choice(['{', '}', '[', ']', '"', '*', '`', ':', '\n', '가']) + text[position:]
+    return text[:position] + text[position + random.randint(1, 5):]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fuzz", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    with open(CORPUS, encoding="utf-8") as f:
+        cases = json.load(f)
+
+    for case in cases:
+        valid_ids = set(case["valid_ids"]) if "valid_ids" in case else None
+        summary, place_ids = parse_recommendations(case["text"], valid_ids)
+        assert place_ids == case["expected"], (case["name"], place_ids)
+        if "summary" in case:
+            assert summary == case["summary"], (case["name"], summary)
+    print(f"corpus: {len(cases)} cases ok")
+
+    # 퍼징: 예외가 나지 않고 결과에 중복이 없어야 함
+    # 스트리밍 파서는 JSON 이 아닌 출력에서 일괄 파서와 같은 결과를 내야 함
+    for _ in range(args.fuzz):
+        text = random.choice(cases)["text"]
+        for _ in range(random.randint(1, 3)):
+            text = mutate(text)
+        summary, place_ids = parse_recommendations(text)
+        assert len(place_ids) == len(set(place_ids))
+
+        stream_parser = PlaceIdStreamParser()
+        streamed = []
+        position = 0
+        while position < len(text):
+            size = random.randint(1, 6)
+            streamed += stream_parser.feed(text[position:position + size])
+            position += size
+        streamed += stream_parser.close()
+        assert len(streamed) == len(set(streamed))
+        if "{" not in text and "[" not in text:
+            assert streamed == place_ids, (text, streamed, place_ids)
+    print(f"fuzz: {args.fuzz} mutated outputs ok")
+
+    texts = [case["text"] for case in cases]
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for text in texts:
+            parse_recommendations(text)
+    elapsed = time.perf_counter() - start
+    total = args.rounds * len(texts)
+    print(f"throughput: {total / elapsed:,.0f} outputs/s "
+          f"({sum(map(len, texts)) * args.rounds / elapsed / 1e6:.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+# /search 파이프라인 부하 테스트: 처리량과 단계별(주변 검색, 프롬프트, LLM, 파싱, 상세 조회) p50/p95/p99
+# 스텁 Places/OpenAI 서버(지연 주입)를 띄우고 final/chatBot 과 api_test/server.py 를 동시 요청으로 호출
+# 결과는 JSON 으로 출력/저장해 커밋 간 회귀 비교에 사용
+# 실행 (final/chatBot 에서):
+#   python -m bench.bench_pipeline --target both --concurrency 16 --requests 200 --output bench_result.json
+#   python -m bench.bench_pipeline --compare bench_result.json   # 이전 결과와 비교
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from bench import stub_openai, stub_places
+
+API_TEST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "api_test")
+
+
+def pipeline_reply(request_body):
+    # api_test 의 JSON 모드는 place_ids 키를 읽으므로 기본 응답에 같이 넣어 줌
+    reply = stub_openai.default_reply(request_body)
+    if request_body.get("response_format", {}).get("type") != "json_object":
+        return reply
+    data = json.loads(reply)
+    data["place_ids"] = [place["place_id"] for place in data["places"]]
+    return json.dumps(data, ensure_ascii=False)
+
+
+def percentile(sorted_values, q):
+    # nearest-rank 백분위수
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class StageRecorder:
+    # 모듈 함수를 감싸 요청(스레드)별 단계 시간을 기록, 앱 코드는 수정하지 않음
+    def __init__(self):
+        self.local = threading.local()
+        self.samples = defaultdict(list)
+        self.lock = threading.Lock()
+
+    def wrap(self, module, name, stage):
+        original = getattr(module, name)
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                stages = getattr(self.local, "stages", None)
+                if stages is not None:
+                    stages[stage] = stages.get(stage, 0.0) + time.perf_counter() - start
+
+        setattr(module, name, timed)
+        return original
+
+    def begin(self):
+        self.local.stages = {}
+
+    def end(self, total, nested=()):
+        # nested: (바깥 단계, 안쪽 단계) — 바깥 단계 시간에서 안쪽 단계를 빼서 겹치지 않게 함
+        stages, self.local.stages = self.local.stages, None
+        for outer, inner in nested:
+            if outer in stages and inner in stages:
+                stages[outer] -= stages[inner]
+        stages["other"] = max(0.0, total - sum(stages.values()))
+        stages["total"] = total
+        with self.lock:
+            for stage, seconds in stages.items():
+                self.samples[stage].append(seconds)
+
+    def summary(self):
+        report = {}
+        for stage, values in self.samples.items():
+            values = sorted(values)
+            report[stage] = {
+                "count": len(values),
+                "mean_ms": round(sum(values) / len(values) * 1000, 2),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+            }
+        return report
+
+
+def run_load(make_client, send, recorder, total, concurrency, nested=()):
+    # concurrency 개의 스레드가 각자 테스트 클라이언트로 total 개의 요청을 나눠 보냄
+    local = threading.local()
+    errors = defaultdict(int)
+    errors_lock = threading.Lock()
+
+    def one(i):
+        if not hasattr(local, "client"):
+            local.client = make_client()
+        recorder.begin()
+        start = time.perf_counter()
+        status = send(local.client, i)
+        recorder.end(time.perf_counter() - start, nested)
+        if status != 200:
+            with errors_lock:
+                errors[str(status)] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": dict(errors),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2),
+        "stages": recorder.summary(),
+    }
+
+
+def search_body(i):
+    # 요청마다 격자 셀과 질문을 바꿔 주변 검색/의미 캐시가 적중하지 않도록
+    return {"lat": 37.5665 + (i % 50) * 0.002, "lng": 126.9780 + (i // 50) * 0.002, "user_input": f"맛집 추천 {i}"}
+
+
+def bench_chatbot(args):
+    import app.routes
+    import app.services
+    from app import create_app
+
+    flask_app = create_app()
+    recorder = StageRecorder()
+    recorder.wrap(app.routes, "search_nearby_places", "places_nearby")
+    recorder.wrap(app.routes, "make_search_prompt", "prompt")
+    recorder.wrap(app.routes, "summarize_places_with_gpt", "llm")
+    recorder.wrap(app.services, "parse_recommendations", "parse")
+    recorder.wrap(app.routes, "get_places_details", "place_details")
+
+    def make_client():
+        client = flask_app.test_client()
+        client.post("/login", data={"username": "user1", "password": "password1"})
+        return client
+
+    def send(client, i):
+        return client.post("/search", json=search_body(i)).status_code
+
+    # parse 는 summarize_places_with_gpt 안에서 호출되므로 llm 에서 제외
+    return run_load(make_client, send, recorder, args.requests, args.concurrency, nested=[("llm", "parse")])
+
+
+def bench_api_test(args):
+    sys.path.insert(0, os.path.abspath(API_TEST_DIR))
+    import server
+
+    server.search_mode = args.api_test_mode
+    recorder = StageRecorder()
+    recorder.wrap(server, "search_nearby_places", "places_nearby")
+    recorder.wrap(server, "recommend_places_single_pass", "llm")
+    recorder.wrap(server, "recommend_places_two_pass", "llm")
+    recorder.wrap(server, "get_places_details", "place_details")
+
+    def send(client, i):
+        return client.post("/search", json=search_body(i)).status_code
+
+    # server.py 는 요청마다 print 가 많아서 측정 중에는 출력을 버림
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = run_load(server.app.test_client, send, recorder, args.requests, args.concurrency)
+    result["mode"] = args.api_test_mode
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current):
+    # 대상/단계별 p50·p95·p99 와 처리량 변화율(%)
+    lines = []
+    for target, result in current["results"].items():
+        base = baseline.get("results", {}).get(target)
+        if base is None:
+            continue
+        change = (result["throughput_rps"] - base["throughput_rps"]) / base["throughput_rps"] * 100
+        lines.append(f"{target}: throughput {base['throughput_rps']} -> {result['throughput_rps']} rps ({change:+.1f}%)")
+        for stage, stats in result["stages"].items():
+            base_stats = base["stages"].get(stage)
+            if base_stats is None:
+                continue
+            cells = []
+            for key in ("p50_ms", "p95_ms", "p99_ms"):
+                cells.append(f"{key[:3]} {base_stats[key]} -> {stats[key]}")
+            lines.append(f"  {stage:<14} " + ", ".join(cells))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target", choices=["chatbot", "api_test", "both"], default="both")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--llm-delay", type=float, default=0.5)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    parser.add_argument("--places-delay", type=float, default=0.05)
+    parser.add_argument("--api-test-mode", choices=["single", "two_pass"], default="single")
+    parser.add_argument("--warm-cache", action="store_true", help="chatBot 의 Places 캐시를 켜 둠 (기본은 매 요청 upstream 호출)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 경로")
+    args = parser.parse_args()
+
+    llm_server, endpoint = stub_openai.start_stub_server(delay=args.llm_delay, reply=pipeline_reply,
+                                                         token_delay=args.token_delay)
+    places_server, places_url = stub_places.start_stub_server(delay=args.places_delay)
+    data_dir = tempfile.mkdtemp()
+    os.environ.update({
+        "AZURE_OPENAI_ENDPOINT": endpoint,
+        "AZURE_OPENAI_API_KEY": "stub-key",
+        "AZURE_OPENAI_DEPLOYMENT": "stub-deployment",
+        "OPENAI_API_VERSION": "2024-02-01",
+        "PLACES_API_BASE_URL": places_url,
+        "GOOGLE_MAPS_API_KEY": "stub-key",
+        "USER_DB_PATH": os.path.join(data_dir, "users.db"),
+        "ROUTE_DB_PATH": os.path.join(data_dir, "routes.db"),
+        "SEMANTIC_CACHE_THRESHOLD": "2",
+        "LLM_MAX_CONNECTIONS": str(max(args.concurrency, 20)),
+    })
+    if not args.warm_cache:
+        os.environ["PLACES_CACHE_TTL"] = "0"
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {key: getattr(args, key) for key in
+                   ("concurrency", "requests", "llm_delay", "token_delay", "places_delay", "warm_cache")},
+        "results": {},
+    }
+    if args.target in ("chatbot", "both"):
+        report["results"]["chatbot"] = bench_chatbot(args)
+    if args.target in ("api_test", "both"):
+        report["results"]["api_test"] = bench_api_test(args)
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print(compare(json.load(f), report))
+
+    llm_server.shutdown()
+    places_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
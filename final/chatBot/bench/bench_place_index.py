@@ -0,0 +1,98 @@
+# 로컬 장소 색인 반경 검색 지연 (장소 100만 개 저장 기준) + 빈/잘린 타일 백그라운드 채움 동작 확인
+# 실행 (final/chatBot 에서): python -m bench.bench_place_index --places 1000000 --queries 1000
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from bench import stub_places
+
+# 서울 대략 범위
+MIN_LAT, MAX_LAT, MIN_LNG, MAX_LNG = 37.42, 37.70, 126.80, 127.18
+
+
+def synthetic_place(i):
+    lat, lng = random.uniform(MIN_LAT, MAX_LAT), random.uniform(MIN_LNG, MAX_LNG)
+    return {
+        "place_id": f"bench_place_{i}",
+        "name": f"장소 {i}",
+        "rating": round(random.uniform(3.0, 5.0), 1),
+        "user_ratings_total": random.randint(0, 2000),
+        "vicinity": f"서울시 {i}번지",
+        "types": ["point_of_interest", "establishment"],
+        "geometry": {"location": {"lat": lat, "lng": lng}},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--places", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--radius", type=int, default=1000)
+    args = parser.parse_args()
+
+    server, base_url = stub_places.start_stub_server(delay=0.05)
+    os.environ.update({"PLACES_API_BASE_URL": base_url, "PLACES_PAGE_TOKEN_DELAY": "0"})
+    from app.place_index import PlaceIndex
+    from app.services import index_fetcher
+
+    index = PlaceIndex()
+    index.enabled = True
+    index.connect(os.path.join(tempfile.mkdtemp(), "place_index.db"))
+
+    start = time.perf_counter()
+    batch = 50000
+    for offset in range(0, args.places, batch):
+        index.add_places([synthetic_place(i) for i in range(offset, min(args.places, offset + batch))])
+    tiles = index.covering_tiles((MIN_LAT + MAX_LAT) / 2, (MIN_LNG + MAX_LNG) / 2, 30000)
+    index.mark_fetched(tiles, "point_of_interest")
+    print(f"loaded {args.places} places into {len(tiles)} fresh tiles in {time.perf_counter() - start:.1f}s")
+
+    def no_fetch(lat, lng, radius):
+        raise AssertionError("fresh tiles should not be refetched")
+
+    latencies, sizes = [], []
+    for _ in range(args.queries):
+        lat, lng = random.uniform(MIN_LAT + 0.02, MAX_LAT - 0.02), random.uniform(MIN_LNG + 0.02, MAX_LNG - 0.02)
+        start = time.perf_counter()
+        results = index.search(lat, lng, args.radius, "point_of_interest", no_fetch)
+        latencies.append(time.perf_counter() - start)
+        sizes.append(len(results))
+    latencies.sort()
+    print(f"radius {args.radius}m query: p50 {statistics.median(latencies) * 1000:.2f}ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f}ms, results/query {statistics.mean(sizes):.0f} "
+          f"(capped at {index.max_results})")
+
+    # 빈 타일: 검색마다 가까운 타일부터 max_refreshes 개씩 백그라운드로 채우고 None(호출 측이 Google 직접 조회),
+    # 덮는 타일이 모두 채워진 뒤부터 로컬 응답
+    cold = PlaceIndex()
+    cold.connect(":memory:")
+    fetch = index_fetcher("stub-key", "point_of_interest")
+    searches, results = 0, None
+    while results is None:
+        results = cold.search(37.5665, 126.9780, args.radius, "point_of_interest", fetch)
+        searches += 1
+        while cold.stats()["refreshing"]:
+            time.sleep(0.05)
+    print(f"cold area: {len(cold.covering_tiles(37.5665, 126.9780, args.radius))} tiles filled "
+          f"{cold.max_refreshes} per search, local answer ({len(results)} places) on search {searches} "
+          f"({server.request_count} upstream calls)")
+
+    # Google 이 60개로 자른 타일은 미완성: 로컬 응답에 쓰지 않고 TTL 전에는 다시 받지도 않음
+    server.RequestHandlerClass.pages = 3
+    truncated = PlaceIndex(max_refreshes=100)
+    truncated.connect(":memory:")
+    for _ in range(2):
+        results = truncated.search(35.1, 129.0, args.radius, "point_of_interest", fetch)
+        while truncated.stats()["refreshing"]:
+            time.sleep(0.05)
+    print(f"truncated tiles: search -> {'None (Google)' if results is None else len(results)}, "
+          f"{truncated.stats()['tile_refreshes']} tile refreshes for 2 searches")
+    assert results is None and truncated.stats()["tile_refreshes"] == len(truncated.covering_tiles(35.1, 129.0, args.radius))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# 여러 타입 주변 검색: 순차 호출 vs 동시 실행 지연, 타입별 몫이 지켜진 후보 구성 확인
+# 실행 (final/chatBot 에서): python -m bench.bench_place_types --places-delay 0.2
+import argparse
+import os
+import tempfile
+import time
+from collections import Counter
+
+from bench import stub_places
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--places-delay", type=float, default=0.2)
+    parser.add_argument("--user-input", default="근처 맛집이랑 카페, 그리고 산책할 공원")
+    args = parser.parse_args()
+
+    server, base_url = stub_places.start_stub_server(delay=args.places_delay)
+    os.environ.update({
+        "PLACES_API_BASE_URL": base_url,
+        "PLACES_CACHE_TTL": "0",
+        "USER_DB_PATH": os.path.join(tempfile.mkdtemp(), "users.db"),
+        "ROUTE_DB_PATH": os.path.join(tempfile.mkdtemp(), "routes.db"),
+    })
+    from app import create_app
+    from app.candidates import rank_candidates, rank_candidates_by_type
+    from app.place_types import classify_place_types
+    from app.services import search_nearby_places, search_nearby_places_by_types, merge_places
+
+    create_app()
+    lat, lng = 37.5665, 126.9780
+    place_types = classify_place_types(args.user_input)
+    print(f"input: {args.user_input!r} -> types {place_types}")
+
+    start = time.perf_counter()
+    single = search_nearby_places(lat, lng, "stub-key")
+    print(f"single point_of_interest call: {(time.perf_counter() - start) * 1000:.0f}ms, {len(single)} places")
+
+    start = time.perf_counter()
+    sequential = {place_type: search_nearby_places(lat, lng, "stub-key", place_type=place_type) for place_type in place_types}
+    print(f"{len(place_types)} types sequential:          {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    start = time.perf_counter()
+    by_type = search_nearby_places_by_types(lat, lng, "stub-key", place_types)
+    elapsed = time.perf_counter() - start
+    merged = merge_places(*by_type.values())
+    print(f"{len(place_types)} types concurrent:          {elapsed * 1000:.0f}ms, "
+          f"{sum(map(len, by_type.values()))} results -> {len(merged)} unique")
+    assert sequential.keys() == by_type.keys()
+
+    def type_mix(places):
+        return dict(Counter(next((t for t in place["types"] if t in place_types), "shared") for place in places))
+
+    print(f"top 8 ranked over the merged pool: {type_mix(rank_candidates(merged, lat, lng, top_k=8))}")
+    ranked = rank_candidates_by_type(by_type, lat, lng, top_k=8)
+    assert len({place["place_id"] for place in ranked}) == len(ranked) == 8
+    print(f"top 8 with per-type quotas:        {type_mix(ranked)}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
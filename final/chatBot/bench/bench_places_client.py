@@ -0,0 +1,110 @@
+# Places 클라이언트 재시도/회로 차단기/요청 합치기 동작 확인 (불안정한 스텁 서버 대상)
+# 실행 (final/chatBot 에서): python -m bench.bench_places_client --fail-rate 0.3 --calls 300
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from bench import stub_places
+
+
+def timed_calls(func, calls, concurrency):
+    # (성공 수, 지연 목록)
+    def one(i):
+        start = time.perf_counter()
+        try:
+            func(i)
+            ok = True
+        except Exception:
+            ok = False
+        return ok, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(calls)))
+    latencies = sorted(latency for _, latency in results)
+    return sum(ok for ok, _ in results), latencies
+
+
+def describe(label, calls, successes, latencies, upstream):
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    print(f"{label:<32} success {successes}/{calls}, p50 {statistics.median(latencies) * 1000:.1f}ms, "
+          f"p99 {p99 * 1000:.1f}ms, upstream requests {upstream}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fail-rate", type=float, default=0.3)
+    parser.add_argument("--delay", type=float, default=0.02)
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    server, base_url = stub_places.start_stub_server(delay=args.delay, fail_rate=args.fail_rate)
+    handler = server.RequestHandlerClass
+    os.environ.update({
+        "PLACES_API_BASE_URL": base_url,
+        "GOOGLE_MAPS_API_KEY": "stub-key",
+        "PLACES_CACHE_TTL": "0",  # 캐시 없이 매번 upstream 호출
+        "PLACES_BACKOFF_BASE": "0.05",
+        "USER_DB_PATH": os.path.join(tempfile.mkdtemp(), "users.db"),
+        "ROUTE_DB_PATH": os.path.join(tempfile.mkdtemp(), "routes.db"),
+    })
+    from app import create_app
+    from app.places_client import places_client, CircuitBreaker
+    from app.services import get_place_details, search_nearby_places, place_details_request
+
+    create_app()
+
+    def upstream_delta(func):
+        before = server.request_count
+        result = func()
+        return result, server.request_count - before
+
+    # 1) 불안정한 upstream: 재시도 없는 requests.get vs 공용 클라이언트
+    def bare_get(i):
+        url, params, _ = place_details_request(f"flaky_{i}", "stub-key")
+        response = requests.get(url, params=params, timeout=5)
+        if response.status_code != 200:
+            raise RuntimeError(response.status_code)
+
+    print(f"[flaky upstream, fail rate {args.fail_rate:.0%}]")
+    (successes, latencies), upstream = upstream_delta(lambda: timed_calls(bare_get, args.calls, args.concurrency))
+    describe("requests.get (no retry)", args.calls, successes, latencies, upstream)
+    places_client.breaker = CircuitBreaker(threshold=10 ** 9)  # 재시도 효과만 보기 위해 차단기는 끔
+    (successes, latencies), upstream = upstream_delta(lambda: timed_calls(
+        lambda i: get_place_details(f"flaky_{i}", "stub-key"), args.calls, args.concurrency))
+    describe("PlacesClient (retries)", args.calls, successes, latencies, upstream)
+
+    # 2) upstream 장애(전부 503): 차단기 없이 매번 재시도 vs 차단기가 열린 뒤 즉시 실패
+    print("[upstream outage, every request 503]")
+    handler.fail_rate = 1.0
+    calls = 50
+    (successes, latencies), upstream = upstream_delta(lambda: timed_calls(
+        lambda i: get_place_details(f"outage_{i}", "stub-key"), calls, args.concurrency))
+    describe("retries, no breaker", calls, successes, latencies, upstream)
+    places_client.breaker = CircuitBreaker(threshold=5, reset_timeout=30)
+    (successes, latencies), upstream = upstream_delta(lambda: timed_calls(
+        lambda i: get_place_details(f"outage_{i}", "stub-key"), calls, args.concurrency))
+    describe("retries + circuit breaker", calls, successes, latencies, upstream)
+    print(f"breaker state after outage: {places_client.breaker.state}")
+
+    # 3) 같은 주변 검색 50개가 동시에 들어올 때
+    print("[50 concurrent identical nearby searches]")
+    handler.fail_rate = 0.0
+    handler.delay = 0.2
+    places_client.breaker = CircuitBreaker()
+    for coalesce in (False, True):
+        places_client.coalesce = coalesce
+        (successes, latencies), upstream = upstream_delta(lambda: timed_calls(
+            lambda i: search_nearby_places(37.5665, 126.9780, "stub-key"), 50, 50))
+        describe(f"coalesce={coalesce}", 50, successes, latencies, upstream)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
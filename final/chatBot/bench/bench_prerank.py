@@ -0,0 +1,71 @@
+# 휴리스틱 사전 정렬 성능: NumPy 벡터화 vs 순수 파이썬 루프
+# 실행 (final/chatBot 에서): python -m bench.bench_prerank --sizes 10000 100000
+import argparse
+import math
+import random
+import time
+
+from app import candidates
+from app.candidates import haversine_m, rank_candidates
+
+
+def make_places(count, lat, lng):
+    return [{
+        "place_id": f"synthetic_{i}",
+        "rating": round(random.uniform(1.0, 5.0), 1) if random.random() > 0.05 else None,
+        "user_ratings_total": random.randint(0, 30000),
+        "geometry": {"location": {"lat": lat + random.uniform(-0.03, 0.03), "lng": lng + random.uniform(-0.03, 0.03)}},
+    } for i in range(count)]
+
+
+def rank_scalar(places, lat, lng, exclude_place_ids, top_k):
+    # 벡터화 전 기준 구현 (결과 비교용)
+    scored = []
+    for place in places:
+        if place["place_id"] in exclude_place_ids:
+            continue
+        location = place["geometry"]["location"]
+        rating = place.get("rating") or 0
+        reviews = place.get("user_ratings_total") or 0
+        bayesian = (reviews * rating + candidates.PRIOR_COUNT * candidates.PRIOR_RATING) / (reviews + candidates.PRIOR_COUNT)
+        popularity = min(math.log1p(reviews) / math.log1p(candidates.POPULARITY_SATURATION), 1.0)
+        proximity = math.exp(-haversine_m(lat, lng, location["lat"], location["lng"]) / candidates.DISTANCE_SCALE_M)
+        score = (candidates.RATING_WEIGHT * bayesian / 5 + candidates.POPULARITY_WEIGHT * popularity
+                 + candidates.DISTANCE_WEIGHT * proximity)
+        scored.append((score, place))
+    scored.sort(key=lambda item: -item[0])
+    return [place for _, place in scored[:top_k]]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--top-k", type=int, default=8)
+    args = parser.parse_args()
+
+    lat, lng = 37.5665, 126.9780
+    for size in args.sizes:
+        places = make_places(size, lat, lng)
+        exclude_place_ids = {f"synthetic_{i}" for i in range(0, size, 10)}
+
+        start = time.perf_counter()
+        expected = rank_scalar(places, lat, lng, exclude_place_ids, args.top_k)
+        scalar = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ranked = rank_candidates(places, lat, lng, exclude_place_ids, args.top_k)
+        vectorized = time.perf_counter() - start
+
+        assert [p["place_id"] for p in ranked] == [p["place_id"] for p in expected]
+        assert not any(p["place_id"] in exclude_place_ids for p in ranked)
+        print(f"n={size}: scalar {scalar * 1000:.1f}ms, numpy {vectorized * 1000:.1f}ms")
+
+    # 경계 조건
+    assert rank_candidates([], lat, lng) == []
+    only = make_places(3, lat, lng)
+    assert rank_candidates(only, lat, lng, {p["place_id"] for p in only}) == []
+    assert len(rank_candidates(only, lat, lng, top_k=8)) == 3
+
+
+if __name__ == "__main__":
+    main()
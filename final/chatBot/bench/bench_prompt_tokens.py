@@ -0,0 +1,32 @@
+# 추천 프롬프트의 장소 후보 부분 토큰 수: 원본 repr vs 압축 직렬화
+# 실행 (final/chatBot 에서): python -m bench.bench_prompt_tokens --budget 2000
+import argparse
+import json
+import os
+
+from app.candidates import count_tokens, serialize_candidates
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "nearby_search_seoul.json")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=int, default=2000)
+    args = parser.parse_args()
+
+    with open(FIXTURE, encoding="utf-8") as f:
+        places = json.load(f)["results"]
+    lat, lng = 37.5665, 126.9780
+
+    before = count_tokens(str(places))
+    compact = serialize_candidates(places, lat, lng, token_budget=10 ** 9)
+    capped = serialize_candidates(places, lat, lng, token_budget=args.budget)
+
+    print(f"candidates: {len(places)}")
+    print(f"raw repr:              {before} tokens")
+    print(f"compact (no cap):      {count_tokens(compact)} tokens")
+    print(f"compact (budget={args.budget}): {count_tokens(capped)} tokens, {len(capped.splitlines())} candidates kept")
+
+
+if __name__ == "__main__":
+    main()
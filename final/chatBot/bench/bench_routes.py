@@ -0,0 +1,53 @@
+# 저장 경로 목록 조회 지연 시간 (경로 100k 개 저장 상태)
+# 실행 (final/chatBot 에서): python -m bench.bench_routes --routes 100000
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from app.route_store import RouteStore
+
+
+def make_route(lat, lng):
+    return [{"lat": lat + random.uniform(-0.05, 0.05), "lng": lng + random.uniform(-0.05, 0.05)}
+            for _ in range(random.randint(2, 6))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--routes", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+
+    store = RouteStore()
+    path = os.path.join(tempfile.mkdtemp(), "routes.db")
+    store.connect(path)
+
+    # 절반은 한 명의 헤비 유저, 나머지는 여러 사용자에게 분산
+    start = time.perf_counter()
+    heavy = args.routes // 2
+    store.add_many("heavy", [make_route(37.5665, 126.9780) for _ in range(heavy)])
+    per_user = (args.routes - heavy) // args.users
+    for user in range(args.users):
+        store.add_many(f"user{user}", [make_route(37.5665, 126.9780) for _ in range(per_user)])
+    insert = time.perf_counter() - start
+    print(f"bulk insert {args.routes} routes: {insert:.2f}s, db size {os.path.getsize(path) / 1e6:.1f}MB")
+
+    def timed(label, user_id, cursor=None, repeat=200):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            routes, next_cursor = store.list(user_id, cursor=cursor, limit=args.page_size)
+        print(f"{label}: {(time.perf_counter() - start) / repeat * 1000:.3f}ms/page")
+        return next_cursor
+
+    timed("first page, light user", "user0")
+    cursor = timed("first page, heavy user", "heavy")
+    for _ in range(1000):
+        routes, cursor = store.list("heavy", cursor=cursor, limit=args.page_size)
+    timed("page 1000, heavy user", "heavy", cursor=cursor)
+
+
+if __name__ == "__main__":
+    main()
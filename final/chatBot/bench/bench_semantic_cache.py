@@ -0,0 +1,67 @@
+# /search 의미 기반 캐시 적중률과 절약된 LLM 시간 (로컬 결정적 임베딩, 스텁 서버)
+# 실행 (final/chatBot 에서): python -m bench.bench_semantic_cache --requests 60 --llm-delay 0.3
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from bench import stub_openai, stub_places
+
+QUERIES = [
+    ["맛집 추천", "맛집 추천 ", "맛집  추천", "맛집추천"],
+    ["조용한 카페 추천해줘", "조용한 카페 추천해 줘", "조용한 카페를 추천해줘"],
+    ["산책하기 좋은 공원", "산책하기 좋은 공원!", "산책 하기 좋은 공원"],
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--llm-delay", type=float, default=0.3)
+    args = parser.parse_args()
+
+    llm_server, endpoint = stub_openai.start_stub_server(delay=args.llm_delay)
+    places_server, places_url = stub_places.start_stub_server()
+    data_dir = tempfile.mkdtemp()
+    os.environ.update({
+        "AZURE_OPENAI_ENDPOINT": endpoint,
+        "AZURE_OPENAI_API_KEY": "stub-key",
+        "AZURE_OPENAI_DEPLOYMENT": "stub-deployment",
+        "OPENAI_API_VERSION": "2024-02-01",
+        "PLACES_API_BASE_URL": places_url,
+        "GOOGLE_MAPS_API_KEY": "stub-key",
+        "USER_DB_PATH": os.path.join(data_dir, "users.db"),
+        "ROUTE_DB_PATH": os.path.join(data_dir, "routes.db"),
+    })
+    from app import create_app
+    from app.semantic_cache import semantic_cache
+
+    app = create_app()
+    # 요청마다 임베딩은 한 번만 (lookup 에서 계산한 것을 store 가 재사용)
+    embed_calls = []
+    embed = semantic_cache.embed
+    semantic_cache.embed = lambda text: embed_calls.append(text) or embed(text)
+    client = app.test_client()
+    client.post("/login", data={"username": "user1", "password": "password1"})
+
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        # 같은 동네(같은 격자 셀)에서 표현만 조금씩 다른 질문
+        user_input = random.choice(random.choice(QUERIES))
+        body = {"lat": 37.5665 + random.uniform(-0.0003, 0.0003), "lng": 126.9780 + random.uniform(-0.0003, 0.0003),
+                "user_input": user_input}
+        response = client.post("/search", json=body)
+        assert response.status_code == 200, response.get_json()
+    elapsed = time.perf_counter() - start
+
+    stats = semantic_cache.stats()
+    assert len(embed_calls) == args.requests, len(embed_calls)
+    print(f"requests={args.requests} llm_calls={llm_server.request_count} embeddings={len(embed_calls)} total={elapsed:.2f}s")
+    print(f"semantic cache: {stats}")
+    llm_server.shutdown()
+    places_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# /search vs /search/stream 첫 바이트까지의 시간(TTFB)과 전체 시간 비교
+# 실행 (final/chatBot 에서): python -m bench.bench_stream --llm-delay 0.5 --token-delay 0.02
+import argparse
+import os
+import time
+
+from bench import stub_openai, stub_places
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm-delay", type=float, default=0.5)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--places-delay", type=float, default=0.1)
+    args = parser.parse_args()
+
+    llm_server, endpoint = stub_openai.start_stub_server(delay=args.llm_delay, token_delay=args.token_delay)
+    places_server, places_url = stub_places.start_stub_server(delay=args.places_delay)
+    os.environ.update({
+        "AZURE_OPENAI_ENDPOINT": endpoint,
+        "AZURE_OPENAI_API_KEY": "stub-key",
+        "AZURE_OPENAI_DEPLOYMENT": "stub-deployment",
+        "OPENAI_API_VERSION": "2024-02-01",
+        "PLACES_API_BASE_URL": places_url,
+        "GOOGLE_MAPS_API_KEY": "stub-key",
+        "SEMANTIC_CACHE_THRESHOLD": "2",  # 두 요청이 같은 질문이므로 의미 캐시는 끔
+    })
+    from app import create_app
+
+    app = create_app()
+    client = app.test_client()
+    client.post("/login", data={"username": "user1", "password": "password1"})
+    body = {"lat": 37.5665, "lng": 126.9780, "user_input": "맛집 추천"}
+
+    start = time.perf_counter()
+    response = client.post("/search", json=body)
+    blocking = time.perf_counter() - start
+    assert response.status_code == 200, response.get_json()
+
+    start = time.perf_counter()
+    response = client.post("/search/stream", json=body, buffered=False)
+    first_byte = None
+    events = []
+    for chunk in response.response:
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        events.extend(line.split(": ", 1)[1] for line in chunk.decode("utf-8").splitlines() if line.startswith("event: "))
+    streamed = time.perf_counter() - start
+
+    print(f"/search        ttfb = total = {blocking * 1000:.0f}ms")
+    print(f"/search/stream ttfb {first_byte * 1000:.0f}ms, total {streamed * 1000:.0f}ms")
+    print(f"events: token x{events.count('token')}, place x{events.count('place')}, done x{events.count('done')}")
+    llm_server.shutdown()
+    places_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
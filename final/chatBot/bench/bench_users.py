@@ -0,0 +1,56 @@
+# Flask-Login user_loader 조회 비용: 기존 선형 탐색 vs UserRepository (1, 1k, 1M 사용자)
+# 실행 (final/chatBot 에서): python -m bench.bench_users --sizes 1 1000 1000000
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from werkzeug.security import generate_password_hash
+
+from app.models import User, UserRepository
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 1000, 1000000])
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    password_hash = generate_password_hash("password")
+    for size in args.sizes:
+        # 기존 방식: username -> User dict 에서 id 선형 탐색
+        users = {f"user{i}": User(id=str(i), username=f"user{i}", password_hash=password_hash) for i in range(1, size + 1)}
+        ids = [str(random.randint(1, size)) for _ in range(args.lookups)]
+        legacy_lookups = max(1, min(args.lookups, 20000000 // size))
+        start = time.perf_counter()
+        for user_id in ids[:legacy_lookups]:
+            next((user for user in users.values() if user.id == user_id), None)
+        legacy = (time.perf_counter() - start) / legacy_lookups
+
+        repository = UserRepository(cache_size=1024)
+        repository.connect(os.path.join(tempfile.mkdtemp(), "users.db"))
+        with repository.conn:
+            repository.conn.execute('DELETE FROM users')
+            repository.conn.executemany('INSERT INTO users (id, username, password_hash) VALUES (?, ?, ?)',
+                                        ((i, f"user{i}", password_hash) for i in range(1, size + 1)))
+        repository.cache.clear()
+
+        start = time.perf_counter()
+        for user_id in ids:
+            repository.get(user_id)
+        mixed = (time.perf_counter() - start) / args.lookups
+
+        hot_id = ids[0]
+        repository.get(hot_id)
+        start = time.perf_counter()
+        for _ in range(args.lookups):
+            repository.get(hot_id)
+        cached = (time.perf_counter() - start) / args.lookups
+
+        print(f"users={size:>8}: linear scan {legacy * 1e6:10.1f}us, repository {mixed * 1e6:6.1f}us "
+              f"(random ids), {cached * 1e6:5.2f}us (cached)")
+
+
+if __name__ == "__main__":
+    main()
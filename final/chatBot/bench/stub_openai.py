@@ -0,0 +1,134 @@
+# 벤치마크/로컬 테스트용 OpenAI(Azure) 호환 스텁 서버
+# 실행: python -m bench.stub_openai --port 8082 --delay 0.5
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROMPT_PLACE_ID = re.compile(r'place_id[\'"]?\s*:\s*[\'"]([A-Za-z0-9_-]+)')
+
+
+def default_reply(request_body):
+    # 프롬프트에 들어 있는 후보 중 앞의 3개를 추천하는 척 함 (JSON 모드면 JSON 으로)
+    prompt_text = "".join(str(message.get("content", "")) for message in request_body.get("messages", []))
+    place_ids = list(dict.fromkeys(PROMPT_PLACE_ID.findall(prompt_text)))[:3] or ["stub_place_0", "stub_place_1", "stub_place_2"]
+    if request_body.get("response_format", {}).get("type") == "json_object":
+        return json.dumps({
+            "places": [{"place_id": place_id, "name": f"스텁 장소 {place_id}"} for place_id in place_ids],
+            "summary": "\n".join(f"{i + 1}. 스텁 장소 {place_id} - 평점이 높고 가까움" for i, place_id in enumerate(place_ids)),
+        }, ensure_ascii=False)
+    return "\n\n".join(
+        f"{i + 1}. **스텁 장소 {place_id}**\n- 평점: 4.5\n- 이유: 평점이 높고 가까움\n- place_id: {place_id}"
+        for i, place_id in enumerate(place_ids)
+    ) + "\n"
+
+
+DEFAULT_REPLY = default_reply
+
+
+class StubServer(ThreadingHTTPServer):
+    # 동시 접속이 많은 부하 테스트에서도 연결이 거절되지 않도록
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class StubOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive 허용
+    delay = 0.0          # 첫 토큰까지의 지연
+    token_delay = 0.0    # 스트리밍 시 토큰 사이 지연
+    reply = staticmethod(DEFAULT_REPLY)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request_body = json.loads(self.rfile.read(length) or b"{}")
+        with self.server.lock:
+            self.server.request_count += 1
+        time.sleep(self.delay)
+
+        prompt_text = "".join(str(message.get("content", "")) for message in request_body.get("messages", []))
+        reply = self.reply(request_body) if callable(self.reply) else self.reply
+        if request_body.get("stream"):
+            self.send_stream(request_body, reply)
+            return
+        prompt_tokens = max(1, len(prompt_text) // 4)
+        completion_tokens = max(1, len(reply) // 4)
+        body = {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request_body.get("model") or "stub",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": reply}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_stream(self, request_body, reply):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write_chunk(data):
+            payload = f"data: {data}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(payload):x}\r\n".encode() + payload + b"\r\n")
+            self.wfile.flush()
+
+        pieces = [reply[i:i + 8] for i in range(0, len(reply), 8)]
+        for index, piece in enumerate(pieces):
+            if index and self.token_delay:
+                time.sleep(self.token_delay)
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request_body.get("model") or "stub",
+                "choices": [{"index": 0, "delta": {"role": "assistant", "content": piece}, "finish_reason": None}],
+            }
+            write_chunk(json.dumps(chunk, ensure_ascii=False))
+        done = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": request_body.get("model") or "stub",
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        write_chunk(json.dumps(done))
+        write_chunk("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=0, delay=0.0, reply=DEFAULT_REPLY, token_delay=0.0, handler=StubOpenAIHandler):
+    # 별도 스레드에서 서버를 띄우고 (server, endpoint) 반환
+    # reply 는 문자열 또는 요청 본문을 받아 문자열을 돌려주는 함수
+    handler_class = type("ConfiguredHandler", (handler,), {
+        "delay": delay,
+        "token_delay": token_delay,
+        "reply": staticmethod(reply) if callable(reply) else reply,
+    })
+    server = StubServer(("127.0.0.1", port), handler_class)
+    server.request_count = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--delay", type=float, default=0.5)
+    args = parser.parse_args()
+    server, endpoint = start_stub_server(args.port, args.delay)
+    print(f"Stub OpenAI server running on {endpoint}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,153 @@
+# 벤치마크/로컬 테스트용 Google Places (+ Directions) 스텁 서버
+# 실행: python -m bench.stub_places --port 8081 --delay 0.2
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def make_place(index, lat, lng, place_type="point_of_interest"):
+    # point_of_interest 외 타입은 타입별 place_id (앞의 두 개는 타입과 무관하게 같은 장소, 중복 제거 확인용)
+    angle = random.random() * 2 * math.pi
+    offset = random.random() * 0.009
+    prefix = "stub_place" if place_type == "point_of_interest" or index < 2 else f"stub_{place_type}"
+    return {
+        "place_id": f"{prefix}_{index}",
+        "name": f"스텁 장소 {index}" if prefix == "stub_place" else f"스텁 {place_type} {index}",
+        "rating": round(random.uniform(3.0, 5.0), 1),
+        "user_ratings_total": random.randint(0, 2000),
+        "vicinity": f"서울시 스텁구 {index}번지",
+        "types": list(dict.fromkeys([place_type, "point_of_interest", "establishment"])),
+        "geometry": {"location": {"lat": lat + offset * math.sin(angle), "lng": lng + offset * math.cos(angle)}},
+    }
+
+
+class StubServer(ThreadingHTTPServer):
+    # 동시 접속이 많은 부하 테스트에서도 연결이 거절되지 않도록
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class StubPlacesHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+    results_per_page = 20
+    fail_rate = 0.0     # 이 비율만큼 fail_status 로 응답 (재시도/회로 차단기 테스트용)
+    fail_status = 503
+    fail_body = None    # 설정하면 실패 응답을 HTTP 200 + 이 본문(bytes)으로 보냄 (OVER_QUERY_LIMIT, 잘못된 JSON 등)
+    fail_types = frozenset()  # 이 타입의 주변 검색은 항상 실패 (타입별 부분 실패 테스트용)
+    pages = 1               # 주변 검색 결과 페이지 수 (2 이상이면 next_page_token 발급)
+    page_token_delay = 0.0  # 토큰 발급 후 이 시간 안에 쓰면 INVALID_REQUEST (Google 과 동일한 동작)
+    directions_malformed = False  # True 면 Directions 응답에서 overview_polyline 을 뺌 (응답 형식 오류 테스트용)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        with self.server.lock:
+            self.server.request_count += 1
+        time.sleep(self.delay)
+
+        with self.server.lock:
+            forced = self.server.fail_count > 0
+            self.server.fail_count -= forced
+        if forced or query.get("type") in self.fail_types or (self.fail_rate and random.random() < self.fail_rate):
+            payload = self.fail_body or b""
+            self.send_response(200 if self.fail_body is not None else self.fail_status)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        if parsed.path.endswith("/nearbysearch/json"):
+            body = self.nearby_page(query)
+        elif parsed.path.endswith("/details/json"):
+            place_id = query.get("place_id", "")
+            body = {"status": "OK", "result": {
+                "place_id": place_id,
+                "name": f"스텁 장소 {place_id}",
+                "rating": 4.2,
+                "formatted_address": "서울시 스텁구",
+                "reviews": [{"text": "좋아요"}],
+                "geometry": {"location": {"lat": 37.5665, "lng": 126.9780}},
+            }}
+        elif parsed.path.endswith("/directions/json"):
+            body = self.directions(query)
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def nearby_page(self, query):
+        # 두 번째 페이지부터는 앞 페이지와 place_id 하나가 겹침 (중복 제거 확인용)
+        if "pagetoken" in query:
+            with self.server.lock:
+                issued = self.server.tokens.get(query["pagetoken"])
+            if issued is None or time.time() - issued[0] < self.page_token_delay:
+                return {"status": "INVALID_REQUEST", "results": []}
+            _, page, lat, lng, place_type = issued
+            start = page * self.results_per_page - 1
+        else:
+            lat, lng = (float(value) for value in query.get("location", "37.5665,126.9780").split(","))
+            page, start, place_type = 0, 0, query.get("type", "point_of_interest")
+        body = {"status": "OK", "results": [make_place(i, lat, lng, place_type) for i in range(start, start + self.results_per_page)]}
+        if page + 1 < self.pages:
+            token = f"token_{random.getrandbits(64):x}"
+            with self.server.lock:
+                self.server.tokens[token] = (time.time(), page + 1, lat, lng, place_type)
+            body["next_page_token"] = token
+        return body
+
+    def directions(self, query):
+        # 지점들을 직선으로 이은 경로, 구간마다 1km / 10분
+        # 실제 API 처럼 TRANSIT 은 경유지를 받지 않음
+        from app.polyline import encode_polyline
+        if query.get("mode") == "transit" and query.get("waypoints"):
+            return {"status": "INVALID_REQUEST", "routes": []}
+        if self.directions_malformed:
+            return {"status": "OK", "routes": [{"legs": []}]}
+        stops = [query["origin"], *filter(None, query.get("waypoints", "").split("|")), query["destination"]]
+        points = [dict(zip(("lat", "lng"), map(float, stop.split(",")))) for stop in stops]
+        legs = [{"distance": {"value": 1000}, "duration": {"value": 600}} for _ in points[1:]]
+        return {"status": "OK", "routes": [{"overview_polyline": {"points": encode_polyline(points)}, "legs": legs}]}
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=0, delay=0.0, handler=StubPlacesHandler, fail_rate=0.0, fail_status=503, pages=1,
+                      page_token_delay=0.0):
+    # 별도 스레드에서 서버를 띄우고 (server, base_url) 반환, 실행 중 장애율은 server.RequestHandlerClass.fail_rate 로 변경
+    # server.fail_count 를 올리면 다음 요청 그만큼은 반드시 실패 (재시도/차단기 테스트용)
+    handler_class = type("ConfiguredHandler", (handler,), {"delay": delay, "fail_rate": fail_rate, "fail_status": fail_status,
+                                                           "pages": pages, "page_token_delay": page_token_delay})
+    server = StubServer(("127.0.0.1", port), handler_class)
+    server.request_count = 0
+    server.fail_count = 0
+    server.lock = threading.Lock()
+    server.tokens = {}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--delay", type=float, default=0.2)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--fail-status", type=int, default=503)
+    args = parser.parse_args()
+    server, base_url = start_stub_server(args.port, args.delay, fail_rate=args.fail_rate, fail_status=args.fail_status)
+    print(f"Stub Places server running on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -10,3 +10,86 @@ class Config:
     AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
     AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
     OPENAI_API_VERSION = os.getenv("OPENAI_API_VERSION")
+
+    # Google Places 호출 설정 (로컬 스텁 서버로 바꿔서 벤치마크 가능)
+    PLACES_API_BASE_URL = os.getenv("PLACES_API_BASE_URL", "https://maps.googleapis.com/maps/api/place")
+    PLACES_TIMEOUT = float(os.getenv("PLACES_TIMEOUT", "5"))  # 읽기 타임아웃
+    PLACES_CONNECT_TIMEOUT = float(os.getenv("PLACES_CONNECT_TIMEOUT", "3"))
+    PLACES_MAX_CONNECTIONS = int(os.getenv("PLACES_MAX_CONNECTIONS", "32"))
+    # 429/5xx 재시도 횟수와 지수 백오프(초), 회로 차단기(연속 실패 수, open 유지 시간(초))
+    PLACES_MAX_RETRIES = int(os.getenv("PLACES_MAX_RETRIES", "2"))
+    PLACES_BACKOFF_BASE = float(os.getenv("PLACES_BACKOFF_BASE", "0.2"))
+    PLACES_BACKOFF_MAX = float(os.getenv("PLACES_BACKOFF_MAX", "2"))
+    PLACES_BREAKER_THRESHOLD = int(os.getenv("PLACES_BREAKER_THRESHOLD", "5"))
+    PLACES_BREAKER_RESET = float(os.getenv("PLACES_BREAKER_RESET", "30"))
+    # 동시에 들어온 같은 Places 요청은 한 번만 보내고 결과 공유
+    PLACES_COALESCE = os.getenv("PLACES_COALESCE", "true").lower() == "true"
+    # 주변 검색 페이지 수(Google 최대 3), 후보가 이만큼 모이면 다음 페이지는 받지 않음,
+    # 다음 페이지 토큰 활성화 대기(초), 요청 안에서 다음 페이지를 기다리는 최대 시간(초, 늦게 온 페이지는 캐시에만 반영)
+    PLACES_MAX_PAGES = int(os.getenv("PLACES_MAX_PAGES", "1"))
+    PLACES_MIN_CANDIDATES = int(os.getenv("PLACES_MIN_CANDIDATES", "40"))
+    PLACES_PAGE_TOKEN_DELAY = float(os.getenv("PLACES_PAGE_TOKEN_DELAY", "2"))
+    PLACES_PAGES_WAIT = float(os.getenv("PLACES_PAGES_WAIT", "3"))
+
+    # 격자 타일 기반 로컬 장소 색인 (켜면 주변 검색을 가능한 한 로컬에서 처리)
+    PLACE_INDEX_ENABLED = os.getenv("PLACE_INDEX_ENABLED", "false").lower() == "true"
+    PLACE_INDEX_PATH = os.getenv("PLACE_INDEX_PATH", "place_index.db")
+    PLACE_INDEX_TILE_DEGREES = float(os.getenv("PLACE_INDEX_TILE_DEGREES", "0.01"))
+    PLACE_INDEX_TTL = int(os.getenv("PLACE_INDEX_TTL", "86400"))
+    PLACE_INDEX_MAX_RESULTS = int(os.getenv("PLACE_INDEX_MAX_RESULTS", "60"))
+    PLACE_INDEX_MAX_REFRESHES = int(os.getenv("PLACE_INDEX_MAX_REFRESHES", "4"))
+    PLACES_MAX_WORKERS = int(os.getenv("PLACES_MAX_WORKERS", "8"))
+
+    # Places 응답 캐시 ("memory" 또는 "sqlite")
+    PLACES_CACHE_BACKEND = os.getenv("PLACES_CACHE_BACKEND", "memory")
+    PLACES_CACHE_PATH = os.getenv("PLACES_CACHE_PATH", "places_cache.db")
+    PLACES_CACHE_TTL = int(os.getenv("PLACES_CACHE_TTL", "600"))
+    PLACES_CACHE_MAX_ENTRIES = int(os.getenv("PLACES_CACHE_MAX_ENTRIES", "1024"))
+    PLACES_CACHE_GRID_PRECISION = int(os.getenv("PLACES_CACHE_GRID_PRECISION", "3"))
+
+    # LLM 클라이언트 설정 (프로세스당 한 번 생성해서 재사용)
+    LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.7"))
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+    LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+    LLM_MAX_ASYNC_CONNECTIONS = int(os.getenv("LLM_MAX_ASYNC_CONNECTIONS", "500"))
+
+    # 추천 프롬프트에 넣는 장소 후보의 최대 토큰 수
+    PROMPT_CANDIDATE_TOKEN_BUDGET = int(os.getenv("PROMPT_CANDIDATE_TOKEN_BUDGET", "2000"))
+    # LLM 에 넘기기 전에 휴리스틱 점수로 남길 후보 수
+    PRERANK_TOP_K = int(os.getenv("PRERANK_TOP_K", "8"))
+    # 주변 검색 타입: "single"(point_of_interest 하나) 또는 "keywords"(입력 키워드로 최대 PLACE_TYPE_MAX 개 타입 동시 검색)
+    PLACE_TYPE_MODE = os.getenv("PLACE_TYPE_MODE", "single")
+    PLACE_TYPE_MAX = int(os.getenv("PLACE_TYPE_MAX", "3"))
+
+    # 사용자별 제외 장소 저장소 ("memory" 또는 "sqlite")
+    EXCLUSION_BACKEND = os.getenv("EXCLUSION_BACKEND", "memory")
+    EXCLUSION_DB_PATH = os.getenv("EXCLUSION_DB_PATH", "exclusions.db")
+    EXCLUSION_MAX_PER_USER = int(os.getenv("EXCLUSION_MAX_PER_USER", "500"))
+    EXCLUSION_TTL = int(os.getenv("EXCLUSION_TTL", "86400"))
+
+    # 저장 경로 DB
+    ROUTE_DB_PATH = os.getenv("ROUTE_DB_PATH", "routes.db")
+    ROUTES_PAGE_SIZE = int(os.getenv("ROUTES_PAGE_SIZE", "20"))
+    ROUTES_MAX_PAGE_SIZE = int(os.getenv("ROUTES_MAX_PAGE_SIZE", "100"))
+    # 저장 경로의 이동 경로 계산: google (Directions API) 또는 straight_line (네트워크 없는 로컬/테스트용)
+    DIRECTIONS_PROVIDER = os.getenv("DIRECTIONS_PROVIDER", "google")
+    DIRECTIONS_API_BASE_URL = os.getenv("DIRECTIONS_API_BASE_URL", "https://maps.googleapis.com/maps/api")
+    DIRECTIONS_CACHE_SIZE = int(os.getenv("DIRECTIONS_CACHE_SIZE", "1024"))
+
+    # 사용자 DB
+    USER_DB_PATH = os.getenv("USER_DB_PATH", "users.db")
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+
+    # /search 의미 기반 응답 캐시 ("hashing": 로컬 결정적 임베딩, "azure": Azure OpenAI 임베딩)
+    SEMANTIC_CACHE_EMBEDDING = os.getenv("SEMANTIC_CACHE_EMBEDDING", "hashing")
+    AZURE_OPENAI_EMBEDDING_DEPLOYMENT = os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT")
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+    SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", "600"))
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))
+
+    # ASGI 모드의 Places 비동기 커넥션 수
+    PLACES_MAX_ASYNC_CONNECTIONS = int(os.getenv("PLACES_MAX_ASYNC_CONNECTIONS", "200"))
+
+    # /metrics (Prometheus) 수집 여부, 단계별 로그에 요청 추적 ID 출력 여부
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    TRACE_LOG = os.getenv("TRACE_LOG", "false").lower() == "true"
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import pytest
+
+# app 패키지와 bench.* 를 가져오도록 final/chatBot 을 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def places_server():
+    from bench import stub_places
+    server, base_url = stub_places.start_stub_server()
+    server.base_url = base_url
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def stub_places(places_server):
+    # 테스트마다 스텁 동작을 기본값으로 되돌림
+    handler = places_server.RequestHandlerClass
+    yield places_server
+    handler.delay, handler.fail_rate, handler.fail_status, handler.fail_body = 0.0, 0.0, 503, None
+    handler.fail_types = frozenset()
+    places_server.fail_count = 0
+
+
+@pytest.fixture(scope="session")
+def llm_server():
+    from bench import stub_openai
+    server, endpoint = stub_openai.start_stub_server()
+    server.endpoint = endpoint
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def flask_app(stub_places, llm_server, tmp_path, monkeypatch):
+    # 스텁 서버를 바라보는 앱 (Config 는 가져올 때 환경 변수를 읽으므로 클래스 속성을 직접 바꿈)
+    from config import Config
+    for name, value in {
+        "PLACES_API_BASE_URL": stub_places.base_url,
+        "GOOGLE_MAPS_API_KEY": "stub-key",
+        "AZURE_OPENAI_ENDPOINT": llm_server.endpoint,
+        "AZURE_OPENAI_API_KEY": "stub-key",
+        "AZURE_OPENAI_DEPLOYMENT": "stub-deployment",
+        "OPENAI_API_VERSION": "2024-02-01",
+        "USER_DB_PATH": str(tmp_path / "users.db"),
+        "ROUTE_DB_PATH": str(tmp_path / "routes.db"),
+        "PLACES_BACKOFF_BASE": 0.001,
+        "SEMANTIC_CACHE_THRESHOLD": 2.0,
+    }.items():
+        monkeypatch.setattr(Config, name, value)
+    from app import create_app
+    from app.cache import places_cache
+    app = create_app()
+    yield app
+    places_cache.init_app(app)  # 다음 테스트에 캐시가 남지 않도록
@@ -0,0 +1,58 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.cache import places_cache
+from app.places_client import places_client
+from app.services import place_details_request
+
+
+def details(place_id):
+    from app.aio import get_place_details_async
+
+    async def run():
+        try:
+            return await get_place_details_async(place_id, "stub-key")
+        finally:
+            await places_client.aclose()
+    return asyncio.run(run())
+
+
+def cached_details(place_id):
+    return places_cache.get(place_details_request(place_id, "stub-key")[2])
+
+
+@pytest.mark.parametrize("fail_body", [b'{"status": "OVER_QUERY_LIMIT"}', b'{"status": "UNKNOWN_ERROR"}', b"<html>"])
+def test_details_failure_is_empty_and_not_cached(flask_app, stub_places, fail_body):
+    stub_places.RequestHandlerClass.fail_body = fail_body
+    stub_places.fail_count = places_client.max_retries + 1
+    assert details("flaky") == {}
+    assert cached_details("flaky") is None
+    # 다음 요청은 다시 조회해서 캐시
+    assert details("flaky")["place_id"] == "flaky"
+    assert cached_details("flaky")["place_id"] == "flaky"
+
+
+def test_search_with_broken_details_is_not_500(flask_app, stub_places):
+    from app.aio import create_asgi_app
+    from app.services import search_nearby_places
+    asgi_app = create_asgi_app(flask_app)
+    # 주변 검색은 캐시에서, 상세 조회는 모두 JSON 이 아닌 HTTP 200 응답
+    search_nearby_places(37.6, 127.1, "stub-key")
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=asgi_app), base_url="http://test") as client:
+            await client.post("/login", data={"username": "user1", "password": "password1"})
+            stub_places.RequestHandlerClass.fail_body = b"not json"
+            stub_places.fail_count = 1000
+            try:
+                return await client.post("/search", json={"lat": 37.6, "lng": 127.1, "user_input": "맛집"})
+            finally:
+                await places_client.aclose()
+
+    response = asyncio.run(run())
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["place_ids"] and body["places"] == [{}] * len(body["place_ids"])
+    assert all(cached_details(place_id) is None for place_id in body["place_ids"])
@@ -0,0 +1,76 @@
+import pytest
+
+from app import cache
+from app.cache import MemoryBackend, PlacesCache, SQLiteBackend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def places(request, tmp_path):
+    if request.param == "sqlite":
+        backend = SQLiteBackend(str(tmp_path / "places_cache.db"), max_entries=3)
+    else:
+        backend = MemoryBackend(max_entries=3)
+    return PlacesCache(backend, ttl=60)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # 캐시가 보는 시각만 앞으로 돌림
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_hit_and_miss(places):
+    assert places.get("nearby:a") is None
+    places.set("nearby:a", [{"place_id": "p1"}])
+    assert places.get("nearby:a") == [{"place_id": "p1"}]
+    assert places.get("nearby:b") is None
+    assert places.stats() == {"hits": 1, "misses": 2, "hit_rate": 1 / 3, "size": 1}
+
+
+def test_ttl_expiry(places, clock):
+    places.set("details:p1", {"place_id": "p1"})
+    clock[0] += 59
+    assert places.get("details:p1") == {"place_id": "p1"}
+    clock[0] += 1
+    # 만료된 항목은 miss 로 세고 저장소에서도 지움
+    assert places.get("details:p1") is None
+    assert places.stats()["misses"] == 1 and places.stats()["size"] == 0
+
+
+def test_lru_eviction(places, clock):
+    for key in ("a", "b", "c"):
+        places.set(key, key)
+        clock[0] += 1
+    places.get("a")  # 최근에 읽은 항목은 남김
+    clock[0] += 1
+    places.set("d", "d")
+    assert places.stats()["size"] == 3
+    assert [places.get(key) for key in ("a", "b", "c", "d")] == ["a", None, "c", "d"]
+
+
+def test_nearby_key_normalization():
+    places = PlacesCache(grid_precision=3)
+    key = places.nearby_key(37.5662, 126.9781, 1000, "cafe")
+    # 같은 격자(≈110m) 안의 좌표와 문자열 좌표는 같은 키
+    assert places.nearby_key(37.5658, 126.9779, 1000, "cafe") == key
+    assert places.nearby_key("37.5662", "126.9781", 1000, "cafe") == key
+    # 격자, 반경, 타입이 다르면 다른 키
+    assert places.nearby_key(37.5672, 126.9781, 1000, "cafe") != key
+    assert places.nearby_key(37.5662, 126.9781, 500, "cafe") != key
+    assert places.nearby_key(37.5662, 126.9781, 1000, "restaurant") != key
+    assert places.details_key("p1") != places.details_key("p2")
+
+
+def test_nearby_searches_share_upstream_call(flask_app, stub_places):
+    from app.cache import places_cache
+    from app.services import get_place_details, search_nearby_places
+
+    calls, hits = stub_places.request_count, places_cache.hits
+    places = search_nearby_places(37.5662, 126.9781, "stub-key")
+    assert search_nearby_places(37.5658, 126.9779, "stub-key") == places
+    get_place_details(places[0]["place_id"], "stub-key")
+    get_place_details(places[0]["place_id"], "stub-key")
+    assert stub_places.request_count - calls == 2
+    assert places_cache.hits - hits == 2
@@ -0,0 +1,53 @@
+import random
+
+import numpy as np
+
+from app.candidates import rank_candidates, score_candidates
+from bench.bench_prerank import make_places, rank_scalar
+
+LAT, LNG = 37.5665, 126.9780
+
+
+def place(place_id, rating=4.0, reviews=100, offset=0.0):
+    return {"place_id": place_id, "rating": rating, "user_ratings_total": reviews,
+            "geometry": {"location": {"lat": LAT + offset, "lng": LNG}}}
+
+
+def ids(places):
+    return [p["place_id"] for p in places]
+
+
+def test_matches_scalar_reference():
+    random.seed(0)
+    places = make_places(500, LAT, LNG)
+    exclude_place_ids = {f"synthetic_{i}" for i in range(0, 500, 7)}
+    for top_k in (1, 8, 499, 500, 600):
+        assert ids(rank_candidates(places, LAT, LNG, exclude_place_ids, top_k)) == \
+            ids(rank_scalar(places, LAT, LNG, exclude_place_ids, top_k))
+
+
+def test_exclusions():
+    places = [place("a", 5.0, 5000), place("b", 4.0), place("c", 3.0)]
+    scores = score_candidates(places, LAT, LNG, {"a"})
+    assert scores[0] == -np.inf and np.isfinite(scores[1:]).all()
+    assert ids(rank_candidates(places, LAT, LNG, ["a"], top_k=2)) == ["b", "c"]
+    # 전부 제외되면 자리가 남아도 채우지 않음
+    assert rank_candidates(places, LAT, LNG, {"a", "b", "c"}, top_k=2) == []
+
+
+def test_empty_candidates():
+    assert rank_candidates([], LAT, LNG) == []
+    assert len(score_candidates([], LAT, LNG)) == 0
+
+
+def test_top_k_larger_than_candidates():
+    places = [place("near", offset=0.0), place("far", offset=0.05), place("mid", offset=0.01)]
+    assert ids(rank_candidates(places, LAT, LNG, top_k=10)) == ["near", "mid", "far"]
+    assert rank_candidates(places, LAT, LNG, top_k=0) == []
+
+
+def test_ties_keep_input_order():
+    places = [place(f"tie_{i}") for i in range(12)] + [place("best", 5.0, 5000)]
+    assert ids(rank_candidates(places, LAT, LNG, top_k=13)) == ["best"] + [f"tie_{i}" for i in range(12)]
+    # top_k 가 동점 구간 중간에서 끊겨도 앞쪽 입력부터
+    assert ids(rank_candidates(places, LAT, LNG, top_k=5)) == ["best", "tie_0", "tie_1", "tie_2", "tie_3"]
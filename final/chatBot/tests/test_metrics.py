@@ -0,0 +1,77 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.metrics import Metrics, metrics
+from app.places_client import places_client
+
+SEARCH = {"lat": 37.5665, "lng": 126.9780, "user_input": "맛집"}
+
+
+def stage_count(registry, name):
+    histogram = registry.histograms.get(("stage_duration_seconds", (("stage", name),)))
+    return sum(histogram[:-1]) if histogram else 0
+
+
+def requests_total(endpoint, status="200"):
+    return metrics.counters.get(("http_requests_total", (("endpoint", endpoint), ("status", status))), 0)
+
+
+def test_stage_records_duration_and_errors():
+    registry = Metrics()
+
+    @registry.stage("decorated")
+    def fail():
+        raise ValueError("boom")
+
+    with registry.stage("block"):
+        pass
+    with pytest.raises(ValueError):
+        fail()
+    with pytest.raises(KeyError), registry.stage("block"):
+        raise KeyError("boom")
+    assert stage_count(registry, "block") == 2 and stage_count(registry, "decorated") == 1
+    assert registry.counters == {("stage_errors_total", (("stage", "block"),)): 1,
+                                 ("stage_errors_total", (("stage", "decorated"),)): 1}
+    assert 'chatbot_stage_duration_seconds_count{stage="block"} 2' in registry.render()
+
+
+def test_disabled_stage_records_nothing():
+    registry = Metrics(enabled=False)
+    decorated = registry.stage("decorated")(lambda value: value * 2)
+    assert decorated(21) == 42
+    with registry.stage("block"):
+        pass
+    assert registry.histograms == {} and registry.counters == {}
+
+
+def test_asgi_search_is_instrumented_like_flask(flask_app):
+    from app.aio import create_asgi_app
+    asgi_app = create_asgi_app(flask_app)
+
+    client = flask_app.test_client()
+    client.post("/login", data={"username": "user1", "password": "password1"})
+    response = client.post("/search", json=SEARCH, headers={"X-Request-ID": "flask-trace"})
+    assert response.status_code == 200 and response.headers["X-Trace-Id"] == "flask-trace"
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=asgi_app), base_url="http://test") as client:
+            await client.post("/login", data={"username": "user1", "password": "password1"})
+            try:
+                search = await client.post("/search", json=SEARCH, headers={"X-Request-ID": "asgi-trace"})
+                stream = await client.post("/search/stream", json=SEARCH)
+                return search, stream
+            finally:
+                await places_client.aclose()
+
+    searches, streams = requests_total("main.search"), requests_total("main.search_stream")
+    search_stages, stream_stages = stage_count(metrics, "search"), stage_count(metrics, "search_stream")
+    search, stream = asyncio.run(run())
+    assert search.status_code == 200 and search.headers["X-Trace-Id"] == "asgi-trace"
+    assert stream.status_code == 200 and len(stream.headers["X-Trace-Id"]) == 16
+    assert "event: done" in stream.text
+    # Flask 경로와 같은 endpoint 라벨과 단계 이름
+    assert requests_total("main.search") == searches + 1 and requests_total("main.search_stream") == streams + 1
+    assert stage_count(metrics, "search") == search_stages + 1
+    assert stage_count(metrics, "search_stream") == stream_stages + 1
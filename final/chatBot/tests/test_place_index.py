@@ -0,0 +1,114 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from app.place_index import PlaceIndex
+
+LAT, LNG = 37.5665, 126.9780
+
+
+def place(place_id, lat=LAT, lng=LNG):
+    return {"place_id": place_id, "types": ["point_of_interest"], "geometry": {"location": {"lat": lat, "lng": lng}}}
+
+
+class Fetcher:
+    # 타일 중심에 장소 하나를 돌려주는 fetch, complete=False 면 Google 이 결과를 자른 것처럼
+    def __init__(self, complete=True):
+        self.complete = complete
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, lat, lng, radius):
+        with self.lock:
+            self.calls.append((lat, lng))
+            return [place(f"p{len(self.calls)}", lat, lng)], self.complete
+
+
+def wait_refreshes(index):
+    while index.stats()["refreshing"]:
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def index():
+    index = PlaceIndex(max_refreshes=4)
+    index.connect(":memory:")
+    return index
+
+
+def test_cold_miss_caps_refreshes_nearest_first(index):
+    fetch = Fetcher()
+    tiles = index.covering_tiles(LAT, LNG, 1000)
+    assert len(tiles) > index.max_refreshes
+
+    assert index.search(LAT, LNG, 1000, "point_of_interest", fetch) is None
+    wait_refreshes(index)
+    assert len(fetch.calls) == index.max_refreshes
+    assert [index.tile_of(*call) for call in fetch.calls[:1]] == [index.tile_of(LAT, LNG)]
+
+    # 나머지 타일은 다음 검색들이 이어서 채우고, 모두 채워지면 로컬 응답
+    searches = 1
+    while index.search(LAT, LNG, 1000, "point_of_interest", fetch) is None:
+        searches += 1
+        wait_refreshes(index)
+    assert len(fetch.calls) == len(tiles) and searches == -(-len(tiles) // index.max_refreshes)
+
+
+def test_truncated_tile_is_a_miss_until_ttl(index):
+    fetch = Fetcher(complete=False)
+    index.max_refreshes = 100
+    tiles = index.covering_tiles(LAT, LNG, 500)
+    for _ in range(3):
+        assert index.search(LAT, LNG, 500, "point_of_interest", fetch) is None
+        wait_refreshes(index)
+    # 미완성 타일은 로컬 응답에 쓰지 않고 TTL 전에는 다시 받지 않음
+    assert len(fetch.calls) == len(tiles)
+
+    index.ttl = 0
+    fetch.complete = True
+    time.sleep(0.01)
+    assert index.search(LAT, LNG, 500, "point_of_interest", fetch) is None
+    wait_refreshes(index)
+    index.ttl = 86400
+    assert len(fetch.calls) == 2 * len(tiles)
+    assert index.search(LAT, LNG, 500, "point_of_interest", fetch)
+
+
+def test_index_fetcher_reports_truncation(flask_app, stub_places, monkeypatch):
+    from config import Config
+    from app.services import index_fetcher
+    monkeypatch.setattr(Config, "PLACES_PAGE_TOKEN_DELAY", 0)
+    fetch = index_fetcher("stub-key", "point_of_interest")
+    handler = stub_places.RequestHandlerClass
+
+    results, complete = fetch(LAT, LNG, 800)
+    assert len(results) == 20 and complete
+    handler.pages = 3  # 3페이지 60개: Google 상한에 닿아 잘렸을 수 있음
+    try:
+        results, complete = fetch(LAT, LNG, 800)
+    finally:
+        handler.pages = 1
+    assert len(results) == 59 and not complete  # 두 번째 페이지가 첫 페이지와 하나 겹침
+
+
+def test_old_tiles_table_is_migrated(tmp_path):
+    path = str(tmp_path / "place_index.db")
+    conn = sqlite3.connect(path)
+    conn.execute('''CREATE TABLE tiles (tile INTEGER NOT NULL, place_type TEXT NOT NULL, fetched_at REAL NOT NULL,
+                    PRIMARY KEY (tile, place_type))''')
+    index = PlaceIndex()
+    conn.executemany('INSERT INTO tiles VALUES (?, ?, ?)',
+                     [(tile, "point_of_interest", time.time()) for tile in index.covering_tiles(LAT, LNG, 500)])
+    conn.commit()
+    conn.close()
+
+    index.connect(path)
+    fetch = Fetcher()
+    index.max_refreshes = 100
+    # 잘렸는지 모르는 이전 타일은 미완성 + 오래된 것으로 보고 다시 채움
+    assert index.search(LAT, LNG, 500, "point_of_interest", fetch) is None
+    wait_refreshes(index)
+    assert len(fetch.calls) == len(index.covering_tiles(LAT, LNG, 500))
+    assert index.search(LAT, LNG, 500, "point_of_interest", fetch) is not None
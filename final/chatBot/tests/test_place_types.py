@@ -0,0 +1,73 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+from app.candidates import rank_candidates_by_type
+from app.place_types import DEFAULT_PLACE_TYPE, classify_place_types
+from app.places_client import PlacesError, places_client
+
+LAT, LNG = 37.5665, 126.9780
+
+
+def search_sync(place_types):
+    from app.services import search_nearby_places_by_types
+    return search_nearby_places_by_types(LAT, LNG, "stub-key", place_types)
+
+
+def search_async(place_types):
+    from app.aio import search_nearby_places_by_types_async
+
+    async def run():
+        try:
+            return await search_nearby_places_by_types_async(LAT, LNG, "stub-key", place_types)
+        finally:
+            await places_client.aclose()
+    return asyncio.run(run())
+
+
+def place(place_id, place_type, rating=4.0):
+    return {"place_id": place_id, "rating": rating, "user_ratings_total": 100, "types": [place_type],
+            "geometry": {"location": {"lat": LAT, "lng": LNG}}}
+
+
+def test_classify_place_types():
+    assert classify_place_types("근처 맛집이랑 카페, 그리고 산책할 공원") == ["restaurant", "cafe", "park"]
+    # 같은 타입 키워드는 한 번만, 최대 max_types 개
+    assert classify_place_types("카페 커피 디저트") == ["cafe"]
+    assert classify_place_types("카페 맛집 공원 박물관", max_types=2) == ["cafe", "restaurant"]
+    assert classify_place_types("아무거나") == classify_place_types("") == [DEFAULT_PLACE_TYPE]
+
+
+def test_per_type_quotas():
+    by_type = {
+        "restaurant": [place(f"r{i}", "restaurant", 5.0) for i in range(10)],
+        "cafe": [place(f"c{i}", "cafe") for i in range(10)],
+        "park": [place("p0", "park", 3.0), place("p1", "park", 3.0)],
+    }
+    ranked = rank_candidates_by_type(by_type, LAT, LNG, top_k=8)
+    # 몫은 ceil(8 / 3) = 3, 후보가 둘뿐인 park 의 남는 자리는 다른 타입이 채움
+    assert Counter(p["types"][0] for p in ranked) == {"restaurant": 3, "cafe": 3, "park": 2}
+    ranked = rank_candidates_by_type({**by_type, "park": []}, LAT, LNG, top_k=8)
+    assert Counter(p["types"][0] for p in ranked) == {"restaurant": 4, "cafe": 4}
+
+
+def test_quota_skips_duplicates_across_types():
+    shared = place("shared", "restaurant", 5.0)
+    by_type = {"restaurant": [shared, place("r1", "restaurant")], "cafe": [shared, place("c1", "cafe")]}
+    assert [p["place_id"] for p in rank_candidates_by_type(by_type, LAT, LNG, top_k=3)] == ["shared", "c1", "r1"]
+
+
+@pytest.mark.parametrize("search", [search_sync, search_async])
+def test_failed_type_is_empty(flask_app, stub_places, search):
+    stub_places.RequestHandlerClass.fail_types = frozenset({"cafe"})
+    results = search(["restaurant", "cafe", "park"])
+    assert list(results) == ["restaurant", "cafe", "park"]
+    assert results["cafe"] == [] and results["restaurant"] and results["park"]
+
+
+@pytest.mark.parametrize("search", [search_sync, search_async])
+def test_all_types_failing_raises(flask_app, stub_places, search):
+    stub_places.RequestHandlerClass.fail_types = frozenset({"restaurant", "cafe"})
+    with pytest.raises(PlacesError):
+        search(["restaurant", "cafe"])
@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.places_client import CircuitBreaker, CircuitOpenError, PlacesClient, PlacesError
+
+
+@pytest.fixture
+def client():
+    client = PlacesClient()
+    client.backoff_base = 0.001
+    client.breaker = CircuitBreaker(threshold=3, reset_timeout=0.1)
+    return client
+
+
+def get_details(client, server, place_id="p1"):
+    return client.get_json('places_details', f"{server.base_url}/details/json", {"place_id": place_id})
+
+
+def upstream_calls(server, func):
+    before = server.request_count
+    try:
+        return func(), server.request_count - before
+    except Exception as e:
+        e.upstream_calls = server.request_count - before
+        raise
+
+
+def test_retries_until_success(client, stub_places):
+    stub_places.fail_count = 2
+    body, calls = upstream_calls(stub_places, lambda: get_details(client, stub_places))
+    assert body["status"] == "OK" and calls == 3
+    assert client.breaker.state == "closed"
+
+
+def test_retries_exhausted(client, stub_places):
+    stub_places.fail_count = 10
+    with pytest.raises(PlacesError) as raised:
+        upstream_calls(stub_places, lambda: get_details(client, stub_places))
+    assert raised.value.status == "HTTP 503" and raised.value.upstream_calls == client.max_retries + 1
+
+
+def test_body_status_is_retried(client, stub_places):
+    stub_places.RequestHandlerClass.fail_body = b'{"status": "OVER_QUERY_LIMIT"}'
+    stub_places.fail_count = 1
+    body, calls = upstream_calls(stub_places, lambda: get_details(client, stub_places))
+    assert body["status"] == "OK" and calls == 2
+
+
+def test_client_error_is_not_retried(client, stub_places):
+    stub_places.RequestHandlerClass.fail_status = 400
+    stub_places.fail_count = 1
+    with pytest.raises(PlacesError) as raised:
+        upstream_calls(stub_places, lambda: get_details(client, stub_places))
+    assert raised.value.status == "HTTP 400" and raised.value.upstream_calls == 1
+    assert client.breaker.failures == 0
+
+
+def test_breaker_opens_then_half_open_probe_closes(client, stub_places):
+    client.max_retries = 0
+    stub_places.fail_count = 3
+    for _ in range(3):
+        with pytest.raises(PlacesError):
+            get_details(client, stub_places)
+    assert client.breaker.state == "open"
+    # open 동안은 upstream 을 부르지 않고 바로 실패
+    with pytest.raises(CircuitOpenError) as raised:
+        upstream_calls(stub_places, lambda: get_details(client, stub_places))
+    assert raised.value.upstream_calls == 0
+
+    time.sleep(0.15)
+    assert get_details(client, stub_places)["status"] == "OK"
+    assert client.breaker.state == "closed"
+
+
+def test_failed_probe_reopens(client, stub_places):
+    client.max_retries = 0
+    stub_places.fail_count = 4
+    for _ in range(3):
+        with pytest.raises(PlacesError):
+            get_details(client, stub_places)
+    time.sleep(0.15)
+    with pytest.raises(PlacesError):
+        get_details(client, stub_places)
+    assert client.breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        get_details(client, stub_places)
+
+
+@pytest.mark.parametrize("fail_body", [b"[]", b"<html>", b'{"status": "UNKNOWN_ERROR"}'])
+def test_probe_with_bad_body_does_not_stick_half_open(client, stub_places, fail_body):
+    client.max_retries = 0
+    client.breaker.record_failure(), client.breaker.record_failure(), client.breaker.record_failure()
+    time.sleep(0.15)
+    stub_places.RequestHandlerClass.fail_body = fail_body
+    stub_places.fail_count = 1
+    with pytest.raises(PlacesError):
+        get_details(client, stub_places)
+    assert client.breaker.state == "open"
+    time.sleep(0.15)
+    assert get_details(client, stub_places)["status"] == "OK"
+    assert client.breaker.state == "closed"
+
+
+def test_probe_raising_unexpected_exception_releases_breaker(client, stub_places, monkeypatch):
+    client.max_retries = 0
+    for _ in range(3):
+        client.breaker.record_failure()
+    time.sleep(0.15)
+
+    def broken_get(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(client.session, "get", broken_get)
+        with pytest.raises(RuntimeError):
+            get_details(client, stub_places)
+    assert client.breaker.state == "open"
+    time.sleep(0.15)
+    assert get_details(client, stub_places)["status"] == "OK"
+    assert client.breaker.state == "closed"
+
+
+def test_identical_concurrent_requests_are_coalesced(client, stub_places):
+    stub_places.RequestHandlerClass.delay = 0.2
+    barrier = threading.Barrier(10)
+
+    def call(_):
+        barrier.wait()
+        return get_details(client, stub_places, "same")
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        results, calls = upstream_calls(stub_places, lambda: list(pool.map(call, range(10))))
+    assert calls == 1 and all(result["result"]["place_id"] == "same" for result in results)
+
+    client.coalesce = False
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        barrier.reset()
+        _, calls = upstream_calls(stub_places, lambda: list(pool.map(call, range(10))))
+    assert calls == 10
+
+
+def test_async_client_shares_retries_and_breaker(client, stub_places):
+    async def run():
+        try:
+            stub_places.fail_count = 1
+            body = await client.get_json_async('places_details', f"{stub_places.base_url}/details/json", {"place_id": "a"})
+            assert body["status"] == "OK"
+            # 같은 차단기: 비동기 경로의 실패가 쌓여 열리면 동기 경로도 바로 실패
+            client.max_retries = 0
+            stub_places.fail_count = 3
+            for _ in range(3):
+                with pytest.raises(PlacesError):
+                    await client.get_json_async('places_details', f"{stub_places.base_url}/details/json", {"place_id": "a"})
+        finally:
+            await client.aclose()
+
+    body, calls = upstream_calls(stub_places, lambda: asyncio.run(run()))
+    assert calls == 5
+    with pytest.raises(CircuitOpenError):
+        get_details(client, stub_places)
+
+
+def test_async_identical_requests_are_coalesced(client, stub_places):
+    stub_places.RequestHandlerClass.delay = 0.2
+
+    async def run():
+        try:
+            return await asyncio.gather(*(client.get_json_async('places_details', f"{stub_places.base_url}/details/json",
+                                                                {"place_id": "same"}) for _ in range(10)))
+        finally:
+            await client.aclose()
+
+    results, calls = upstream_calls(stub_places, lambda: asyncio.run(run()))
+    assert calls == 1 and all(result["result"]["place_id"] == "same" for result in results)
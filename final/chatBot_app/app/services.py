@@ -1,8 +1,18 @@
 import requests
 import re
+from concurrent.futures import ThreadPoolExecutor
 from langchain_openai import AzureChatOpenAI
 
-def search_nearby_places(lat, lng, google_maps_api_key, radius=1000, place_type="point_of_interest"):
+# "- **place_id**: X", "- **place_id:** X", "place_id: X", "\"place_id\": \"X\"" 를 한 번에 처리
+PLACE_ID_PATTERN = re.compile(r'place_id(?![A-Za-z0-9_])[*"\']*\s*[:=]?\s*[*"\'`]*\s*([A-Za-z0-9_-]+)')
+
+PLACES_TIMEOUT = 5
+PLACES_MAX_WORKERS = 8
+
+# 상세 정보 조회용 공용 스레드 풀 (동시 요청 수 제한)
+details_executor = ThreadPoolExecutor(max_workers=PLACES_MAX_WORKERS)
+
+def search_nearby_places(lat, lng, google_maps_api_key, radius=1000, place_type="point_of_interest", timeout=PLACES_TIMEOUT):
     url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
     params = {
         "location": f"{lat},{lng}",
@@ -12,12 +22,12 @@ def search_nearby_places(lat, lng, google_maps_api_key, radius=1000, place_type=
         "type": place_type
     }
 
-    response = requests.get(url, params=params)
+    response = requests.get(url, params=params, timeout=timeout)
     if response.status_code == 200:
         return response.json().get('results', [])
     return []
 
-def get_place_details(place_id, google_maps_api_key):
+def get_place_details(place_id, google_maps_api_key, timeout=PLACES_TIMEOUT):
     url = "https://maps.googleapis.com/maps/api/place/details/json"
     params = {
         "place_id": place_id,
@@ -25,11 +35,29 @@ def get_place_details(place_id, google_maps_api_key):
         "key": google_maps_api_key,
         "language": "ko"
     }
-    response = requests.get(url, params=params)
+    response = requests.get(url, params=params, timeout=timeout)
     if response.status_code == 200:
         return response.json().get('result', {})
     return {}
 
+def _get_place_details_safe(place_id, google_maps_api_key, timeout):
+    try:
+        return get_place_details(place_id, google_maps_api_key, timeout=timeout)
+    except requests.RequestException:
+        return {}
+
+def get_places_details(place_ids, google_maps_api_key, timeout=PLACES_TIMEOUT):
+    # place_id 별 상세 정보를 동시에 조회 (입력 순서 유지, 실패/타임아웃은 {})
+    futures = [
+        details_executor.submit(_get_place_details_safe, place_id, google_maps_api_key, timeout)
+        for place_id in place_ids
+    ]
+    return [future.result() for future in futures]
+
+def extract_place_ids(model_output):
+    # 정규식 한 번으로 추출하고 순서를 유지하며 중복 제거 (중복 상세 조회 방지)
+    return list(dict.fromkeys(match.group(1) for match in PLACE_ID_PATTERN.finditer(model_output)))
+
 def summarize_places_with_gpt(prompt, config):
     model = AzureChatOpenAI(
         azure_deployment=config['AZURE_OPENAI_DEPLOYMENT'],
@@ -39,10 +67,4 @@ def summarize_places_with_gpt(prompt, config):
     )
     response = model.invoke(prompt)
     model_output = response.content.strip()
-    
-    place_ids_1 = re.findall(r'- \*\*place_id\*\*:? *([A-Za-z0-9_-]+)', model_output)
-    place_ids_2 = re.findall(r'- \*\*place_id:\*\*? *([A-Za-z0-9_-]+)', model_output)
-    place_ids_3 = re.findall(r'place_id:\s*([A-Za-z0-9_-]+)', model_output)
-
-    place_ids = place_ids_1 + place_ids_2 + place_ids_3
-    return model_output, place_ids
+    return model_output, extract_place_ids(model_output)
@@ -0,0 +1,47 @@
+# 명함 일괄 추출: 순차 vs 동시 처리량(장/분), 스텁의 분당 요청 제한(429) 하에서 RateLimiter 동작 확인
+# 실행 (명함분석 에서): python -m bench.bench_batch --cards 60 --delay 0.5
+import argparse
+import os
+import sqlite3
+import tempfile
+import zipfile
+
+from bench import stub_vision
+from bench.card_images import make_card
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=60)
+    parser.add_argument("--delay", type=float, default=0.5, help="스텁 비전 응답 지연(초)")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    server, base_url = stub_vision.start_stub_server(delay=args.delay)
+    os.environ.update({"OPENAI_BASE_URL": base_url, "OPENAI_API_KEY": "stub-key"})
+    import card_batch
+
+    workdir = tempfile.mkdtemp()
+    cards_zip = os.path.join(workdir, "cards.zip")
+    with zipfile.ZipFile(cards_zip, "w") as archive:
+        for i in range(args.cards):
+            archive.writestr(f"cards/card_{i:04d}.jpg", make_card(i))
+
+    for i, (label, workers, rpm, stub_rpm) in enumerate([
+        ("sequential", 1, 0, 0),
+        (f"{args.workers} workers", args.workers, 0, 0),
+        (f"{args.workers} workers, stub limit 300 rpm, no client limit", args.workers, 0, 300),
+        (f"{args.workers} workers, stub limit 300 rpm, --rpm 300", args.workers, 300, 300),
+    ]):
+        server.RequestHandlerClass.rpm = stub_rpm
+        server.rejected_count = 0
+        db_path = os.path.join(workdir, f"{i}.db")
+        progress = card_batch.ingest(cards_zip, workers=workers, rpm=rpm, db_path=db_path, report=lambda line: None)
+        rows = sqlite3.connect(db_path).execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+        assert rows == progress.done == args.cards, (rows, progress.summary())
+        print(f"{label:<58} {progress.summary()}, stub 429s: {server.rejected_count}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# 추출 캐시: Streamlit 재실행/같은 명함 재업로드/재압축된 사진/프로세스 재시작/일괄 처리 중복에서 모델 호출 수 확인
+# 실행 (명함분석 에서): python -m bench.bench_dedup
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import zipfile
+from io import BytesIO
+from PIL import Image, ImageOps
+
+from bench import stub_vision
+from bench.card_images import make_card, make_photo
+
+
+def reencode(photo, fmt="JPEG", quality=75, scale=1.0):
+    # 편집 앱/메신저를 거친 사진처럼 회전을 픽셀에 반영하고(EXIF 제거) 다시 저장
+    image = ImageOps.exif_transpose(Image.open(BytesIO(photo)))
+    if scale != 1.0:
+        image = image.resize((int(image.width * scale), int(image.height * scale)), Image.LANCZOS)
+    buffered = BytesIO()
+    image.save(buffered, format=fmt, **({"quality": quality} if fmt == "JPEG" else {}))
+    return buffered.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.5)
+    args = parser.parse_args()
+
+    server, base_url = stub_vision.start_stub_server(delay=args.delay)
+    workdir = tempfile.mkdtemp()
+    db_path = os.path.join(workdir, "extracted_data.db")
+    os.environ.update({"OPENAI_BASE_URL": base_url, "OPENAI_API_KEY": "stub-key", "CARD_DB_PATH": db_path})
+    import card_batch
+    from card_cache import extraction_cache
+    from card_vision import extract_card_text
+
+    def calls_during(label, func):
+        before = server.request_count
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        calls = server.request_count - before
+        print(f"{label:<52} {calls:>3} model calls, {elapsed * 1000:8.1f}ms")
+        return calls, result
+
+    photo, other = make_photo(0), make_photo(1)
+    assert calls_during("first upload", lambda: extract_card_text(photo))[0] == 1
+    calls, results = calls_during(f"{args.reruns} reruns of the same upload", lambda: [extract_card_text(photo) for _ in range(args.reruns)])
+    assert calls == 0 and all(cached for _, cached, _ in results)
+    resaved, as_png, resized = reencode(photo, quality=60), reencode(photo, fmt="PNG"), reencode(photo, scale=0.5)
+    assert calls_during("same photo re-saved, JPEG q60", lambda: extract_card_text(resaved))[0] == 0
+    assert calls_during("same photo re-saved as PNG", lambda: extract_card_text(as_png))[0] == 0
+    # 축소본은 매칭하지 않음 (아래 같은 디자인 명함과 구분할 수 없어서)
+    assert calls_during("same photo resized 50% (not matched by design)", lambda: extract_card_text(resized))[0] == 1
+    calls, (_, cached, _) = calls_during("different card", lambda: extract_card_text(other))
+    assert calls == 1 and not cached
+    scans = [make_card(i) for i in range(5)]
+    calls, results = calls_during("5 scanned cards, same design, different text", lambda: [extract_card_text(scan) for scan in scans])
+    assert calls == 5 and len({text for text, _, _ in results}) == 5
+
+    # 재시작: 연결을 닫으면 다음 조회 때 DB 에서 다시 읽음
+    extraction_cache.close()
+    assert calls_during("after restart, same upload", lambda: extract_card_text(photo))[0] == 0
+
+    # 일괄 처리: 8장 중 고유 명함 3장 (같은 파일 동시 처리 포함), 새 DB 에서 시작
+    cards_zip = os.path.join(workdir, "cards.zip")
+    photos = [make_photo(10), make_photo(11), make_photo(12)]
+    with zipfile.ZipFile(cards_zip, "w") as archive:
+        for i in range(8):
+            archive.writestr(f"card_{i}.jpg", photos[i % 3])
+    batch_db = os.path.join(workdir, "batch.db")
+    calls, progress = calls_during("batch of 8 cards (3 unique)", lambda: card_batch.ingest(
+        cards_zip, workers=8, db_path=batch_db, report=lambda line: None))
+    assert calls == 3 and progress.cached == 5, progress.summary()
+    conn = sqlite3.connect(batch_db)
+    assert conn.execute('SELECT COUNT(*) FROM cards').fetchone()[0] == 3
+    conn.close()
+    print(f"cache stats: {extraction_cache.stats()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# 명함 저장 처리량: 예전 방식(명함마다 연결 열고 INSERT + commit + 닫기) vs CardStore(연결 유지, WAL, 묶음 트랜잭션)
+# 저장하는 동안 다른 스레드의 검색 지연도 같이 측정 (읽기가 쓰기를 기다리는지)
+# 예전 방식은 명함마다 fsync 라 큰 규모를 다 넣으면 몇 시간 걸리므로, 해당 규모까지 채운 DB 에 표본만 넣어 속도를 재고 전체 시간을 환산
+# 실행 (명함분석 에서): python -m bench.bench_ingest --rows 10000,100000,1000000
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+import card_store
+from bench.bench_search import make_fields
+
+
+class ReaderProbe:
+    # 저장하는 동안 별도 연결로 검색을 반복하며 지연 기록
+    def __init__(self, path):
+        self.path = path
+        self.samples = []
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        while not self.stop_event.is_set():
+            start = time.perf_counter()
+            card_store.search_cards(conn, "김")
+            self.samples.append(time.perf_counter() - start)
+            time.sleep(0.005)
+        conn.close()
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop_event.set()
+        self.thread.join()
+
+    def summary(self):
+        if not self.samples:
+            return "reads: none"
+        samples = sorted(self.samples)
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        return f"reads p50 {statistics.median(samples) * 1000:6.2f}ms p99 {p99 * 1000:7.2f}ms max {samples[-1] * 1000:7.2f}ms"
+
+
+def legacy_save(path, extracted_text):
+    # 이번 변경 전 save_to_sqlite 와 같은 동작: 매번 연결(기본 journal/synchronous) + 한 장 commit + 닫기
+    conn = sqlite3.connect(path)
+    conn.execute(f'INSERT INTO cards ({", ".join(card_store.CARD_COLUMNS)}, created_at) VALUES '
+                 f'({", ".join("?" * len(card_store.CARD_COLUMNS))}, ?)', (*card_store.card_record(extracted_text), time.time()))
+    conn.commit()
+    conn.close()
+
+
+def set_journal(path, mode):
+    conn = sqlite3.connect(path)
+    conn.execute(f'PRAGMA journal_mode = {mode}')
+    conn.close()
+
+
+def card_texts(count, rng, start=0):
+    return ["```json\n" + json.dumps(make_fields(i, rng), ensure_ascii=False) + "\n```" for i in range(start, start + count)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", default="10000,100000,1000000")
+    parser.add_argument("--flush-size", type=int, default=card_store.FLUSH_SIZE)
+    parser.add_argument("--legacy-sample", type=int, default=2000, help="예전 방식으로 실제로 넣어 보는 장 수 (규모마다)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for rows in map(int, args.rows.split(",")):
+        path = os.path.join(tempfile.mkdtemp(), "extracted_data.db")
+        texts = card_texts(rows, rng)
+
+        store = card_store.CardStore(path, flush_size=args.flush_size)
+        with ReaderProbe(path) as probe:
+            start = time.perf_counter()
+            for text in texts:
+                store.add(text)
+            store.flush()
+            elapsed = time.perf_counter() - start
+        store.close()
+        print(f"{rows:>8} rows  CardStore (WAL, flush {args.flush_size:>4})        {elapsed:8.1f}s  "
+              f"{rows / elapsed:8.0f} cards/s  {probe.summary()}")
+
+        # 예전 방식: 같은 규모 DB 에 이어서 표본을 넣고 장당 시간으로 전체 환산 (예전 DB 처럼 rollback journal)
+        sample = card_texts(min(args.legacy_sample, rows), rng, start=rows)
+        set_journal(path, "DELETE")
+        with ReaderProbe(path) as probe:
+            start = time.perf_counter()
+            for text in sample:
+                legacy_save(path, text)
+            per_card = (time.perf_counter() - start) / len(sample)
+        print(f"{rows:>8} rows  legacy (connect + commit per card)   {per_card * rows:8.1f}s  "
+              f"{1 / per_card:8.0f} cards/s  {probe.summary()}  (est. from {len(sample)} cards)")
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
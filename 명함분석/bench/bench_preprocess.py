@@ -0,0 +1,57 @@
+# 비전 업로드 전 전처리: 원본 그대로 JPEG 재인코딩(기존 encode_image) vs 회전 보정/잘라내기/축소/품질 조정
+# 업로드 바이트, 예상 이미지 토큰, 전처리 시간, 스텁 왕복 포함 전체 지연 비교
+# 실행 (명함분석 에서): python -m bench.bench_preprocess --photos 10 --bandwidth 2000000
+import argparse
+import base64
+import os
+import statistics
+import time
+from io import BytesIO
+from PIL import Image
+
+from bench import stub_vision
+from bench.card_images import make_photo
+
+
+def legacy_encode(image):
+    # 전처리 도입 전 encode_image 와 같은 동작 (원본 해상도, PIL 기본 품질)
+    buffered = BytesIO()
+    image.save(buffered, format="JPEG")
+    return buffered.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--photos", type=int, default=10)
+    parser.add_argument("--bandwidth", type=float, default=2_000_000, help="스텁 업로드 속도 (바이트/초, 모바일 업링크 가정)")
+    parser.add_argument("--delay", type=float, default=0.3, help="스텁 모델 처리 시간(초)")
+    args = parser.parse_args()
+
+    server, base_url = stub_vision.start_stub_server(delay=args.delay, upload_bandwidth=args.bandwidth)
+    os.environ.update({"OPENAI_BASE_URL": base_url, "OPENAI_API_KEY": "stub-key"})
+    from card_image import JPEG_QUALITY, MAX_EDGE, encode_card_jpeg, estimate_image_tokens
+    from card_vision import extract_text_from_image
+
+    photos = [make_photo(i) for i in range(args.photos)]
+    print(f"{args.photos} photos, original {statistics.mean(map(len, photos)) / 1e6:.2f}MB avg, "
+          f"max edge {MAX_EDGE}, JPEG quality {JPEG_QUALITY}")
+    for label, encode in [("legacy (full resolution)", legacy_encode), ("preprocessed", encode_card_jpeg)]:
+        sizes, tokens, encode_times, totals = [], [], [], []
+        for photo in photos:
+            start = time.perf_counter()
+            jpeg = encode(Image.open(BytesIO(photo)))
+            encoded = time.perf_counter()
+            extract_text_from_image(base64.b64encode(jpeg).decode("utf-8"))
+            totals.append(time.perf_counter() - start)
+            encode_times.append(encoded - start)
+            sizes.append(len(jpeg))
+            # 모델이 보는 방향 기준 (legacy 는 EXIF 회전을 무시하므로 누운 그대로)
+            width, height = Image.open(BytesIO(jpeg)).size
+            tokens.append(estimate_image_tokens(width, height))
+        print(f"{label:<26} payload {statistics.mean(sizes) / 1e3:8.1f}KB, image tokens {statistics.mean(tokens):5.0f}, "
+              f"encode {statistics.mean(encode_times) * 1000:5.0f}ms, end-to-end p50 {statistics.median(totals) * 1000:6.0f}ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# 명함 검색 지연: 구조화 스키마(인덱스 + FTS5, 커서 페이지네이션) vs 예전 방식(SELECT * 후 원문에서 찾기)
+# 실행 (명함분석 에서): python -m bench.bench_search --cards 1000000
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+import card_store
+
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍"
+SYLLABLES = "민서지현준우하윤도예시은수영진호성연경태주희동혁채원석재"
+COMPANIES = ["기아", "삼성전자", "엘지", "네이버", "카카오", "현대", "스텁상사", "한빛", "미래", "하나"]
+SUFFIXES = ["", " 대리점", " 연구소", " 지점", " 본사"]
+TITLES = ["대표", "과장", "대리", "부장", "사원", "카마스터", "연구원"]
+
+
+def make_fields(i, rng):
+    name = rng.choice(SURNAMES) + rng.choice(SYLLABLES) + rng.choice(SYLLABLES)
+    company = f"{rng.choice(COMPANIES)}{rng.choice(SUFFIXES)} {i % 5000}"
+    phone = f"010-{rng.randrange(10000):04d}-{i % 10000:04d}"
+    email = f"user{i}@example{i % 100}.com"
+    return {"이름": name, "직책": rng.choice(TITLES), "회사": company, "전화번호": phone, "이메일": email}
+
+
+def timed(func, runs):
+    samples = []
+    for args in runs:
+        start = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, max(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--legacy-runs", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    workdir = tempfile.mkdtemp()
+    conn = card_store.connect(os.path.join(workdir, "cards.db"))
+    legacy = sqlite3.connect(os.path.join(workdir, "legacy.db"))
+    legacy.execute('CREATE TABLE extracted_data (id INTEGER PRIMARY KEY AUTOINCREMENT, extracted_text TEXT)')
+
+    start = time.perf_counter()
+    samples = []
+    batch = 50_000
+    for offset in range(0, args.cards, batch):
+        texts = ["```json\n" + json.dumps(make_fields(i, rng), ensure_ascii=False) + "\n```"
+                 for i in range(offset, min(offset + batch, args.cards))]
+        with conn:
+            conn.executemany(f'INSERT INTO cards ({", ".join(card_store.CARD_COLUMNS)}, created_at) VALUES '
+                             f'({", ".join("?" * len(card_store.CARD_COLUMNS))}, 0)', map(card_store.card_record, texts))
+        with legacy:
+            legacy.executemany('INSERT INTO extracted_data (extracted_text) VALUES (?)', ((text,) for text in texts))
+        samples += [json.loads(texts[k].strip("`json\n")) for k in rng.sample(range(len(texts)), 3)]
+    print(f"built {args.cards} cards in {time.perf_counter() - start:.1f}s")
+
+    def search(query, cursor=None):
+        rows, _ = card_store.search_cards(conn, query, cursor)
+        return rows
+
+    picks = [rng.choice(samples) for _ in range(args.runs)]
+    scenarios = [
+        ("full name", [(p["이름"],) for p in picks]),
+        ("surname prefix (many matches)", [(rng.choice(SURNAMES),) for _ in range(args.runs)]),
+        ("company + branch", [(p["회사"],) for p in picks]),
+        ("phone, full number", [(p["전화번호"],) for p in picks]),
+        ("phone prefix", [(p["전화번호"][:8],) for p in picks]),
+        ("email", [(p["이메일"],) for p in picks]),
+        ("list, page at random cursor", [(None, rng.randrange(args.cards)) for _ in range(args.runs)]),
+        ("surname prefix, page at random cursor", [(rng.choice(SURNAMES), rng.randrange(args.cards)) for _ in range(args.runs)]),
+    ]
+    for label, runs in scenarios:
+        p50, worst = timed(search, runs)
+        print(f"{label:<40} p50 {p50:8.2f}ms  max {worst:8.2f}ms")
+
+    # 예전 방식: fetch_from_sqlite 처럼 전부 읽어 온 뒤 원문에서 찾기
+    def legacy_search(query):
+        return [row for row in legacy.execute('SELECT * FROM extracted_data').fetchall() if query in row[1]][:20]
+
+    p50, worst = timed(legacy_search, [(p["이름"],) for p in picks[:args.legacy_runs]])
+    print(f"{'legacy: SELECT * + substring (full name)':<40} p50 {p50:8.2f}ms  max {worst:8.2f}ms")
+    print(f"db size: {os.path.getsize(os.path.join(workdir, 'cards.db')) / 1e6:.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
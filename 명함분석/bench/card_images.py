@@ -0,0 +1,39 @@
+# 벤치마크용 가짜 명함 이미지 생성
+import random
+import numpy as np
+from io import BytesIO
+from PIL import Image, ImageDraw
+
+
+def make_card(index, width=900, fmt="JPEG"):
+    # 흰 명함(가로:세로 = 9:5)에 이름/회사/연락처 글자, 카드마다 내용이 다름
+    height = width * 5 // 9
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    scale = width / 900
+    lines = [f"Name {index:05d}", f"Stub Company {index % 97}", f"010-{index % 10000:04d}-{random.randint(0, 9999):04d}",
+             f"user{index}@example.com"]
+    for row, line in enumerate(lines):
+        draw.text((60 * scale, (60 + row * 80) * scale), line, fill="black", font_size=int(48 * scale))
+    buffered = BytesIO()
+    image.save(buffered, format=fmt)
+    return buffered.getvalue()
+
+
+def make_photo(index, width=4000, height=3000, orientation=6, quality=92):
+    # 휴대폰으로 책상 위 명함을 찍은 듯한 사진: 결이 있는 어두운 배경 가운데 명함,
+    # 센서 방향 그대로 저장하고 EXIF Orientation 으로 회전 정보만 남김 (6: 시계 방향 90도)
+    rng = np.random.default_rng(index)
+    background = rng.normal(90, 18, (height // 8, width // 8, 3)).clip(0, 255).astype(np.uint8)
+    photo = Image.fromarray(background).resize((width, height), Image.BILINEAR)
+    noise = rng.normal(0, 6, (height, width, 1)).astype(np.int16)
+    photo = Image.fromarray((np.asarray(photo, dtype=np.int16) + noise).clip(0, 255).astype(np.uint8))
+    card = Image.open(BytesIO(make_card(index, width=int(width * 0.55))))
+    photo.paste(card, ((width - card.width) // 2 + int(rng.integers(-200, 200)), (height - card.height) // 2))
+    if orientation == 6:
+        photo = photo.transpose(Image.ROTATE_90)
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    buffered = BytesIO()
+    photo.save(buffered, format="JPEG", quality=quality, exif=exif)
+    return buffered.getvalue()
@@ -0,0 +1,114 @@
+# 벤치마크/로컬 테스트용 OpenAI 호환 비전 스텁 서버 (chat.completions, 이미지 data URL 입력)
+# 실행 (명함분석 에서): python -m bench.stub_vision --port 8083 --delay 1.0
+# 사용: OPENAI_BASE_URL=http://127.0.0.1:8083/v1 OPENAI_API_KEY=stub python card_batch.py cards/
+import argparse
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def card_reply(image_bytes):
+    # 이미지 내용마다 다른(같은 이미지는 같은) 명함 JSON
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    number = int(digest[:8], 16)
+    return "```json\n" + json.dumps({
+        "이름": f"홍길동{number % 1000:03d}",
+        "직책": "대표",
+        "회사": f"스텁상사 {digest[:4]}",
+        "전화번호": f"010-{number % 10000:04d}-{(number // 10000) % 10000:04d}",
+        "이메일": f"user{digest[:6]}@example.com",
+    }, ensure_ascii=False, indent=2) + "\n```"
+
+
+class StubServer(ThreadingHTTPServer):
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class StubVisionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive 허용
+    delay = 0.0             # 응답 지연 (모델 처리 시간)
+    upload_bandwidth = 0.0  # 이미지 바이트/초, 0 이 아니면 이미지 크기만큼 추가 지연
+    rpm = 0                 # 분당 허용 요청 수 (1초 단위로 rpm/60 개, 초과 시 429 + Retry-After), 0 이면 제한 없음
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request_body = json.loads(self.rfile.read(length) or b"{}")
+        image_bytes = b""
+        for message in request_body.get("messages", []):
+            for part in message.get("content") if isinstance(message.get("content"), list) else []:
+                if part.get("type") == "image_url":
+                    image_bytes += base64.b64decode(part["image_url"]["url"].split(",", 1)[1])
+
+        with self.server.lock:
+            now = time.monotonic()
+            window = self.server.window
+            while window and now - window[0] > 1.0:
+                window.popleft()
+            limited = bool(self.rpm) and len(window) >= max(1, self.rpm // 60)
+            if limited:
+                self.server.rejected_count += 1
+            else:
+                window.append(now)
+                self.server.request_count += 1
+                self.server.image_bytes += len(image_bytes)
+        if limited:
+            payload = json.dumps({"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}).encode()
+            self.send_response(429)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Retry-After", f"{max(0.05, 1.0 - (now - window[0])):.2f}")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        time.sleep(self.delay + (len(image_bytes) / self.upload_bandwidth if self.upload_bandwidth else 0.0))
+        reply = card_reply(image_bytes)
+        body = {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request_body.get("model") or "stub",
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": reply}}],
+            "usage": {"prompt_tokens": 85, "completion_tokens": len(reply) // 4, "total_tokens": 85 + len(reply) // 4},
+        }
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=0, delay=0.0, rpm=0, upload_bandwidth=0.0, handler=StubVisionHandler):
+    # 별도 스레드에서 서버를 띄우고 (server, base_url) 반환, base_url 은 OPENAI_BASE_URL 로 사용
+    handler_class = type("ConfiguredHandler", (handler,), {"delay": delay, "rpm": rpm, "upload_bandwidth": upload_bandwidth})
+    server = StubServer(("127.0.0.1", port), handler_class)
+    server.request_count = 0
+    server.rejected_count = 0
+    server.image_bytes = 0
+    server.window = deque()
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8083)
+    parser.add_argument("--delay", type=float, default=1.0)
+    parser.add_argument("--rpm", type=int, default=0)
+    args = parser.parse_args()
+    server, base_url = start_stub_server(args.port, args.delay, args.rpm)
+    print(f"Stub vision server running on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,202 @@
+import argparse
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from openai import RateLimitError
+import card_store
+from card_cache import extraction_cache
+from card_vision import client, extract_card_text, extract_text_from_image
+
+# 명함 묶음(폴더 또는 zip) 일괄 추출: 동시 요청 수 제한 + 분당 요청 수 제한,
+# 끝나는 순서대로 DB 에 저장하고 진행률/처리량(장/분) 보고
+# 실행: python card_batch.py cards.zip --workers 8 --rpm 300
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png")
+
+# 429 는 RateLimiter 가 모든 작업자를 함께 멈추고 다시 시도하므로 SDK 자체 재시도는 끔
+batch_client = client.with_options(max_retries=0)
+
+
+class RateLimiter:
+    # 요청 간격을 60/rpm 초로 맞추고, 429 를 받으면 Retry-After 만큼 모든 작업자가 함께 쉰 뒤
+    # 간격을 두 배로 늘렸다가 성공할 때마다 조금씩 원래 간격으로 되돌림 (rpm 을 몰라도 한도에 맞춰짐)
+    MIN_BACKOFF_INTERVAL = 0.05
+    MAX_INTERVAL = 10.0
+
+    def __init__(self, rpm=0):
+        self.base_interval = 60.0 / rpm if rpm else 0.0
+        self.interval = self.base_interval
+        self.next_at = 0.0
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            wait_s = max(0.0, self.next_at - now)
+            self.next_at = max(now, self.next_at) + self.interval
+        if wait_s:
+            time.sleep(wait_s)
+
+    def record_success(self):
+        with self.lock:
+            if self.interval > self.base_interval:
+                self.interval = max(self.base_interval, self.interval * 0.9)
+
+    def pause(self, seconds):
+        with self.lock:
+            now = time.monotonic()
+            # 같은 쉬는 구간에 여러 작업자가 받은 429 는 한 번만 반영
+            if now >= self.paused_until:
+                self.interval = min(self.MAX_INTERVAL, max(self.interval * 2, self.MIN_BACKOFF_INTERVAL))
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.next_at = max(self.next_at, self.paused_until)
+
+
+class BatchProgress:
+    def __init__(self, total=None):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.cached = 0
+        self.rate_limited = 0
+        self.started = time.perf_counter()
+        # rate_limited 는 작업자 스레드에서도 올리므로 잠금 (나머지는 run_batch 스레드에서만)
+        self.lock = threading.Lock()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def cards_per_min(self):
+        return self.done * 60 / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        total = self.total if self.total is not None else self.done + self.failed
+        return (f"{self.done}/{total} cards, {self.cached} from cache, {self.failed} failed, {self.rate_limited} rate-limited retries, "
+                f"{self.elapsed:.1f}s, {self.cards_per_min:.1f} cards/min")
+
+
+def iter_card_images(path):
+    # (이름, 이미지 바이트) 를 이름순으로, 폴더와 zip 모두 지원
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for name in sorted(archive.namelist()):
+                if name.lower().endswith(IMAGE_SUFFIXES) and not name.startswith("__MACOSX/"):
+                    yield name, archive.read(name)
+        return
+    for name in sorted(os.listdir(path)):
+        if name.lower().endswith(IMAGE_SUFFIXES):
+            with open(os.path.join(path, name), "rb") as image_file:
+                yield name, image_file.read()
+
+def count_card_images(path):
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            return sum(1 for name in archive.namelist()
+                       if name.lower().endswith(IMAGE_SUFFIXES) and not name.startswith("__MACOSX/"))
+    return sum(1 for name in os.listdir(path) if name.lower().endswith(IMAGE_SUFFIXES))
+
+def retry_after_seconds(value, default):
+    # Retry-After 는 초 또는 HTTP 날짜, 읽을 수 없으면 default
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return default
+
+def extract_card(image_bytes, limiter, progress, max_attempts=8):
+    # 캐시에 없을 때만 요청 수 제한을 지키며 모델 호출, (추출 결과, 캐시 사용 여부, 명함 키)
+    def extract(image_data):
+        for attempt in range(max_attempts):
+            limiter.acquire()
+            try:
+                extracted_text = extract_text_from_image(image_data, vision_client=batch_client)
+                limiter.record_success()
+                return extracted_text
+            except RateLimitError as e:
+                if attempt == max_attempts - 1:
+                    raise
+                with progress.lock:
+                    progress.rate_limited += 1
+                limiter.pause(retry_after_seconds(e.response.headers.get("retry-after"), min(2 ** attempt, 30)))
+
+    return extract_card_text(image_bytes, extract)
+
+def run_batch(cards, workers=8, rpm=0, on_result=None, total=None):
+    # cards: (이름, 바이트) iterable. 동시에 workers 개까지만 들고 있어 큰 zip 도 메모리에 다 올리지 않음
+    # on_result(name, extracted_text, error, progress, cached, card_sha256) 는 호출한 스레드에서 완료 순서대로 호출
+    limiter = RateLimiter(rpm)
+    progress = BatchProgress(total)
+    cards = iter(cards)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+
+        def submit_next():
+            card = next(cards, None)
+            if card is not None:
+                pending[executor.submit(extract_card, card[1], limiter, progress)] = card[0]
+            return card is not None
+
+        for _ in range(workers * 2):
+            if not submit_next():
+                break
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = pending.pop(future)
+                try:
+                    (extracted_text, cached, card_sha256), error = future.result(), None
+                    with progress.lock:
+                        progress.done += 1
+                        progress.cached += cached
+                except Exception as e:
+                    extracted_text, cached, card_sha256, error = None, False, None, e
+                    with progress.lock:
+                        progress.failed += 1
+                if on_result is not None:
+                    on_result(name, extracted_text, error, progress, cached, card_sha256)
+                submit_next()
+    return progress
+
+def ingest(path, workers=8, rpm=0, db_path=None, report=print):
+    store = card_store.CardStore(db_path)
+    extraction_cache.connect(db_path)
+    total = count_card_images(path)
+
+    def on_result(name, extracted_text, error, progress, cached, card_sha256):
+        # 캐시 적중이어도 저장: 미리보기만 했거나 저장 전에 멈춘 명함도 여기서 들어가고, 이미 있는 사진은 card_store 가 건너뜀
+        if error is None:
+            store.add(extracted_text, card_sha256)
+            report(f"[{progress.done + progress.failed}/{total}] {name} {'cached' if cached else 'ok'} "
+                   f"({progress.cards_per_min:.1f} cards/min)")
+        else:
+            report(f"[{progress.done + progress.failed}/{total}] {name} failed: {error}")
+
+    try:
+        return run_batch(iter_card_images(path), workers, rpm, on_result, total)
+    finally:
+        store.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="명함 이미지 폴더/zip 일괄 추출")
+    parser.add_argument("path", help="명함 이미지 폴더 또는 zip 파일")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("CARD_BATCH_WORKERS", "8")))
+    parser.add_argument("--rpm", type=int, default=int(os.getenv("CARD_BATCH_RPM", "0")), help="분당 최대 요청 수 (0: 제한 없음)")
+    parser.add_argument("--db", default=None, help="저장할 SQLite 파일 (기본: CARD_DB_PATH 또는 extracted_data.db)")
+    args = parser.parse_args()
+    progress = ingest(args.path, args.workers, args.rpm, args.db)
+    print(progress.summary())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import contextlib
+import os
+import threading
+import time
+import numpy as np
+import card_store
+from card_image import thumbnail_distance
+
+# 추출 결과 캐시 (extracted_data.db 의 extraction_cache 테이블, 스키마는 card_store 마이그레이션)
+# 원본 바이트 SHA-256 이 같으면 그대로, 아니면 같은 크기에 거의 같은 사진(재압축, EXIF 제거 등)의 결과를 재사용
+# Streamlit 은 위젯을 건드릴 때마다 스크립트 전체를 다시 실행하므로, 같은 업로드가 모델을 다시 부르지 않게 함
+# 축소된 사본은 일부러 매칭하지 않음: 같은 디자인 명함의 숫자 한 글자 차이가 리샘플링 오차와 구분되지 않음
+MAX_HASH_DISTANCE = int(os.getenv("CARD_PHASH_MAX_DISTANCE", "12"))                 # dHash 64비트 중, 0 이면 정확 일치만
+MAX_THUMBNAIL_DISTANCE = float(os.getenv("CARD_THUMBNAIL_MAX_DISTANCE", "3.0"))     # 블록 평균 밝기 차 (0~255)
+
+# 바이트별 1 비트 수 (np.bitwise_count 는 NumPy 2.0 부터라 고정 버전 1.26 에서 쓰지 않음)
+POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+def hamming_distances(hashes, query):
+    return POPCOUNT[(hashes ^ query).view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+class ExtractionCache:
+    def __init__(self, max_hash_distance=MAX_HASH_DISTANCE, max_thumbnail_distance=MAX_THUMBNAIL_DISTANCE):
+        self.max_hash_distance = max_hash_distance
+        self.max_thumbnail_distance = max_thumbnail_distance
+        self.conn = None
+        self.path = None
+        # 근접 후보 검색용 (앞 len(keys) 행만 유효): 원본 크기 (width, height), dHash
+        self.keys = []
+        self.sizes = np.zeros((0, 2), dtype=np.int64)
+        self.hashes = np.zeros(0, dtype=np.uint64)
+        self.key_locks = {}  # sha256 -> [잠금, 기다리거나 쥐고 있는 스레드 수]
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def connect(self, path=None):
+        # path 없이 부르면 이미 연결된 DB 를 그대로 사용
+        with self.lock:
+            if self.conn is not None and path in (None, self.path):
+                return
+            path = path or card_store.DB_PATH
+            self.conn = card_store.connect(path, check_same_thread=False)
+            self.path = path
+            rows = self.conn.execute('SELECT sha256, width, height, dhash FROM extraction_cache').fetchall()
+            self.keys = [row[0] for row in rows]
+            self.sizes = np.array([row[1:3] for row in rows], dtype=np.int64).reshape(-1, 2)
+            self.hashes = np.frombuffer(b"".join(row[3] for row in rows), dtype=np.uint64).copy()
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+            self.conn = None
+            self.path = None
+
+    @contextlib.contextmanager
+    def key_lock(self, sha256):
+        # 같은 사진이 동시에 들어오면(일괄 처리) 하나만 모델을 부르고 나머지는 그 결과를 기다림
+        # 마지막 사용자가 나갈 때 항목을 지움 (캐시 적중, 추출 실패도 포함, 기다리는 스레드가 있으면 남김)
+        with self.lock:
+            entry = self.key_locks.setdefault(sha256, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self.lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self.key_locks[sha256]
+
+    def get(self, sha256):
+        # (추출 결과, 명함 키) 또는 None. 명함 키는 처음 추출한 사진의 SHA-256 (cards.image_sha256)
+        self.connect()
+        with self.lock:
+            row = self.conn.execute('SELECT extracted_text, COALESCE(card_sha256, sha256) FROM extraction_cache WHERE sha256 = ?',
+                                    (sha256,)).fetchone()
+            if row is not None:
+                self.hits += 1
+        return tuple(row) if row is not None else None
+
+    def find_similar(self, size, dhash, thumbnail):
+        self.connect()
+        with self.lock:
+            count = len(self.keys)
+            if not self.max_hash_distance or not count:
+                self.misses += 1
+                return None
+            query = np.frombuffer(dhash, dtype=np.uint64)[0]
+            candidates = np.flatnonzero((self.sizes[:count] == size).all(axis=1)
+                                        & (hamming_distances(self.hashes[:count], query) <= self.max_hash_distance))
+            for index in candidates:
+                row = self.conn.execute('SELECT thumbnail, extracted_text, COALESCE(card_sha256, sha256) '
+                                        'FROM extraction_cache WHERE sha256 = ?', (self.keys[index],)).fetchone()
+                if thumbnail_distance(row[0], thumbnail) <= self.max_thumbnail_distance:
+                    self.near_hits += 1
+                    return row[1], row[2]
+            self.misses += 1
+            return None
+
+    def put(self, sha256, size, dhash, thumbnail, extracted_text, card_sha256=None):
+        # card_sha256: 근접 일치로 다른 사진의 결과를 재사용했으면 그 사진의 명함 키 (같은 명함을 두 번 저장하지 않도록)
+        self.connect()
+        with self.lock, self.conn:
+            self.conn.execute('''INSERT OR REPLACE INTO extraction_cache
+                                 (sha256, width, height, dhash, thumbnail, extracted_text, created_at, card_sha256)
+                                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                              (sha256, size[0], size[1], dhash, thumbnail, extracted_text, time.time(), card_sha256))
+            if len(self.keys) == len(self.hashes):
+                # 두 배씩 늘려 추가 비용을 상수로
+                grow = max(len(self.hashes), 64)
+                self.sizes = np.vstack([self.sizes, np.zeros((grow, 2), dtype=np.int64)])
+                self.hashes = np.concatenate([self.hashes, np.zeros(grow, dtype=np.uint64)])
+            self.sizes[len(self.keys)] = size
+            self.hashes[len(self.keys)] = np.frombuffer(dhash, dtype=np.uint64)[0]
+            self.keys.append(sha256)
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "near_hits": self.near_hits, "misses": self.misses, "entries": len(self.keys)}
+
+
+extraction_cache = ExtractionCache()
@@ -1,79 +1,71 @@
 import streamlit as st
 from PIL import Image
 import requests
-import base64
-import os
-import sqlite3
 from io import BytesIO
-from dotenv import load_dotenv
-from openai import OpenAI
-
-# Load environment variables
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-
-client = OpenAI(api_key)
-
-system_prompt = """
-사진에 있는 글자를 모두 출력해. 너의 의견을 적지마. 단순한 글자들의 나열만 출력해.너가 지어내면 안돼.
-
-예를 들면, 직업, 전화번호, 이메일의 나열만 보여줘.무조건 JSON형태로 출력해야해.
-직책은 직책, 이름은 이름에 맞게 들어가야 한다는 것을 명심해.
-직업: 엔지니어
-직책: 대표
-전화번호: 000-0000-0000
-이메일: aaaa@aaaaa.com
-이름: 홍길동
-"""
-
-def encode_image(image):
-    buffered = BytesIO()
-    image.save(buffered, format="JPEG")
-    return base64.b64encode(buffered.getvalue()).decode("utf-8")
-
-def extract_text_from_image(image_data):
-    response = client.completions.create(
-        model="gpt-4",
-        prompt=system_prompt + "\n" + f"data:image/jpeg;base64,{image_data}",
-        max_tokens=500,
-        temperature=0.0
-    )
-    return response.choices[0].text.strip()
-
-def alter_table_add_column(conn, column_name, column_type):
-    c = conn.cursor()
-    try:
-        c.execute(f"ALTER TABLE extracted_data ADD COLUMN {column_name} {column_type}")
-        conn.commit()
-    except sqlite3.OperationalError as e:
-        if "duplicate column name" in str(e):
-            pass  # Column already exists, ignore error
+import card_store
+from card_batch import run_batch
+from card_vision import extract_card_text
+
+@st.cache_resource
+def get_card_store():
+    # 재실행/세션마다 새로 연결하지 않고 프로세스에서 하나만 사용
+    return card_store.CardStore()
+
+def save_to_sqlite(extracted_text, card_sha256):
+    # 같은 사진의 명함이 이미 있으면 저장하지 않음 (재실행, 재업로드, app_stream.py 에서 미리보기만 한 명함도 여기서 저장)
+    if get_card_store().save(extracted_text, card_sha256):
+        # 디버깅: 데이터 확인
+        st.write("Saving data to SQLite:", extracted_text)
+        st.success("Data saved to SQLite database successfully!")
+
+def fetch_from_sqlite(query, cursor, limit):
+    return get_card_store().search(query, cursor, limit)
+
+def show_cards(page_size=20):
+    # 이름/회사 검색 또는 전화번호/이메일 조회, 커서 페이지네이션 (지나온 페이지의 커서를 쌓아 두고 이전/다음 이동)
+    query = st.text_input("Search by name, company, phone or email:")
+    if st.session_state.get("card_query") != query:
+        st.session_state.card_query = query
+        st.session_state.card_cursors = [None]
+    cursors = st.session_state.card_cursors
+
+    rows, next_cursor = fetch_from_sqlite(query, cursors[-1], page_size)
+    if rows:
+        st.table([{"ID": row[0], "Name": row[1], "Title": row[2], "Company": row[3], "Phone": row[4], "Email": row[5]}
+                  for row in rows])
+    else:
+        st.write("No data found in the database.")
+
+    previous_column, page_column, next_column = st.columns(3)
+    page_column.write(f"Page {len(cursors)}")
+    if len(cursors) > 1 and previous_column.button("Previous"):
+        cursors.pop()
+        st.rerun()
+    if next_cursor is not None and next_column.button("Next"):
+        cursors.append(next_cursor)
+        st.rerun()
+
+def extract_batch(uploaded_files):
+    # 여러 장을 동시에 추출하고 끝나는 순서대로 저장, 진행률과 처리량 표시
+    store = get_card_store()
+    progress_bar = st.progress(0.0)
+    status = st.empty()
+
+    def on_result(name, extracted_text, error, progress, cached, card_sha256):
+        if error is not None:
+            st.warning(f"{name}: {error}")
         else:
-            raise e
-
-def save_to_sqlite(extracted_text):
-    conn = sqlite3.connect('extracted_data.db')
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS extracted_data
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT)''')
-    # 테이블에 열 추가
-    alter_table_add_column(conn, "extracted_text", "TEXT")
-    # 디버깅: 데이터 확인
-    st.write("Saving data to SQLite:", extracted_text)
-    c.execute('''INSERT INTO extracted_data (extracted_text)
-                 VALUES (?)''',
-              (extracted_text,))
-    conn.commit()
-    conn.close()
-    st.success("Data saved to SQLite database successfully!")
-
-def fetch_from_sqlite():
-    conn = sqlite3.connect('extracted_data.db')
-    c = conn.cursor()
-    c.execute('SELECT * FROM extracted_data')
-    rows = c.fetchall()
-    conn.close()
-    return rows
+            store.add(extracted_text, card_sha256)
+        finished = progress.done + progress.failed
+        progress_bar.progress(finished / len(uploaded_files))
+        status.write(f"{finished}/{len(uploaded_files)} cards ({progress.cards_per_min:.1f} cards/min)")
+
+    cards = ((uploaded_file.name, uploaded_file.getvalue()) for uploaded_file in uploaded_files)
+    try:
+        progress = run_batch(cards, on_result=on_result, total=len(uploaded_files))
+    finally:
+        store.flush()
+    st.success(progress.summary())
 
 def main():
     st.title("Image Text Extractor")
@@ -81,42 +73,37 @@ def main():
 
     uploaded_file = st.file_uploader("Choose an image...", type=["jpg", "jpeg", "png"])
     image_url = st.text_input("Or enter an image URL:")
+    batch_files = st.file_uploader("Or upload a stack of cards...", type=["jpg", "jpeg", "png"], accept_multiple_files=True)
 
     if uploaded_file is not None:
         image = Image.open(uploaded_file)
         st.image(image, caption='Uploaded Image.', use_column_width=True)
-        image_data = encode_image(image)
         with st.spinner('Extracting text...'):
-            extracted_text = extract_text_from_image(image_data)
+            extracted_text, _, card_sha256 = extract_card_text(uploaded_file.getvalue())
         st.write("Extracted Text:")
         st.text(extracted_text)
 
-        save_to_sqlite(extracted_text)
+        save_to_sqlite(extracted_text, card_sha256)
 
     elif image_url:
         try:
             response = requests.get(image_url)
             image = Image.open(BytesIO(response.content))
             st.image(image, caption='Uploaded Image.', use_column_width=True)
-            image_data = encode_image(image)
             with st.spinner('Extracting text...'):
-                extracted_text = extract_text_from_image(image_data)
+                extracted_text, _, card_sha256 = extract_card_text(response.content)
             st.write("Extracted Text:")
             st.text(extracted_text)
 
-            save_to_sqlite(extracted_text)
+            save_to_sqlite(extracted_text, card_sha256)
         except Exception as e:
             st.error(f"Error loading image: {e}")
 
+    if batch_files and st.button(f"Extract {len(batch_files)} cards"):
+        extract_batch(batch_files)
+
     st.write("### Extracted Data from Database")
-    rows = fetch_from_sqlite()
-    if rows:
-        for row in rows:
-            st.write(f"ID: {row[0]}", end=', ')
-            st.write(f"Extracted Text: {row[1]}")
-            st.write()  # 줄바꿈
-    else:
-        st.write("No data found in the database.")
+    show_cards()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,45 @@
+import json
+import re
+
+# 모델이 돌려준 명함 JSON(코드 블록 포함 가능, 키 이름이 매번 조금씩 다름) -> 정해진 필드
+FIELD_KEYS = {
+    "name": ("이름", "성명", "name"),
+    "title": ("직책", "직위", "직급", "title", "position"),
+    "company": ("회사", "회사명", "소속", "company"),
+    "phone": ("전화번호", "휴대폰", "핸드폰", "휴대전화", "연락처", "mobile", "phone", "tel"),
+    "email": ("이메일", "메일", "email", "e-mail", "mail"),
+}
+FIELD_BY_KEY = {key.lower(): field for field, keys in FIELD_KEYS.items() for key in keys}
+
+JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+def parse_card_fields(extracted_text):
+    # 해당 키가 없거나 JSON 이 아니면 그 필드는 None
+    fields = dict.fromkeys(FIELD_KEYS)
+    match = JSON_OBJECT.search(extracted_text or "")
+    try:
+        data = json.loads(match.group(0)) if match else {}
+    except json.JSONDecodeError:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    for key, value in data.items():
+        field = FIELD_BY_KEY.get(str(key).strip().lower())
+        # 같은 필드에 여러 키가 있으면 먼저 나온 값 (예: 휴대폰이 TEL 보다 앞)
+        if field and fields[field] is None and isinstance(value, (str, int)) and str(value).strip():
+            fields[field] = str(value).strip()
+    return fields
+
+def normalize_phone(phone):
+    # 숫자만 남기고 국가번호(+82)는 0 으로: "+82 10-1234-5678" -> "01012345678"
+    if not phone:
+        return None
+    digits = re.sub(r"\D", "", phone)
+    if digits.startswith("82") and phone.strip().startswith("+"):
+        digits = "0" + digits[2:]
+    return digits or None
+
+def normalize_email(email):
+    match = EMAIL.search(email or "")
+    return match.group(0).lower() if match else None
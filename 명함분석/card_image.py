@@ -0,0 +1,115 @@
+import os
+from io import BytesIO
+import numpy as np
+from PIL import Image, ImageOps
+
+# 비전 모델에 올리기 전 명함 사진 전처리: EXIF 회전 보정 -> 명함 영역 잘라내기 -> 긴 변 축소 -> JPEG 재인코딩
+# 휴대폰 원본(12MP, 수 MB)을 그대로 올리면 업로드가 느리고 high detail 이미지 토큰도 많이 듦
+MAX_EDGE = int(os.getenv("CARD_IMAGE_MAX_EDGE", "1024"))
+# 글자 가장자리가 뭉개지지 않는 선에서 용량을 줄이는 값 (낮출수록 작은 글씨 주변에 번짐이 생김)
+JPEG_QUALITY = int(os.getenv("CARD_JPEG_QUALITY", "80"))
+CROP_ENABLED = os.getenv("CARD_CROP_ENABLED", "true").lower() == "true"
+
+DETECT_EDGE = 256        # 명함 영역 탐지는 이 크기의 축소본에서
+CROP_MARGIN = 0.02       # 잘라낼 때 여유 (변 길이 비율)
+TILE_SIZE = 512          # high detail 이미지 토큰은 512px 타일 단위
+MAX_TILE_SHRINK = 0.15   # 타일 경계를 조금 넘는 크기는 이 비율까지 더 줄여 타일 수를 줄임
+MIN_CARD_FRACTION = 0.1  # 탐지 영역이 이보다 작거나
+MAX_CARD_FRACTION = 0.9  # 이보다 크면 잘라내지 않음 (오탐이거나 이미 명함만 찍힌 사진)
+MIN_CARD_FILL = 0.6      # 상자 안이 이만큼 채워져 있어야 명함 (이미 잘린 명함에서는 글씨 덩어리가 잡히는데 빈틈이 많음)
+
+def otsu_threshold(gray):
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    weights = np.cumsum(histogram)
+    means = np.cumsum(histogram * np.arange(256))
+    total, total_mean = weights[-1], means[-1]
+    background = weights[:-1]
+    foreground = total - background
+    valid = (background > 0) & (foreground > 0)
+    variance = np.zeros(255)
+    variance[valid] = (total_mean * background[valid] - means[:-1][valid] * total) ** 2 / (background[valid] * foreground[valid])
+    return int(np.argmax(variance))
+
+def find_card_box(image):
+    # 배경과 밝기가 다른 가장 큰 덩어리의 경계 상자 (left, upper, right, lower), 못 찾으면 None
+    small = image.reduce(max(1, max(image.size) // DETECT_EDGE)).convert("L")
+    gray = np.asarray(small)
+    mask = gray > otsu_threshold(gray)
+    # 가장자리에 많은 쪽을 배경으로 봄 (어두운 책상 위 흰 명함, 밝은 배경 위 어두운 명함 모두)
+    border = np.concatenate([mask[0], mask[-1], mask[:, 0], mask[:, -1]])
+    if border.mean() > 0.5:
+        mask = ~mask
+
+    # 행/열마다 전경 비율이 최대의 절반 이상인 구간 (글씨·잡티 같은 작은 덩어리 무시)
+    rows, cols = mask.mean(axis=1), mask.mean(axis=0)
+    if rows.max() == 0:
+        return None
+    row_idx = np.flatnonzero(rows >= rows.max() / 2)
+    col_idx = np.flatnonzero(cols >= cols.max() / 2)
+    top, bottom, left, right = row_idx[0], row_idx[-1] + 1, col_idx[0], col_idx[-1] + 1
+
+    height, width = gray.shape
+    fraction = (bottom - top) * (right - left) / (height * width)
+    if not MIN_CARD_FRACTION <= fraction <= MAX_CARD_FRACTION or mask[top:bottom, left:right].mean() < MIN_CARD_FILL:
+        return None
+    scale_x, scale_y = image.width / width, image.height / height
+    margin_x, margin_y = (right - left) * CROP_MARGIN, (bottom - top) * CROP_MARGIN
+    return (max(0, int((left - margin_x) * scale_x)), max(0, int((top - margin_y) * scale_y)),
+            min(image.width, int((right + margin_x) * scale_x)), min(image.height, int((bottom + margin_y) * scale_y)))
+
+def fingerprint(image, hash_size=8, thumbnail_size=64):
+    # 회전 보정한 사진 전체의 (dHash 64비트, 회색조 축소본 bytes)
+    # dHash 는 후보를 빠르게 좁히는 용도, 같은 사진인지는 축소본의 블록별 차이로 확인 (thumbnail_distance)
+    small = image.reduce(max(1, max(image.size) // (DETECT_EDGE * 2))).convert("L")
+    pixels = np.asarray(small.resize((hash_size + 1, hash_size), Image.BOX), dtype=np.int16)
+    dhash = np.packbits(pixels[:, 1:] > pixels[:, :-1]).tobytes()
+    return dhash, small.resize((thumbnail_size, thumbnail_size), Image.BOX).tobytes()
+
+def thumbnail_distance(a, b, block=4):
+    # 4x4 블록 평균 밝기 차이의 최댓값: 재압축은 전체적으로 조금씩, 글자 하나 바뀐 명함은 그 자리에서 크게 다름
+    a, b = np.frombuffer(a, dtype=np.uint8), np.frombuffer(b, dtype=np.uint8)
+    size = int(np.sqrt(a.size))
+    diff = np.abs(a.astype(np.int16) - b.astype(np.int16)).reshape(size // block, block, size // block, block)
+    return float(diff.mean(axis=(1, 3)).max())
+
+def preprocess_card_image(image, max_edge=None, crop=None):
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    if CROP_ENABLED if crop is None else crop:
+        box = find_card_box(image)
+        if box is not None:
+            image = image.crop(box)
+    max_edge = max_edge or MAX_EDGE
+    scale = min(1.0, max_edge / max(image.size))
+    scale *= fit_to_tiles(image.width * scale, image.height * scale)
+    if scale < 1.0:
+        image = image.resize((round(image.width * scale), round(image.height * scale)), Image.LANCZOS)
+    return image
+
+def fit_to_tiles(width, height):
+    # 변 하나가 타일 경계를 살짝 넘으면(예: 1024x569 -> 2x2 타일) 경계 안으로 줄이는 배율 (-> 921x512, 2x1 타일)
+    best_scale, best_tiles = 1.0, tile_count(width, height)
+    for edge in (width, height):
+        if edge > TILE_SIZE and edge % TILE_SIZE:
+            scale = (edge // TILE_SIZE) * TILE_SIZE / edge
+            tiles = tile_count(width * scale, height * scale)
+            if scale >= 1 - MAX_TILE_SHRINK and tiles < best_tiles:
+                best_scale, best_tiles = scale, tiles
+    return best_scale
+
+def tile_count(width, height):
+    return int(np.ceil(round(width) / TILE_SIZE)) * int(np.ceil(round(height) / TILE_SIZE))
+
+def encode_card_jpeg(image, max_edge=None, quality=None, crop=None):
+    buffered = BytesIO()
+    preprocess_card_image(image, max_edge, crop).save(buffered, format="JPEG", quality=quality or JPEG_QUALITY, optimize=True)
+    return buffered.getvalue()
+
+def estimate_image_tokens(width, height):
+    # OpenAI high detail 이미지 토큰: 2048 안으로 맞춘 뒤 짧은 변 768 로 축소, 512px 타일당 170 + 85
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    return 85 + 170 * tile_count(width, height)
@@ -0,0 +1,198 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from card_fields import normalize_email, normalize_phone, parse_card_fields
+
+# 명함 저장소 (card_db.py 화면과 card_batch.py 일괄 처리 공용)
+# 스키마는 PRAGMA user_version 으로 관리하는 마이그레이션으로 한 번만 만들고, 이후 연결 때는 버전만 확인
+DB_PATH = os.getenv("CARD_DB_PATH", "extracted_data.db")
+FLUSH_SIZE = int(os.getenv("CARD_DB_FLUSH_SIZE", "500"))             # 이만큼 모이면 한 트랜잭션으로 저장
+FLUSH_SECONDS = float(os.getenv("CARD_DB_FLUSH_SECONDS", "2.0"))     # 덜 모였어도 이 시간이 지나면 저장
+BUSY_TIMEOUT_MS = int(os.getenv("CARD_DB_BUSY_TIMEOUT_MS", "5000"))
+
+CARD_COLUMNS = ("name", "title", "company", "phone", "phone_normalized", "email", "email_normalized", "extracted_text")
+
+def migrate_v1_cards(conn):
+    # 구조화된 cards 테이블 + 조회용 인덱스 + 이름/회사 전문 검색(FTS5, cards 와 트리거로 동기화)
+    conn.execute('''CREATE TABLE cards
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     name TEXT, title TEXT, company TEXT,
+                     phone TEXT, phone_normalized TEXT,
+                     email TEXT, email_normalized TEXT,
+                     extracted_text TEXT, created_at REAL NOT NULL)''')
+    conn.execute('CREATE INDEX idx_cards_phone ON cards (phone_normalized)')
+    conn.execute('CREATE INDEX idx_cards_email ON cards (email_normalized)')
+    conn.execute('''CREATE VIRTUAL TABLE cards_fts USING fts5
+                    (name, company, content='cards', content_rowid='id', tokenize='unicode61', prefix='2 3')''')
+    conn.execute('''CREATE TRIGGER cards_ai AFTER INSERT ON cards BEGIN
+                        INSERT INTO cards_fts (rowid, name, company) VALUES (new.id, new.name, new.company);
+                    END''')
+    conn.execute('''CREATE TRIGGER cards_ad AFTER DELETE ON cards BEGIN
+                        INSERT INTO cards_fts (cards_fts, rowid, name, company) VALUES ('delete', old.id, old.name, old.company);
+                    END''')
+    conn.execute('''CREATE TRIGGER cards_au AFTER UPDATE ON cards BEGIN
+                        INSERT INTO cards_fts (cards_fts, rowid, name, company) VALUES ('delete', old.id, old.name, old.company);
+                        INSERT INTO cards_fts (rowid, name, company) VALUES (new.id, new.name, new.company);
+                    END''')
+
+    # 예전 extracted_data (추출 원문만 저장) 는 원문을 파싱해 옮기고 삭제
+    legacy = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'extracted_data'").fetchone()
+    if legacy is not None:
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(extracted_data)')}
+        if "extracted_text" in columns:
+            rows = conn.execute('SELECT id, extracted_text FROM extracted_data').fetchall()
+            conn.executemany(f'INSERT INTO cards (id, {", ".join(CARD_COLUMNS)}, created_at) VALUES (?, {", ".join("?" * len(CARD_COLUMNS))}, ?)',
+                             [(row[0], *card_record(row[1]), time.time()) for row in rows])
+        conn.execute('DROP TABLE extracted_data')
+
+def migrate_v2_extraction_cache(conn):
+    # card_cache.py 의 추출 결과 캐시. 예전에는 연결할 때 직접 만들었으므로 이미 있는 DB 도 있음
+    conn.execute('''CREATE TABLE IF NOT EXISTS extraction_cache
+                    (sha256 TEXT PRIMARY KEY, width INTEGER NOT NULL, height INTEGER NOT NULL,
+                     dhash BLOB NOT NULL, thumbnail BLOB NOT NULL,
+                     extracted_text TEXT NOT NULL, created_at REAL NOT NULL)''')
+
+def migrate_v3_card_image_key(conn):
+    # 명함 행에 원본 사진 SHA-256 (같은 사진이면 한 번만 저장), 예전 행은 NULL
+    # 캐시 항목이 근접 일치로 다른 사진의 결과를 재사용했으면 그 사진의 키를 card_sha256 에 (NULL 이면 자기 자신)
+    conn.execute('ALTER TABLE cards ADD COLUMN image_sha256 TEXT')
+    conn.execute('CREATE UNIQUE INDEX idx_cards_image ON cards (image_sha256)')
+    conn.execute('ALTER TABLE extraction_cache ADD COLUMN card_sha256 TEXT')
+
+# 순서대로 user_version 1, 2, ... (이미 배포된 항목은 고치지 말고 뒤에 추가)
+MIGRATIONS = [migrate_v1_cards, migrate_v2_extraction_cache, migrate_v3_card_image_key]
+
+def migrate(conn):
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        # sqlite3 모듈은 DDL 앞에 트랜잭션을 열지 않으므로 직접 BEGIN (실패하면 버전째로 되돌림)
+        # IMMEDIATE 로 쓰기 잠금을 먼저 잡고 버전을 다시 확인: 같은 파일을 연 다른 연결이 먼저 올렸으면 건너뜀
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if conn.execute('PRAGMA user_version').fetchone()[0] < number:
+                migration(conn)
+                conn.execute(f'PRAGMA user_version = {number}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+def connect(path=None, check_same_thread=True):
+    conn = sqlite3.connect(path or DB_PATH, check_same_thread=check_same_thread)
+    # WAL: 읽기가 쓰기 트랜잭션을 기다리지 않고, 커밋마다 fsync 하지 않음 (synchronous=NORMAL 은 체크포인트 때만)
+    conn.execute(f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}')
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    migrate(conn)
+    return conn
+
+def card_record(extracted_text):
+    # 추출 원문 -> CARD_COLUMNS 순서의 값
+    fields = parse_card_fields(extracted_text)
+    return (fields["name"], fields["title"], fields["company"],
+            fields["phone"], normalize_phone(fields["phone"]),
+            fields["email"], normalize_email(fields["email"]), extracted_text)
+
+def insert_cards(conn, cards):
+    # (추출 원문, 사진 SHA-256) 여러 장을 한 트랜잭션으로 저장, 이미 저장된 사진은 건너뜀. 새로 저장한 장 수
+    now = time.time()
+    with conn:
+        cursor = conn.executemany(f'INSERT OR IGNORE INTO cards ({", ".join(CARD_COLUMNS)}, image_sha256, created_at) '
+                                  f'VALUES ({", ".join("?" * len(CARD_COLUMNS))}, ?, ?)',
+                                  [(*card_record(text), image_sha256, now) for text, image_sha256 in cards])
+    return cursor.rowcount
+
+def fts_query(text):
+    # 사용자 입력 -> 단어별 접두어 검색 ("홍길 기아" -> "홍길"* AND "기아"*), FTS 문법 문자는 따옴표로 무력화
+    terms = [term.replace('"', '""') for term in text.split()]
+    return " AND ".join(f'"{term}"*' for term in terms)
+
+def search_cards(conn, query="", cursor=None, limit=20):
+    # 최신순 커서 페이지네이션 (cursor 는 이전 페이지 마지막 id), (행 목록, 다음 cursor)
+    # 이메일/전화번호처럼 보이면 정규화한 값으로 인덱스 조회, 아니면 이름/회사 전문 검색
+    query = (query or "").strip()
+    select, order = 'SELECT id, name, title, company, phone, email FROM cards', 'id'
+    where, params = [], []
+    if query and normalize_email(query) == query.lower():
+        where.append('email_normalized = ?')
+        params.append(normalize_email(query))
+    elif query and re.fullmatch(r"[\d\s+()-]{4,}", query) and normalize_phone(query):
+        # 앞자리부터 입력한 번호: 인덱스 범위 조회 (숫자 없이 기호만 있으면 아래 전문 검색으로)
+        phone = normalize_phone(query)
+        where.append('phone_normalized >= ? AND phone_normalized < ?')
+        params += [phone, phone + ":"]
+    elif query:
+        # FTS 쪽에서 rowid 역순으로 읽어야 흔한 성씨("김")도 매칭 전체를 모으지 않고 LIMIT 에서 멈춤
+        select = ('SELECT cards.id, cards.name, title, cards.company, phone, email FROM cards_fts '
+                  'JOIN cards ON cards.id = cards_fts.rowid')
+        order = 'cards_fts.rowid'
+        where.append('cards_fts MATCH ?')
+        params.append(fts_query(query))
+    if cursor is not None:
+        where.append(f'{order} < ?')
+        params.append(cursor)
+    sql = select + (' WHERE ' + ' AND '.join(where) if where else '') + f' ORDER BY {order} DESC LIMIT ?'
+    rows = conn.execute(sql, params + [limit + 1]).fetchall()
+    next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+class CardStore:
+    # 프로세스당 하나 (Streamlit 은 st.cache_resource 로 세션/재실행 간 공유)
+    # 쓰기: 연결 하나에 모아 두었다가 flush_size 장 또는 flush_seconds 초마다 한 트랜잭션으로 저장
+    # 읽기: 쓰기와 다른 연결 하나를 별도 잠금으로 공유 (WAL 이라 저장 중에도 기다리지 않고 마지막 커밋 기준으로 읽힘)
+    # Streamlit 은 재실행마다 새 스레드라 스레드별 연결을 두면 상호작용마다 연결이 쌓임
+    def __init__(self, path=None, flush_size=FLUSH_SIZE, flush_seconds=FLUSH_SECONDS):
+        self.path = path or DB_PATH
+        self.flush_size = flush_size
+        self.flush_seconds = flush_seconds
+        self.writer = connect(self.path, check_same_thread=False)
+        self.pending = []
+        self.pending_since = 0.0
+        self.lock = threading.Lock()
+        self.reader = sqlite3.connect(self.path, check_same_thread=False)
+        self.reader.execute(f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}')
+        self.read_lock = threading.Lock()
+
+    def add(self, extracted_text, image_sha256=None):
+        # 저장 대기열에 추가 (모이거나 오래되면 저장), 바로 보여야 하면 save()
+        with self.lock:
+            if not self.pending:
+                self.pending_since = time.monotonic()
+            self.pending.append((extracted_text, image_sha256))
+            if len(self.pending) >= self.flush_size or time.monotonic() - self.pending_since >= self.flush_seconds:
+                self.flush_locked()
+
+    def save(self, extracted_text, image_sha256=None):
+        # 새로 저장했으면 True (같은 사진이 이미 저장돼 있으면 False)
+        with self.lock:
+            self.pending.append((extracted_text, image_sha256))
+            return self.flush_locked() > 0
+
+    def flush(self):
+        with self.lock:
+            self.flush_locked()
+
+    def flush_locked(self):
+        if not self.pending:
+            return 0
+        # 실패하면 트랜잭션은 되돌려지고 대기열은 그대로 둔 채 예외를 올림 (다음 add/flush 에서 다시 시도)
+        inserted = insert_cards(self.writer, self.pending)
+        self.pending = []
+        return inserted
+
+    def search(self, query="", cursor=None, limit=20):
+        with self.read_lock:
+            return search_cards(self.reader, query, cursor, limit)
+
+    def close(self):
+        # 마지막 저장이 실패해도 연결은 닫고 예외를 올림
+        with self.lock:
+            try:
+                self.flush_locked()
+            finally:
+                with self.read_lock:
+                    self.reader.close()
+                self.writer.close()
@@ -0,0 +1,67 @@
+import base64
+import hashlib
+import os
+from io import BytesIO
+from dotenv import load_dotenv
+from openai import OpenAI
+from PIL import Image, ImageOps
+from card_cache import extraction_cache
+from card_image import encode_card_jpeg, fingerprint
+
+# 명함 이미지 -> 글자 추출 (app_stream.py, card_db.py, card_batch.py 공용)
+load_dotenv()
+
+VISION_MODEL = os.getenv("CARD_VISION_MODEL", "gpt-4o")
+
+# OPENAI_BASE_URL 로 로컬 스텁 서버를 가리킬 수 있음
+client = OpenAI(max_retries=int(os.getenv("CARD_VISION_MAX_RETRIES", "2")))
+
+system_prompt = """
+사진에 있는 글자를 모두 출력해. 너의 의견을 적지마. 단순한 글자들의 나열만 출력해.너가 지어내면 안돼.
+
+예를 들면, 직업, 전화번호, 이메일의 나열만 보여줘.무조건 JSON형태로 출력해야해.
+직책은 직책, 이름은 이름에 맞게 들어가야 한다는 것을 명심해.
+직업: 엔지니어
+회사: 주식회사 예시
+직책: 대표
+전화번호: 000-0000-0000
+이메일: aaaa@aaaaa.com
+이름: 홍길동
+"""
+
+def encode_image(image):
+    # 회전 보정/잘라내기/축소를 거친 JPEG 의 base64 (card_image.py)
+    return base64.b64encode(encode_card_jpeg(image)).decode("utf-8")
+
+def extract_text_from_image(image_data, vision_client=None):
+    response = (vision_client or client).chat.completions.create(
+        model=VISION_MODEL,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": [
+                {"type": "text", "text": "사진에 있는 글자를 모두 출력해"},
+                {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_data}"}}
+            ]}
+        ],
+        temperature=0.0,
+    )
+    return response.choices[0].message.content
+
+def extract_card_text(image_bytes, extract=None):
+    # 업로드 바이트 -> (추출 결과, 캐시 사용 여부, 명함 키). 같은 사진(또는 같은 크기로 재압축된 사본)이면 모델을 부르지 않음
+    # 명함 키는 처음 추출한 사진의 SHA-256: 저장은 캐시 사용 여부가 아니라 이 키의 cards 행이 있는지로 판단 (card_store)
+    # extract(image_data) 로 모델 호출을 바꿀 수 있음 (일괄 처리의 요청 수 제한/재시도)
+    sha256 = hashlib.sha256(image_bytes).hexdigest()
+    with extraction_cache.key_lock(sha256):
+        cached = extraction_cache.get(sha256)
+        if cached is not None:
+            return cached[0], True, cached[1]
+        image = ImageOps.exif_transpose(Image.open(BytesIO(image_bytes)))
+        dhash, thumbnail = fingerprint(image)
+        similar = extraction_cache.find_similar(image.size, dhash, thumbnail)
+        if similar is not None:
+            extracted_text, card_sha256 = similar
+        else:
+            extracted_text, card_sha256 = (extract or extract_text_from_image)(encode_image(image)), sha256
+        extraction_cache.put(sha256, image.size, dhash, thumbnail, extracted_text, card_sha256 if card_sha256 != sha256 else None)
+        return extracted_text, similar is not None, card_sha256
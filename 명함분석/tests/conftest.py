@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+# 명함분석 모듈은 평평한 구조라 상위 폴더를 경로에 추가 (bench.* 도 같이)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def stub_vision_server():
+    # card_vision 은 가져올 때 OpenAI 클라이언트를 만들므로, 가져오기 전에 스텁 주소를 지정
+    from bench import stub_vision
+    server, base_url = stub_vision.start_stub_server()
+    os.environ.update({"OPENAI_BASE_URL": base_url, "OPENAI_API_KEY": "stub-key"})
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def db_path(tmp_path, stub_vision_server):
+    from card_cache import extraction_cache
+    path = str(tmp_path / "extracted_data.db")
+    extraction_cache.connect(path)
+    yield path
+    extraction_cache.close()
@@ -0,0 +1,14 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+
+def test_retry_after_seconds(stub_vision_server):
+    from card_batch import retry_after_seconds
+
+    assert retry_after_seconds("3", 1) == 3.0
+    http_date = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=20), usegmt=True)
+    assert 15 < retry_after_seconds(http_date, 1) <= 20
+    # 지난 날짜는 바로 재시도, 읽을 수 없거나 없으면 기본 대기
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT", 1) == 0.0
+    assert retry_after_seconds("soon", 7) == 7
+    assert retry_after_seconds(None, 5) == 5
@@ -0,0 +1,46 @@
+import threading
+import time
+
+import pytest
+
+
+def test_failed_extraction_releases_key_lock(db_path):
+    from bench.card_images import make_card
+    from card_cache import extraction_cache
+    from card_vision import extract_card_text
+
+    def fail(image_data):
+        raise RuntimeError("vision API down")
+
+    card = make_card(3)
+    with pytest.raises(RuntimeError):
+        extract_card_text(card, extract=fail)
+    assert extraction_cache.key_locks == {}
+    # 다시 시도하면 정상 추출, 캐시 적중도 항목을 남기지 않음
+    assert not extract_card_text(card)[1]
+    assert extract_card_text(card)[1]
+    assert extraction_cache.key_locks == {}
+
+
+def test_same_photo_at_once_extracts_once(db_path):
+    from bench.card_images import make_card
+    from card_cache import extraction_cache
+    from card_vision import extract_card_text, extract_text_from_image
+
+    calls = []
+
+    def slow_extract(image_data):
+        calls.append(image_data)
+        time.sleep(0.1)  # 다른 스레드가 같은 잠금에서 기다리도록
+        return extract_text_from_image(image_data)
+
+    card = make_card(4)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(extract_card_text(card, extract=slow_extract)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1 and sorted(cached for _, cached, _ in results) == [False, True, True, True]
+    assert extraction_cache.key_locks == {}
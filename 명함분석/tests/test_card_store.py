@@ -0,0 +1,119 @@
+import sqlite3
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+
+def card_rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('SELECT image_sha256, name FROM cards').fetchall()
+    finally:
+        conn.close()
+
+
+def write_cards(directory, cards):
+    directory.mkdir()
+    for name, image_bytes in cards.items():
+        (directory / name).write_bytes(image_bytes)
+    return str(directory)
+
+
+def test_previewed_card_is_stored_by_later_ingest(tmp_path, db_path, stub_vision_server):
+    import card_batch
+    from bench.card_images import make_card
+    from card_vision import extract_card_text
+
+    card = make_card(0)
+    # app_stream.py 미리보기: 추출 캐시에만 들어가고 cards 행은 없음
+    _, cached, card_sha256 = extract_card_text(card)
+    assert not cached and card_rows(db_path) == []
+
+    calls = stub_vision_server.request_count
+    progress = card_batch.ingest(write_cards(tmp_path / "cards", {"card.jpg": card}), db_path=db_path, report=lambda line: None)
+    assert progress.cached == 1 and stub_vision_server.request_count == calls
+    assert [row[0] for row in card_rows(db_path)] == [card_sha256]
+
+    # 다시 넣어도 같은 사진은 한 번만
+    card_batch.ingest(write_cards(tmp_path / "again", {"card.jpg": card}), db_path=db_path, report=lambda line: None)
+    assert len(card_rows(db_path)) == 1
+
+
+def test_resaved_photo_saves_one_row(db_path):
+    import card_store
+    from bench.card_images import make_card
+    from card_vision import extract_card_text
+
+    card = make_card(1)
+    buffered = BytesIO()
+    Image.open(BytesIO(card)).save(buffered, format="PNG")
+
+    store = card_store.CardStore(db_path)
+    try:
+        text, _, card_sha256 = extract_card_text(card)
+        assert store.save(text, card_sha256)
+        resaved_text, cached, resaved_sha256 = extract_card_text(buffered.getvalue())
+        assert cached and resaved_sha256 == card_sha256
+        assert not store.save(resaved_text, resaved_sha256)
+        # 다른 명함은 따로 저장
+        other_text, _, other_sha256 = extract_card_text(make_card(2))
+        assert store.save(other_text, other_sha256)
+    finally:
+        store.close()
+    assert len(card_rows(db_path)) == 2
+
+
+def test_failed_flush_keeps_pending_cards(tmp_path):
+    import card_store
+
+    store = card_store.CardStore(str(tmp_path / "cards.db"), flush_size=10, flush_seconds=60)
+    try:
+        store.writer.execute("CREATE TEMP TRIGGER fail_insert BEFORE INSERT ON cards BEGIN SELECT RAISE(ABORT, 'disk I/O error'); END")
+        store.add('{"이름": "홍길동"}', "a" * 64)
+        with pytest.raises(sqlite3.IntegrityError):
+            store.flush()
+        assert len(store.pending) == 1
+
+        store.writer.execute("DROP TRIGGER fail_insert")
+        store.flush()
+    finally:
+        store.close()
+    assert card_rows(str(tmp_path / "cards.db")) == [("a" * 64, "홍길동")]
+
+
+def test_search_from_many_threads_uses_one_reader(tmp_path):
+    import threading
+    import card_store
+
+    store = card_store.CardStore(str(tmp_path / "cards.db"))
+    try:
+        store.save('{"이름": "홍길동"}', "b" * 64)
+        results = []
+        # Streamlit 재실행처럼 매번 새 스레드에서 검색
+        for _ in range(20):
+            thread = threading.Thread(target=lambda: results.append(store.search("홍")[0]))
+            thread.start()
+            thread.join()
+        assert all(len(rows) == 1 for rows in results) and len(results) == 20
+        # 저장 트랜잭션이 열려 있어도 읽기는 기다리지 않음
+        store.writer.execute("BEGIN IMMEDIATE")
+        store.writer.execute("DELETE FROM cards")
+        assert len(store.search("홍")[0]) == 1
+        store.writer.rollback()
+    finally:
+        store.close()
+
+
+@pytest.mark.parametrize("query", ["----", "(  )", "++++", " + - "])
+def test_phone_like_query_without_digits(tmp_path, query):
+    import card_store
+
+    conn = card_store.connect(str(tmp_path / "cards.db"))
+    try:
+        card_store.insert_cards(conn, [('{"이름": "홍길동", "전화번호": "010-1234-5678"}', None)])
+        assert card_store.search_cards(conn, query) == ([], None)
+        # 숫자가 있으면 그대로 번호 앞자리 검색
+        assert len(card_store.search_cards(conn, "010-")[0]) == 1
+    finally:
+        conn.close()